@@ -0,0 +1 @@
+"""Micro-benchmarks for the summarizer and renderer hot paths."""
@@ -0,0 +1,254 @@
+"""Local stand-in for the parts of the Spotify Web API the digest uses.
+
+Serves ``POST /api/token``, ``GET /v1/shows?ids=``, ``GET /v1/shows/{id}`` and
+``GET /v1/shows/{id}/episodes`` (with ``next`` pagination) for any number of synthetic
+shows, with optional latency, 429 throttling and 5xx injection. Run it on its own with::
+
+    python -m benchmarks.fake_spotify --shows 2000 --episodes 20 --port 8765
+
+and point the client at it through ``SPOTIFY_API_BASE`` / ``SPOTIFY_TOKEN_URL``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib import parse
+
+PAGE_LIMIT_MAX = 50
+
+
+@dataclass
+class FakeSpotifyConfig:
+    shows: int = 1000
+    episodes_per_show: int = 20
+    # Added to every response, to mimic network round trips.
+    latency_ms: float = 0.0
+    # Every Nth API request is answered with 429 (0 disables throttling).
+    throttle_every: int = 0
+    retry_after_seconds: float = 0.0
+    # Probability that an API request fails with 503.
+    error_rate: float = 0.0
+    seed: int = 0
+    newest_release: date = field(default_factory=lambda: date(2024, 1, 31))
+
+
+def show_id(index: int) -> str:
+    return f"show{index:05d}"
+
+
+def episode_id(show: str, index: int) -> str:
+    return f"{show}-ep{index:04d}"
+
+
+class FakeSpotifyState:
+    """Synthetic catalogue plus thread-safe request counters."""
+
+    def __init__(self, config: FakeSpotifyConfig) -> None:
+        self.config = config
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(config.seed)
+        self._api_requests = 0
+
+    def show_index(self, raw_id: str) -> Optional[int]:
+        if not raw_id.startswith("show"):
+            return None
+        try:
+            index = int(raw_id[4:])
+        except ValueError:
+            return None
+        return index if 0 <= index < self.config.shows else None
+
+    def show(self, index: int) -> Dict:
+        sid = show_id(index)
+        return {
+            "id": sid,
+            "name": f"Synthetic Show {index}",
+            "publisher": "Fake Spotify",
+            "total_episodes": self.config.episodes_per_show,
+            "external_urls": {"spotify": f"https://open.spotify.com/show/{sid}"},
+        }
+
+    def episode(self, index: int, number: int) -> Dict:
+        # Episode 0 is the newest; shows release on staggered days so dates differ across shows.
+        sid = show_id(index)
+        eid = episode_id(sid, number)
+        released = self.config.newest_release - timedelta(days=number * 7 + index % 7)
+        return {
+            "id": eid,
+            "name": f"Episode {self.config.episodes_per_show - number} of show {index}",
+            "description": f"Synthetic episode {number} of {sid}.",
+            "release_date": released.isoformat(),
+            "release_date_precision": "day",
+            "duration_ms": 1_800_000 + number * 1000,
+            "external_urls": {"spotify": f"https://open.spotify.com/episode/{eid}"},
+        }
+
+    def record(self, kind: str) -> None:
+        with self._lock:
+            self.counts[kind] += 1
+
+    def fault(self) -> Optional[int]:
+        """Decide whether the next API request is throttled (429) or fails (503)."""
+
+        with self._lock:
+            self._api_requests += 1
+            if self.config.throttle_every and self._api_requests % self.config.throttle_every == 0:
+                self.counts["throttled"] += 1
+                return 429
+            if self.config.error_rate and self._rng.random() < self.config.error_rate:
+                self.counts["errors"] += 1
+                return 503
+        return None
+
+
+def make_handler(state: FakeSpotifyState) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+            if state.config.latency_ms:
+                time.sleep(state.config.latency_ms / 1000)
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+            self._send_json({"error": {"status": status, "message": message}}, status=status, headers=headers)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if parse.urlsplit(self.path).path != "/api/token":
+                self._error(404, "not found")
+                return
+            state.record("token")
+            self._send_json({"access_token": "fake-token", "token_type": "Bearer", "expires_in": 3600})
+
+        def do_GET(self):
+            url = parse.urlsplit(self.path)
+            query = parse.parse_qs(url.query)
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                self._error(401, "missing bearer token")
+                return
+            status = state.fault()
+            if status == 429:
+                self._error(429, "rate limited", headers={"Retry-After": f"{state.config.retry_after_seconds:g}"})
+                return
+            if status:
+                self._error(status, "injected failure")
+                return
+
+            parts = [part for part in url.path.split("/") if part]
+            if parts == ["v1", "shows"]:
+                state.record("shows_batch")
+                ids = query.get("ids", [""])[0].split(",")
+                indexes = [state.show_index(raw) for raw in ids]
+                self._send_json({"shows": [state.show(index) if index is not None else None for index in indexes]})
+                return
+            if len(parts) >= 3 and parts[:2] == ["v1", "shows"]:
+                index = state.show_index(parts[2])
+                if index is None:
+                    self._error(404, "non existing id")
+                elif len(parts) == 3:
+                    state.record("show")
+                    self._send_json(state.show(index))
+                elif parts[3:] == ["episodes"]:
+                    state.record("episodes")
+                    self._send_json(self._episode_page(index, query))
+                else:
+                    self._error(404, "not found")
+                return
+            self._error(404, "not found")
+
+        def _episode_page(self, index: int, query: Dict[str, List[str]]) -> Dict:
+            offset = int(query.get("offset", ["0"])[0])
+            limit = min(int(query.get("limit", ["20"])[0]), PAGE_LIMIT_MAX)
+            total = state.config.episodes_per_show
+            items = [state.episode(index, number) for number in range(offset, min(offset + limit, total))]
+            next_url = None
+            if offset + limit < total:
+                host = self.headers.get("Host", "localhost")
+                next_url = f"http://{host}/v1/shows/{show_id(index)}/episodes?offset={offset + limit}&limit={limit}"
+            return {"items": items, "offset": offset, "limit": limit, "total": total, "next": next_url}
+
+    return Handler
+
+
+def start_server(
+    config: FakeSpotifyConfig, host: str = "127.0.0.1", port: int = 0
+) -> Tuple[ThreadingHTTPServer, FakeSpotifyState]:
+    """Start the server on a background thread; call ``server.shutdown()`` to stop it."""
+
+    state = FakeSpotifyState(config)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-spotify", daemon=True).start()
+    return server, state
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--shows", type=int, default=1000, help="Number of synthetic shows")
+    parser.add_argument("--episodes", type=int, default=20, help="Episodes per show")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Answer every Nth API request with 429")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of API requests failing with 503")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for error injection")
+
+
+def config_from_args(args: argparse.Namespace) -> FakeSpotifyConfig:
+    return FakeSpotifyConfig(
+        shows=args.shows,
+        episodes_per_show=args.episodes,
+        latency_ms=args.latency_ms,
+        throttle_every=args.throttle_every,
+        retry_after_seconds=args.retry_after,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve a fake Spotify Web API for load testing")
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server, state = start_server(config_from_args(args), host=args.host, port=args.port)
+    base = base_url(server)
+    print(f"export SPOTIFY_API_BASE={base}/v1")
+    print(f"export SPOTIFY_TOKEN_URL={base}/api/token")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(json.dumps(dict(state.counts)))
+
+
+if __name__ == "__main__":
+    main()
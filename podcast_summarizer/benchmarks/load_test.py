@@ -0,0 +1,144 @@
+"""End-to-end load test: a full ``python -m podcast_digest run`` against the fake Spotify API.
+
+Usage (from the ``podcast_summarizer`` directory)::
+
+    python -m benchmarks.load_test --shows 500 --episodes 10 --latency-ms 20 --concurrency 8
+
+A fresh work directory gets a config, an empty state file and synthetic transcripts for
+``--transcript-fraction`` of the episodes; the run is timed as a subprocess and the report
+lists wall time, requests issued per endpoint and episodes per second.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.fake_spotify import (
+    FakeSpotifyConfig,
+    add_arguments,
+    base_url,
+    config_from_args,
+    episode_id,
+    show_id,
+    start_server,
+)
+from benchmarks.synthetic import generate_transcript
+from podcast_digest.transcripts import PLAIN_SUFFIX, shard_for
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+
+def write_transcripts(cache_dir: Path, config: FakeSpotifyConfig, size_bytes: int, fraction: float) -> int:
+    """Write one transcript for roughly ``fraction`` of the catalogue's episodes."""
+
+    written = 0
+    texts = [generate_transcript(size_bytes, seed=seed) for seed in range(8)]
+    for show_index in range(config.shows):
+        for number in range(config.episodes_per_show):
+            position = show_index * config.episodes_per_show + number
+            # Spread the selected episodes evenly over the catalogue.
+            if int((position + 1) * fraction) == int(position * fraction):
+                continue
+            eid = episode_id(show_id(show_index), number)
+            shard = cache_dir / shard_for(eid)
+            shard.mkdir(parents=True, exist_ok=True)
+            (shard / f"{eid}{PLAIN_SUFFIX}").write_text(texts[written % len(texts)], encoding="utf-8")
+            written += 1
+    return written
+
+
+def write_config(workdir: Path, config: FakeSpotifyConfig, concurrency: int, extra: Dict) -> Path:
+    digest_config = {
+        "shows": [{"id": show_id(index)} for index in range(config.shows)],
+        "output": {"output_dir": str(workdir / "output")},
+        "state_file": str(workdir / "state.json"),
+        "transcript_cache": str(workdir / "transcripts"),
+        "max_concurrency": concurrency,
+        **extra,
+    }
+    path = workdir / "config.yaml"
+    # JSON is valid YAML, and load_config falls back to json when PyYAML is missing.
+    path.write_text(json.dumps(digest_config, indent=2), encoding="utf-8")
+    return path
+
+
+def run_digest(config_path: Path, api_base: str, run_args: Optional[List[str]] = None) -> subprocess.CompletedProcess:
+    env = {
+        **os.environ,
+        "SPOTIFY_CLIENT_ID": "load-test",
+        "SPOTIFY_CLIENT_SECRET": "load-test",
+        "SPOTIFY_API_BASE": f"{api_base}/v1",
+        "SPOTIFY_TOKEN_URL": f"{api_base}/api/token",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(PACKAGE_ROOT), os.environ.get("PYTHONPATH")])),
+    }
+    command = [sys.executable, "-m", "podcast_digest", "run", "--config", str(config_path), *(run_args or [])]
+    return subprocess.run(command, cwd=PACKAGE_ROOT, env=env, capture_output=True, text=True)
+
+
+def digested_episodes(output_dir: Path) -> int:
+    """Read the episode count from the Markdown digest's overview."""
+
+    for path in output_dir.glob("*.md"):
+        match = re.search(r"New episodes: (\d+)", path.read_text(encoding="utf-8"))
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the digest pipeline against a fake Spotify API")
+    add_arguments(parser)
+    parser.add_argument("--concurrency", type=int, default=4, help="max_concurrency for the digest run")
+    parser.add_argument("--transcript-bytes", type=int, default=16 * 1024, help="Size of each synthetic transcript")
+    parser.add_argument("--transcript-fraction", type=float, default=0.8, help="Share of episodes with a transcript")
+    parser.add_argument("--extra-config", default="{}", help="JSON merged into the generated digest config")
+    parser.add_argument("--run-args", default="", help='Extra arguments for "run", e.g. "--profile"')
+    parser.add_argument("--workdir", type=Path, default=None, help="Keep outputs here instead of a temp directory")
+    args = parser.parse_args(argv)
+
+    fake_config = config_from_args(args)
+    catalogue = fake_config.shows * fake_config.episodes_per_show
+    with tempfile.TemporaryDirectory(prefix="podcast-load-") as tmp:
+        workdir = args.workdir or Path(tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        transcripts = write_transcripts(
+            workdir / "transcripts", fake_config, args.transcript_bytes, args.transcript_fraction
+        )
+        config_path = write_config(workdir, fake_config, args.concurrency, json.loads(args.extra_config))
+
+        server, state = start_server(fake_config)
+        try:
+            start = time.perf_counter()
+            result = run_digest(config_path, base_url(server), shlex.split(args.run_args))
+            wall = time.perf_counter() - start
+        finally:
+            server.shutdown()
+            server.server_close()
+        episodes = digested_episodes(workdir / "output")
+
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        print(f"Digest run failed with exit code {result.returncode}", file=sys.stderr)
+        return result.returncode
+
+    # Throttled and failed requests are counted on their own, not under their endpoint.
+    requests = sum(state.counts.values())
+    print(f"shows:        {fake_config.shows}")
+    print(f"episodes:     {episodes} digested of {catalogue} ({transcripts} transcripts on disk)")
+    print(f"wall time:    {wall:.2f}s")
+    print(f"requests:     {requests} {dict(sorted(state.counts.items()))}")
+    print(f"episodes/s:   {episodes / wall:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Time the summarizer and renderer hot paths and compare them against a stored baseline.
+
+Usage (from the ``podcast_summarizer`` directory)::
+
+    python -m benchmarks.run                   # full suite, compared against benchmarks/baseline.json
+    python -m benchmarks.run --quick           # smaller inputs and fewer repeats
+    python -m benchmarks.run --update-baseline # record the current numbers as the new baseline
+
+The process exits with status 1 when any case is slower than its baseline by more than
+``--tolerance``. Baselines are machine-specific; regenerate them on the machine that checks them.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import generate_transcript, synthetic_episode
+from podcast_digest.config import DigestConfig, OutputConfig, ShowConfig
+from podcast_digest.digest import DigestRunner
+from podcast_digest.renderer import _segment_sentences, _split_sentences, render_episode, summarize_transcript
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+KIB = 1024
+MIB = 1024 * KIB
+
+
+@dataclass
+class BenchCase:
+    name: str
+    func: Callable[[], object]
+    bytes_processed: int = 0
+    episodes: int = 0
+
+
+@dataclass
+class BenchResult:
+    name: str
+    seconds: float
+    mb_per_s: Optional[float]
+    episodes_per_s: Optional[float]
+    peak_kib: float
+
+
+def _label(size: int) -> str:
+    return f"{size // MIB}MB" if size >= MIB else f"{size // KIB}KB"
+
+
+def _transcript_cases(size: int, style: str) -> List[BenchCase]:
+    episode = synthetic_episode(0)
+    text = generate_transcript(size, style=style)
+    sentences = _split_sentences(text)
+    summary = summarize_transcript(episode, text)
+    desired = min(12, max(5, len(sentences) // 8 or 1))
+    suffix = f"{style}/{_label(size)}"
+    return [
+        BenchCase(f"split_sentences/{suffix}", lambda: _split_sentences(text), bytes_processed=size),
+        BenchCase(f"segment_sentences/{suffix}", lambda: _segment_sentences(sentences, desired), bytes_processed=size),
+        BenchCase(
+            f"summarize_transcript/{suffix}",
+            lambda: summarize_transcript(episode, text),
+            bytes_processed=size,
+            episodes=1,
+        ),
+        BenchCase(
+            f"summarize_ranked/{suffix}",
+            lambda: summarize_transcript(episode, text, strategy="ranked"),
+            bytes_processed=size,
+            episodes=1,
+        ),
+        BenchCase(f"render_episode/{suffix}", lambda: render_episode(summary), episodes=1),
+    ]
+
+
+def _digest_run_case(workdir: Path, shows: int, episodes_per_show: int, size: int) -> BenchCase:
+    config = DigestConfig(
+        shows=[ShowConfig(id=f"show{idx}") for idx in range(shows)],
+        output=OutputConfig(output_dir=workdir / "output"),
+        state_file=workdir / "state.json",
+        transcript_cache=workdir / "cache",
+    )
+    runner = DigestRunner(config)
+    text = generate_transcript(size)
+    entries = []
+    for show_idx in range(shows):
+        episodes = [synthetic_episode(idx, show_id=f"show{show_idx}") for idx in range(episodes_per_show)]
+        outcomes = [runner.summarize_episode(episode, text) for episode in episodes]
+        entries.append((f"show{show_idx}", episodes, outcomes))
+    total = shows * episodes_per_show
+    return BenchCase(
+        f"digest_run/{shows}x{episodes_per_show}/{_label(size)}",
+        lambda: runner.run(entries),
+        bytes_processed=sum(len(outcome.markdown) for _, _, outcomes in entries for outcome in outcomes),
+        episodes=total,
+    )
+
+
+def build_cases(workdir: Path, quick: bool = False) -> List[BenchCase]:
+    sizes = [KIB, 64 * KIB, 256 * KIB] if quick else [KIB, 64 * KIB, MIB, 5 * MIB]
+    cases: List[BenchCase] = []
+    for size in sizes:
+        cases.extend(_transcript_cases(size, "mixed"))
+    style_size = 256 * KIB if quick else MIB
+    for style in ("questions", "unpunctuated"):
+        cases.extend(_transcript_cases(style_size, style))
+    cases.append(_digest_run_case(workdir, shows=5 if quick else 20, episodes_per_show=5, size=16 * KIB))
+    return cases
+
+
+MIN_TIMING_SECONDS = 0.02
+
+
+def measure(case: BenchCase, repeats: int) -> BenchResult:
+    # Like timeit: loop fast cases so each timing lasts long enough to be stable.
+    start = time.perf_counter()
+    case.func()
+    number = max(1, int(MIN_TIMING_SECONDS / max(time.perf_counter() - start, 1e-9)))
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            case.func()
+        timings.append((time.perf_counter() - start) / number)
+    best = min(timings)
+
+    # Peak memory is taken on a separate run so tracing overhead does not skew the timings.
+    tracemalloc.start()
+    case.func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return BenchResult(
+        name=case.name,
+        seconds=best,
+        mb_per_s=case.bytes_processed / MIB / best if case.bytes_processed and best else None,
+        episodes_per_s=case.episodes / best if case.episodes and best else None,
+        peak_kib=peak / KIB,
+    )
+
+
+def load_baseline(path: Path) -> Dict[str, Dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("results", {})
+
+
+def save_baseline(path: Path, results: List[BenchResult]) -> None:
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    return format(value, spec) if value is not None else format("-", ">" + spec.split(".")[0])
+
+
+def report(results: List[BenchResult], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Print a results table and return the names of cases that regressed."""
+
+    regressions = []
+    print(f"{'case':<44} {'time (ms)':>10} {'MB/s':>9} {'eps/s':>9} {'peak KiB':>10} {'vs base':>8}")
+    for result in results:
+        previous = baseline.get(result.name)
+        ratio = result.seconds / previous["seconds"] if previous and previous["seconds"] else None
+        flag = ""
+        if ratio is not None and ratio > 1 + tolerance:
+            regressions.append(result.name)
+            flag = "  REGRESSION"
+        versus = f"{ratio:.2f}x" if ratio is not None else "-"
+        print(
+            f"{result.name:<44} {result.seconds * 1000:>10.2f} {_fmt(result.mb_per_s, '9.1f')} "
+            f"{_fmt(result.episodes_per_s, '9.1f')} {result.peak_kib:>10.0f} {versus:>8}{flag}"
+        )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run podcast digest micro-benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Use smaller inputs and fewer repeats")
+    parser.add_argument("--repeats", type=int, default=None, help="Timed repetitions per case (best is kept)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this substring")
+    args = parser.parse_args(argv)
+
+    repeats = args.repeats or (3 if args.quick else 5)
+    with tempfile.TemporaryDirectory(prefix="podcast-bench-") as tmp:
+        cases = [case for case in build_cases(Path(tmp), quick=args.quick) if args.filter in case.name]
+        results = [measure(case, repeats) for case in cases]
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        report(results, {}, args.tolerance)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = report(results, load_baseline(args.baseline), args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
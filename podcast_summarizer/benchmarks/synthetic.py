@@ -0,0 +1,57 @@
+"""Deterministic synthetic transcripts for benchmarks and load tests."""
+from __future__ import annotations
+
+import random
+from datetime import datetime
+
+from podcast_digest.models import Episode
+
+STYLES = ("mixed", "questions", "unpunctuated")
+
+_WORDS = (
+    "we think the market should try a new plan because growth recommend data model team product users "
+    "listen today episode guest host really interesting point question answer launch build research "
+    "learn story company future strategy week idea people work time value risk simple problem approach"
+).split()
+_SPEAKERS = ("Host:", "Guest:", "Co-host:")
+
+
+def generate_transcript(size_bytes: int, style: str = "mixed", seed: int = 0) -> str:
+    """Build a transcript of exactly ``size_bytes`` ASCII bytes.
+
+    ``mixed`` resembles diarized conversation, ``questions`` ends most sentences with ``?``,
+    and ``unpunctuated`` never ends a sentence, which yields a single huge sentence.
+    """
+
+    if style not in STYLES:
+        raise ValueError(f"Unknown transcript style: {style}")
+    rng = random.Random(f"{style}:{seed}")
+    parts = []
+    length = 0
+    while length < size_bytes:
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(5, 25))]
+        if style != "unpunctuated" and rng.random() < 0.2:
+            words.insert(0, rng.choice(_SPEAKERS))
+        sentence = " ".join(words)
+        if style == "questions":
+            sentence += "?" if rng.random() < 0.8 else "."
+        elif style == "mixed":
+            sentence += rng.choice(".....?!")
+        sentence = sentence[0].upper() + sentence[1:]
+        separator = "\n" if rng.random() < 0.1 else " "
+        parts.append(sentence + separator)
+        length += len(sentence) + 1
+    return "".join(parts)[:size_bytes]
+
+
+def synthetic_episode(index: int, show_id: str = "bench", duration_ms: int = 3_600_000) -> Episode:
+    return Episode(
+        id=f"{show_id}-ep{index}",
+        show_id=show_id,
+        show_name=f"Benchmark Show {show_id}",
+        title=f"Synthetic episode {index}",
+        description=None,
+        published_at=datetime(2024, 1, 1 + index % 28),
+        duration_ms=duration_ms,
+        spotify_url=f"https://open.spotify.com/episode/{show_id}-ep{index}",
+    )
@@ -0,0 +1,280 @@
+"""Drop sentences that recur across a show's episodes: intros, outros and sponsor reads.
+
+Every sentence of at least ``MIN_WORDS`` words is reduced to a MinHash signature over its
+word 3-shingles, and the signature is split into LSH bands. Two sentences that share a
+band key are near-duplicates with high probability: with 16 bands of 4 rows, pairs with
+Jaccard similarity 0.7 (one word changed in a twenty-word sentence) collide ~99% of the
+time and pairs at 0.2 about 2.5%.
+
+A sentence is dropped when its band keys were seen in at least ``min_episodes`` earlier
+episodes of the same show. Each show keeps the band keys of its last ``history_episodes``
+episodes in an append-only ``<show_id>.jsonl`` file, one line per episode, so a run only
+appends what it processed.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from podcast_digest import metrics
+from podcast_digest.models import Episode, TranscriptResult
+from podcast_digest.renderer import _iter_sentences, _split_sentences
+from podcast_digest.transcripts import TranscriptProvider
+
+try:  # Optional dependency
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None
+
+LOGGER = logging.getLogger(__name__)
+
+# Shorter sentences ("Thanks.", "Welcome back to the show.") are never dropped.
+MIN_WORDS = 8
+SHINGLE_WORDS = 3
+BANDS = 16
+ROWS = 4
+# Multiply-shift hashing: the top 32 bits of (a * x + b) mod 2**64 for odd 64-bit ``a``.
+_MASK64 = (1 << 64) - 1
+_SEEDS = [
+    ((0x9E3779B97F4A7C15 * (2 * i + 1)) & _MASK64 | 1, (0xC2B2AE3D27D4EB4F * (i + 1)) & _MASK64)
+    for i in range(BANDS * ROWS)
+]
+# Multipliers combining three word hashes into a shingle hash, and a band's rows into its key.
+_SHINGLE_MULTIPLIERS = (0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53)
+_BAND_BASE = 0x100000001B3
+_KEY_MASK = (1 << 32) - 1
+# Sentences are hashed in batches so the NumPy path amortises its call overhead.
+BATCH_SENTENCES = 256
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def _word_hashes(sentence: str) -> List[int]:
+    words = _WORD.findall(sentence.lower())
+    if len(words) < MIN_WORDS:
+        return []
+    return [zlib.crc32(word.encode("utf-8")) for word in words]
+
+
+def _keys_python(words: Sequence[List[int]]) -> List[Optional[List[int]]]:
+    first, second = _SHINGLE_MULTIPLIERS
+    keys: List[Optional[List[int]]] = []
+    for hashes in words:
+        if not hashes:
+            keys.append(None)
+            continue
+        shingles = {
+            (hashes[i] * first + hashes[i + 1] * second + hashes[i + 2]) & _MASK64 for i in range(len(hashes) - 2)
+        }
+        signature = [min(((a * h + b) & _MASK64) >> 32 for h in shingles) for a, b in _SEEDS]
+        row_keys = []
+        for band in range(BANDS):
+            key = 0
+            for value in signature[band * ROWS : (band + 1) * ROWS]:
+                key = (key * _BAND_BASE + value) & _MASK64
+            row_keys.append((key & _KEY_MASK) * BANDS + band)
+        keys.append(row_keys)
+    return keys
+
+
+def _keys_numpy(words: Sequence[List[int]]) -> List[Optional[List[int]]]:
+    present = [index for index, hashes in enumerate(words) if hashes]
+    keys: List[Optional[List[int]]] = [None] * len(words)
+    if not present:
+        return keys
+    lengths = np.fromiter((len(words[index]) for index in present), dtype=np.int64, count=len(present))
+    flat = np.fromiter((h for index in present for h in words[index]), dtype=np.uint64, count=int(lengths.sum()))
+    # Shingle i starts at word i; drop those that would run into the next sentence.
+    first, second = (np.uint64(value) for value in _SHINGLE_MULTIPLIERS)
+    shingles = flat[:-2] * first + flat[1:-1] * second + flat[2:]
+    inner_ends = np.cumsum(lengths)[:-1]
+    valid = np.ones(len(shingles), dtype=bool)
+    valid[inner_ends - 2] = False
+    valid[inner_ends - 1] = False
+    shingles = shingles[valid]
+    starts = np.concatenate(([0], np.cumsum(lengths - 2)[:-1]))
+    seeds = np.asarray(_SEEDS, dtype=np.uint64)
+    hashed = (seeds[:, :1] * shingles[None, :] + seeds[:, 1:]) >> np.uint64(32)
+    signatures = np.minimum.reduceat(hashed, starts, axis=1).T.reshape(len(present), BANDS, ROWS)
+    band = np.zeros((len(present), BANDS), dtype=np.uint64)
+    for row in range(ROWS):
+        band = band * np.uint64(_BAND_BASE) + signatures[:, :, row]
+    band = (band & np.uint64(_KEY_MASK)) * np.uint64(BANDS) + np.arange(BANDS, dtype=np.uint64)
+    for index, row_keys in zip(present, band.tolist()):
+        keys[index] = row_keys
+    return keys
+
+
+def band_keys(sentences: Sequence[str]) -> List[Optional[List[int]]]:
+    """LSH band keys per sentence, or ``None`` for sentences too short to judge."""
+
+    words = [_word_hashes(sentence) for sentence in sentences]
+    return _keys_numpy(words) if np is not None else _keys_python(words)
+
+
+class _ShowHistory:
+    """Band keys of one show's recent episodes, backed by an append-only JSON-lines file."""
+
+    def __init__(self, path: Path, limit: int) -> None:
+        self.path = path
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.episodes: "OrderedDict[str, List[int]]" = OrderedDict()
+        self.buckets: Dict[int, Set[str]] = {}
+        self.lines = 0
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    record = json.loads(line)
+                    self._add(record["episode"], record["keys"])
+                except (ValueError, KeyError, TypeError):
+                    LOGGER.warning("Skipping unreadable line in %s", path)
+                self.lines += 1
+
+    def _add(self, episode_id: str, keys: List[int]) -> None:
+        self._remove(episode_id)
+        self.episodes[episode_id] = keys
+        for key in keys:
+            self.buckets.setdefault(key, set()).add(episode_id)
+        while len(self.episodes) > self.limit:
+            self._remove(next(iter(self.episodes)))
+
+    def _remove(self, episode_id: str) -> None:
+        for key in self.episodes.pop(episode_id, ()):
+            owners = self.buckets.get(key)
+            if owners is not None:
+                owners.discard(episode_id)
+                if not owners:
+                    del self.buckets[key]
+
+    def seen_in(self, keys: List[int], exclude: str) -> int:
+        owners: Set[str] = set()
+        for key in keys:
+            owners.update(self.buckets.get(key, ()))
+        owners.discard(exclude)
+        return len(owners)
+
+    def record(self, episode_id: str, keys: List[int]) -> None:
+        self._add(episode_id, keys)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.lines >= 2 * self.limit:
+            self._compact()
+            return
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps({"episode": episode_id, "keys": keys}) + "\n")
+        self.lines += 1
+
+    def _compact(self) -> None:
+        content = "".join(
+            json.dumps({"episode": episode_id, "keys": keys}) + "\n" for episode_id, keys in self.episodes.items()
+        )
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(content)
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.lines = len(self.episodes)
+
+
+class BoilerplateIndex:
+    """Per-show near-duplicate sentence index; safe to share across show threads."""
+
+    def __init__(self, directory: Path, min_episodes: int = 2, history_episodes: int = 20) -> None:
+        self.directory = directory
+        self.min_episodes = min_episodes
+        self.history_episodes = history_episodes
+        self.dropped_sentences = 0
+        self.dropped_chars = 0
+        self._shows: Dict[str, _ShowHistory] = {}
+        self._lock = threading.Lock()
+
+    def _history(self, show_id: str) -> _ShowHistory:
+        with self._lock:
+            history = self._shows.get(show_id)
+            if history is None:
+                safe = re.sub(r"[^A-Za-z0-9_.-]", "_", show_id) or "_"
+                history = self._shows[show_id] = _ShowHistory(self.directory / f"{safe}.jsonl", self.history_episodes)
+            return history
+
+    def strip(self, show_id: str, episode_id: str, sentences: Iterable[str]) -> Iterator[str]:
+        """Yield the sentences that are not boilerplate, then record the episode.
+
+        The episode is only recorded once ``sentences`` is exhausted. Re-processing an
+        episode replaces its earlier record instead of counting it twice.
+        """
+
+        history = self._history(show_id)
+        episode_keys: Dict[int, None] = {}
+        iterator = iter(sentences)
+        while True:
+            batch = [sentence for _, sentence in zip(range(BATCH_SENTENCES), iterator)]
+            if not batch:
+                break
+            kept: List[str] = []
+            dropped = 0
+            keys = band_keys(batch)
+            with history.lock:
+                for sentence, sentence_keys in zip(batch, keys):
+                    if sentence_keys is not None:
+                        episode_keys.update(dict.fromkeys(sentence_keys))
+                        if history.seen_in(sentence_keys, episode_id) >= self.min_episodes:
+                            dropped += len(sentence)
+                            continue
+                    kept.append(sentence)
+            if len(kept) < len(batch):
+                with self._lock:
+                    self.dropped_sentences += len(batch) - len(kept)
+                    self.dropped_chars += dropped
+            yield from kept
+        with history.lock:
+            history.record(episode_id, list(episode_keys))
+
+    def strip_text(self, show_id: str, episode_id: str, text: str) -> str:
+        return " ".join(self.strip(show_id, episode_id, _split_sentences(text)))
+
+    def stats(self) -> str:
+        return f"{self.dropped_sentences} boilerplate sentences dropped ({self.dropped_chars} chars)"
+
+
+class BoilerplateFilter(TranscriptProvider):
+    """Wraps a provider and strips recurring passages from the transcripts it returns."""
+
+    def __init__(self, provider: TranscriptProvider, index: BoilerplateIndex) -> None:
+        self.provider = provider
+        self.index = index
+
+    def get_transcript(self, episode: Episode) -> TranscriptResult:
+        result = self.provider.get_transcript(episode)
+        if result.status == "available" and result.text:
+            with metrics.span("boilerplate"):
+                result.text = self.index.strip_text(episode.show_id, episode.id, result.text)
+        return result
+
+    def refresh(self) -> None:
+        self.provider.refresh()
+
+    def close(self) -> None:
+        self.provider.close()
+
+    def stream_transcript(self, episode: Episode) -> TranscriptResult:
+        result = self.provider.stream_transcript(episode)
+        if result.status != "available":
+            return result
+        if result.chunks is not None:
+            sentences = self.index.strip(episode.show_id, episode.id, _iter_sentences(result.chunks))
+            # Every sentence but the last ends in ".", "!" or "?", so a space re-splits them identically.
+            result.chunks = (sentence + " " for sentence in sentences)
+        elif result.text:
+            result.text = self.index.strip_text(episode.show_id, episode.id, result.text)
+        return result
@@ -4,11 +4,21 @@ from __future__ import annotations
 import argparse
 import logging
 import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Dict, Optional
 
-from podcast_digest.config import DigestConfig, load_config
-from podcast_digest.digest import DigestRunner
+from podcast_digest import metrics, profiling, sharding
+from podcast_digest.config import DigestConfig, ShowConfig, load_config
+from podcast_digest.daemon import DigestDaemon
+from podcast_digest.digest import DigestRunner, ShowOutcomes
+from podcast_digest.models import DigestDocument, Episode, TranscriptResult
+from podcast_digest.http_cache import ResponseCache
 from podcast_digest.spotify import SpotifyClient
+from podcast_digest.summary_cache import SummaryCache
+from podcast_digest.transcripts import CachedTranscriptProvider, TranscriptIndex, prefetch_transcripts
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 LOGGER = logging.getLogger(__name__)
@@ -20,43 +30,249 @@ def build_parser() -> argparse.ArgumentParser:
 
     run_parser = subparsers.add_parser("run", help="Run the digest pipeline")
     run_parser.add_argument("--config", type=Path, default=Path("config.yaml"), help="Path to config YAML")
+    run_parser.add_argument(
+        "--metrics", action="store_true", help="Write per-stage timings as JSON and a Prometheus textfile"
+    )
+    run_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="sampling",
+        choices=profiling.PROFILE_MODES,
+        help="Profile the run (default: sampling) and write the results next to the digest",
+    )
+    run_parser.add_argument(
+        "--profile-top", type=int, default=20, help="Functions and episodes listed in the profile summary"
+    )
+    run_parser.add_argument(
+        "--profile-interval-ms", type=float, default=5.0, help="Sampling interval for --profile sampling"
+    )
+    run_parser.add_argument(
+        "--shard",
+        type=sharding.parse_shard,
+        metavar="I/N",
+        help="Process only shard I of N of the shows and write its sections for 'merge'",
+    )
+
+    merge_parser = subparsers.add_parser("merge", help="Combine the shard sections of 'run --shard' into the digest")
+    merge_parser.add_argument("--config", type=Path, default=Path("config.yaml"), help="Path to config YAML")
+    merge_parser.add_argument(
+        "--date",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+        help="Day to merge as YYYY-MM-DD (default: today, UTC)",
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve", aliases=["watch"], help="Keep running, polling shows adaptively and updating the digest"
+    )
+    serve_parser.add_argument("--config", type=Path, default=Path("config.yaml"), help="Path to config YAML")
+    serve_parser.add_argument(
+        "--metrics", action="store_true", help="Write per-stage timings as JSON and a Prometheus textfile"
+    )
+
+    clear_parser = subparsers.add_parser(
+        "clear-summary-cache", help="Drop every cached summary, e.g. after changing summarization logic"
+    )
+    clear_parser.add_argument("--config", type=Path, default=Path("config.yaml"), help="Path to config YAML")
+
+    compress_parser = subparsers.add_parser(
+        "compress-transcripts", help="Convert plain .txt transcripts in the cache to .txt.gz"
+    )
+    compress_parser.add_argument("--config", type=Path, default=Path("config.yaml"), help="Path to config YAML")
+
+    reindex_parser = subparsers.add_parser(
+        "reindex", help="Move cached transcripts into shard directories and rebuild the manifest"
+    )
+    reindex_parser.add_argument("--config", type=Path, default=Path("config.yaml"), help="Path to config YAML")
 
     return parser
 
 
-def load_spotify_client() -> SpotifyClient:
+def load_spotify_client(config: Optional[DigestConfig] = None) -> SpotifyClient:
     client_id = os.getenv("SPOTIFY_CLIENT_ID")
     client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
     if not client_id or not client_secret:
         raise RuntimeError("SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET must be set")
-    return SpotifyClient(client_id=client_id, client_secret=client_secret)
+    cache = None
+    if config and config.http_cache.directory:
+        cache = ResponseCache(
+            config.http_cache.directory,
+            ttl_seconds=config.http_cache.ttl_seconds,
+            max_bytes=config.http_cache.max_bytes,
+        )
+    prefetch_pages = config.episode_fetch.prefetch_pages if config else 0
+    return SpotifyClient(client_id=client_id, client_secret=client_secret, cache=cache, prefetch_pages=prefetch_pages)
 
 
-def process(config: DigestConfig) -> None:
-    runner = DigestRunner(config)
-    spotify_client = load_spotify_client()
+def resolve_show_id(spotify_client: SpotifyClient, show: ShowConfig) -> str:
+    return show.id or spotify_client.resolve_show_id(show.url or "")
+
+
+def report_directory(config: DigestConfig) -> Path:
+    if config.shard:
+        return sharding.report_directory(config.output.output_dir, config.shard)
+    return config.output.output_dir
+
+
+def process_show(
+    runner: DigestRunner,
+    spotify_client: SpotifyClient,
+    show_id: str,
+    show_data: Optional[Dict] = None,
+    since: Optional[datetime] = None,
+) -> ShowOutcomes:
+    """Fetch, load and summarize a show's new episodes; ``since`` overrides an older state entry."""
 
-    episodes_by_show = []
-    for show in config.shows:
-        show_id = show.id or spotify_client.resolve_show_id(show.url or "")
+    with metrics.show_scope(show_id):
         last_processed = runner.state.last_processed(show_id)
-        episodes = spotify_client.get_new_episodes(show_id, last_processed)
-
-        rendered_blocks = []
-        for episode in episodes:
-            transcript_result = runner.transcript_provider.get_transcript(episode)
-            if transcript_result.status == "available" and transcript_result.text:
-                rendered_blocks.append(runner.process_episode(episode, transcript_result.text))
-            elif transcript_result.status == "error":
-                rendered_blocks.append(
-                    f"### {episode.title}\n**Transcript unavailable — error fetching transcript**\n{transcript_result.error or ''}\n"
-                )
-            else:
-                rendered_blocks.append(runner.handle_unavailable(episode))
-        episodes_by_show.append((show_id, episodes, rendered_blocks))
-
-    document = runner.run(episodes_by_show)
+        if since is not None and (last_processed is None or since > last_processed):
+            last_processed = since
+        fetch_config = runner.config.episode_fetch
+        max_age = fetch_config.max_backfill_age_days
+        episodes = spotify_client.get_new_episodes(
+            show_id,
+            last_processed,
+            show=show_data,
+            max_episodes=fetch_config.max_backfill_episodes,
+            max_age=timedelta(days=max_age) if max_age else None,
+            probe=fetch_config.probe_latest,
+        )
+
+        if runner.config.streaming_summaries:
+            fetch = runner.transcript_provider.stream_transcript
+        else:
+            fetch = runner.transcript_provider.get_transcript
+
+        def load(episode: Episode) -> TranscriptResult:
+            with metrics.span("transcript_load"):
+                return fetch(episode)
+
+        # Upcoming transcripts load in the background while earlier episodes are summarized.
+        items = prefetch_transcripts(load, episodes, runner.config.transcript_fetch.prefetch)
+        outcomes = runner.process_transcripts(items)
+    return show_id, episodes, outcomes
+
+
+def process(config: DigestConfig) -> DigestDocument:
+    recorder = metrics.enable() if config.metrics else None
+    runner = DigestRunner(config)
+    spotify_client = load_spotify_client(config)
+
+    try:
+        show_ids = [resolve_show_id(spotify_client, show) for show in config.shows]
+        if config.shard:
+            show_ids = sharding.select_shows(show_ids, config.shard)
+            LOGGER.info("Shard %d/%d: %d of %d shows", *config.shard, len(show_ids), len(config.shows))
+        shows_by_id = spotify_client.get_shows(show_ids)
+
+        def run_show(show_id: str) -> ShowOutcomes:
+            return process_show(runner, spotify_client, show_id, shows_by_id.get(show_id))
+
+        # Results are consumed lazily so each show section is written as soon as it is ready.
+        if config.max_concurrency <= 1:
+            document = runner.run(run_show(show_id) for show_id in show_ids)
+        else:
+            # Executor.map yields results in submission order, so the digest keeps the config's show order.
+            with ThreadPoolExecutor(max_workers=config.max_concurrency, thread_name_prefix="digest-show") as executor:
+                document = runner.run(executor.map(run_show, show_ids))
+    finally:
+        runner.close()
+        metrics.disable()
     LOGGER.info("Digest written to %s", document.output_path)
+    if recorder:
+        counts = {
+            "episodes_total": document.total_new_episodes,
+            "episodes_summarized": document.summarized_count,
+            "episodes_unavailable": document.unavailable_count,
+        }
+        report_path, prometheus_path = recorder.write(report_directory(config), document.date, counts)
+        LOGGER.info("Run metrics written to %s and %s", report_path, prometheus_path)
+    if spotify_client.cache:
+        LOGGER.info("HTTP cache: %s", spotify_client.cache.stats())
+    if runner.summary_cache:
+        LOGGER.info("Summary cache: %s", runner.summary_cache.stats())
+    if runner.boilerplate:
+        LOGGER.info("Boilerplate: %s", runner.boilerplate.stats())
+    if runner.negative_cache:
+        LOGGER.info("Negative cache: %s", runner.negative_cache.stats())
+    return document
+
+
+def profile_process(config: DigestConfig, mode: str, top: int, interval: float) -> None:
+    with profiling.RunProfiler(mode, interval=interval) as profiler:
+        document = process(config)
+    paths = profiler.write(report_directory(config), document.date, top=top)
+    LOGGER.info("Profile summary:\n%s", profiler.summary(top).rstrip("\n"))
+    LOGGER.info("Profile written to %s", ", ".join(str(path) for path in paths))
+
+
+def serve(config: DigestConfig) -> None:
+    """Run until SIGINT/SIGTERM with one warm Spotify client, token, connection pool and caches."""
+
+    if config.output.mode != "append":
+        LOGGER.info("serve writes the digest in append mode")
+        config.output.mode = "append"
+    if config.metrics:
+        metrics.enable()
+    runner = DigestRunner(config)
+    spotify_client = load_spotify_client(config)
+    try:
+        show_ids = [resolve_show_id(spotify_client, show) for show in config.shows]
+        shows_by_id = spotify_client.get_shows(show_ids)
+
+        def poll(show_id: str, since: Optional[datetime]) -> ShowOutcomes:
+            return process_show(runner, spotify_client, show_id, shows_by_id.get(show_id), since=since)
+
+        daemon = DigestDaemon(config, runner, show_ids, poll, recent_releases=spotify_client.recent_releases)
+        signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+        LOGGER.info("Serving %d shows; flushing every %g minutes", len(show_ids), config.daemon.flush_interval_minutes)
+        try:
+            daemon.serve()
+        except KeyboardInterrupt:
+            LOGGER.info("Interrupted; flushed pending episodes")
+    finally:
+        runner.close()
+        spotify_client.close()
+        metrics.disable()
+
+
+def merge(config: DigestConfig, date: Optional[datetime] = None) -> DigestDocument:
+    """Write the day's digest from the sections that ``run --shard`` workers left behind.
+
+    State was committed by the workers; re-saving the same markers here is a no-op.
+    """
+
+    date = date or datetime.utcnow()
+    show_order = [show.id or SpotifyClient.resolve_show_id(show.url or "") for show in config.shows]
+    sections = sharding.merge_shards(config.output.output_dir, date, show_order)
+    if not sections:
+        LOGGER.warning("No shard sections found for %s in %s", date.date(), config.output.output_dir)
+    runner = DigestRunner(config)
+    try:
+        document = runner.run(sections, date=date)
+    finally:
+        runner.close()
+    LOGGER.info("Merged %d shows into %s", len(document.shows), document.output_path)
+    return document
+
+
+def compress_transcripts(config: DigestConfig) -> None:
+    provider = CachedTranscriptProvider(config.transcript_cache)
+    converted = provider.compress_plain_transcripts()
+    LOGGER.info("Compressed %d transcripts in %s", converted, config.transcript_cache)
+
+
+def reindex_transcripts(config: DigestConfig) -> None:
+    index = TranscriptIndex(config.transcript_cache)
+    moved = index.reindex()
+    LOGGER.info("Indexed %d transcripts in %s (%d moved into shards)", len(index.entries), config.transcript_cache, moved)
+
+
+def clear_summary_cache(config: DigestConfig) -> None:
+    if not config.summary_cache.directory:
+        LOGGER.info("No summary cache configured")
+        return
+    SummaryCache(config.summary_cache.directory).invalidate()
+    LOGGER.info("Cleared summary cache at %s", config.summary_cache.directory)
 
 
 def main() -> None:
@@ -65,7 +281,26 @@ def main() -> None:
 
     if args.command == "run":
         config = load_config(args.config)
-        process(config)
+        if args.metrics:
+            config.metrics = True
+        config.shard = args.shard
+        if args.profile:
+            profile_process(config, args.profile, args.profile_top, args.profile_interval_ms / 1000)
+        else:
+            process(config)
+    elif args.command in ("serve", "watch"):
+        config = load_config(args.config)
+        if args.metrics:
+            config.metrics = True
+        serve(config)
+    elif args.command == "merge":
+        merge(load_config(args.config), args.date)
+    elif args.command == "clear-summary-cache":
+        clear_summary_cache(load_config(args.config))
+    elif args.command == "compress-transcripts":
+        compress_transcripts(load_config(args.config))
+    elif args.command == "reindex":
+        reindex_transcripts(load_config(args.config))
     else:
         parser.print_help()
 
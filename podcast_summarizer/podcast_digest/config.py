@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 
 try:  # Optional dependency
     import yaml  # type: ignore
@@ -11,6 +11,8 @@ except ImportError:  # pragma: no cover
     yaml = None
 import json
 
+from podcast_digest.features import DEFAULT_ACTION_PHRASES, DEFAULT_QUESTION_PHRASES, QUOTE_MAX_CHARS
+
 
 @dataclass
 class ShowConfig:
@@ -25,10 +27,200 @@ class ShowConfig:
         return self.id or ""
 
 
+OUTPUT_MODES = ("overwrite", "append")
+OUTPUT_FORMATS = ("markdown", "json", "html")
+# "positional" takes the first sentences of the transcript and of each segment;
+# "ranked" picks them by TextRank score (see podcast_digest.ranking).
+SUMMARY_STRATEGIES = ("positional", "ranked")
+
+
 @dataclass
 class OutputConfig:
-    format: str = "markdown"
+    # A single format or a list, e.g. ["markdown", "json"]; every format is written in one pass.
+    format: Union[str, List[str]] = "markdown"
     output_dir: Path = Path("output")
+    # "append" merges new episodes into an existing day file instead of replacing it.
+    mode: str = "overwrite"
+
+    def __post_init__(self) -> None:
+        self.output_dir = Path(self.output_dir)
+        if self.mode not in OUTPUT_MODES:
+            raise ValueError(f"'output.mode' must be one of {', '.join(OUTPUT_MODES)}")
+        unknown = [name for name in self.formats if name not in OUTPUT_FORMATS]
+        if unknown or not self.formats:
+            raise ValueError(f"'output.format' entries must be among {', '.join(OUTPUT_FORMATS)}")
+
+    @property
+    def formats(self) -> List[str]:
+        names = [self.format] if isinstance(self.format, str) else list(self.format)
+        return list(dict.fromkeys(names))
+
+
+@dataclass
+class HttpCacheConfig:
+    """On-disk Spotify response cache; disabled unless ``directory`` is set."""
+
+    directory: Optional[Path] = None
+    ttl_seconds: float = 0
+    max_bytes: int = 64 * 1024 * 1024
+
+    def __post_init__(self) -> None:
+        if self.directory is not None:
+            self.directory = Path(self.directory)
+
+
+@dataclass
+class SummaryCacheConfig:
+    """Content-addressed summary cache; disabled unless ``directory`` is set."""
+
+    directory: Optional[Path] = None
+    max_bytes: int = 256 * 1024 * 1024
+
+    def __post_init__(self) -> None:
+        if self.directory is not None:
+            self.directory = Path(self.directory)
+
+
+@dataclass
+class EpisodeFetchConfig:
+    """How much of a show's episode list is fetched per run."""
+
+    # Backfill window: stop paging after this many episodes / episodes older than this many days.
+    max_backfill_episodes: Optional[int] = None
+    max_backfill_age_days: Optional[float] = None
+    # Ask for the single newest episode first and skip the show when nothing is newer than its state.
+    probe_latest: bool = True
+    # Episode pages requested ahead of the one being read when backfilling a show without state.
+    prefetch_pages: int = 2
+
+    def __post_init__(self) -> None:
+        if self.max_backfill_episodes is not None and self.max_backfill_episodes < 1:
+            raise ValueError("'max_backfill_episodes' must be at least 1")
+        if self.max_backfill_age_days is not None and self.max_backfill_age_days <= 0:
+            raise ValueError("'max_backfill_age_days' must be positive")
+        if self.prefetch_pages < 0:
+            raise ValueError("'prefetch_pages' must not be negative")
+
+
+@dataclass
+class TranscriptFetchConfig:
+    """How transcripts are loaded while earlier episodes are being summarized."""
+
+    # Episodes per show whose transcripts are loaded ahead of the one being summarized; 0 loads on demand.
+    prefetch: int = 2
+    # Skip a provider that has not answered within this many seconds; no limit unless set.
+    timeout_seconds: Optional[float] = None
+    # Also ask the next provider once the current one has been running this long; off unless set.
+    hedge_after_seconds: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.prefetch < 0:
+            raise ValueError("'transcript_fetch.prefetch' must not be negative")
+        if self.timeout_seconds is not None and self.timeout_seconds <= 0:
+            raise ValueError("'transcript_fetch.timeout_seconds' must be positive")
+        if self.hedge_after_seconds is not None and self.hedge_after_seconds < 0:
+            raise ValueError("'transcript_fetch.hedge_after_seconds' must not be negative")
+
+
+@dataclass
+class NegativeCacheConfig:
+    """Remember transcript misses per provider and re-check them with backoff; disabled unless ``path`` is set."""
+
+    path: Optional[Path] = None
+    # Wait before the first re-check; doubles with every further miss up to ``max_backoff_hours``.
+    ttl_hours: float = 6.0
+    max_backoff_hours: float = 7 * 24.0
+    # Episodes published longer ago than this are not re-checked once they missed.
+    max_age_days: float = 30.0
+
+    def __post_init__(self) -> None:
+        if self.path is not None:
+            self.path = Path(self.path)
+        if self.ttl_hours <= 0 or self.max_backoff_hours < self.ttl_hours:
+            raise ValueError("'negative_cache.ttl_hours' must be positive and at most 'max_backoff_hours'")
+        if self.max_age_days <= 0:
+            raise ValueError("'negative_cache.max_age_days' must be positive")
+
+
+@dataclass
+class LexiconConfig:
+    """Cue phrases that mark action items and open questions (case-insensitive substrings)."""
+
+    action: List[str] = field(default_factory=lambda: list(DEFAULT_ACTION_PHRASES))
+    # Sentences ending in "?" are always open questions; these phrases add more.
+    question: List[str] = field(default_factory=lambda: list(DEFAULT_QUESTION_PHRASES))
+    quote_max_chars: int = QUOTE_MAX_CHARS
+
+    def __post_init__(self) -> None:
+        if isinstance(self.action, str) or isinstance(self.question, str):
+            raise ValueError("'lexicons' phrases must be lists")
+        if self.quote_max_chars < 1:
+            raise ValueError("'quote_max_chars' must be at least 1")
+
+
+@dataclass
+class BoilerplateConfig:
+    """Strip intros, outros and ad reads that recur across a show's episodes; disabled unless ``directory`` is set."""
+
+    directory: Optional[Path] = None
+    # A sentence is dropped once near-duplicates of it appeared in this many earlier episodes.
+    min_episodes: int = 2
+    # Episodes per show kept in the index.
+    history_episodes: int = 20
+
+    def __post_init__(self) -> None:
+        if self.directory is not None:
+            self.directory = Path(self.directory)
+        if self.min_episodes < 1:
+            raise ValueError("'boilerplate.min_episodes' must be at least 1")
+        if self.history_episodes < self.min_episodes:
+            raise ValueError("'boilerplate.history_episodes' must be at least 'min_episodes'")
+
+
+@dataclass
+class LLMConfig:
+    """Local LLM summarizer (Ollama-compatible API); the deterministic summarizer is used when disabled."""
+
+    enabled: bool = False
+    base_url: str = "http://localhost:11434"
+    model: str = "llama2"
+    # Transcript window per map request, in estimated tokens; keep it well below the model's context.
+    chunk_tokens: int = 1500
+    # Concurrent requests across all shows; match the server's OLLAMA_NUM_PARALLEL.
+    max_in_flight: int = 2
+    timeout_seconds: float = 120.0
+    # Responses cached by prompt hash; disabled unless set.
+    cache_directory: Optional[Path] = None
+    cache_max_bytes: int = 64 * 1024 * 1024
+
+    def __post_init__(self) -> None:
+        if self.cache_directory is not None:
+            self.cache_directory = Path(self.cache_directory)
+        if self.chunk_tokens < 64:
+            raise ValueError("'llm.chunk_tokens' must be at least 64")
+        if self.max_in_flight < 1:
+            raise ValueError("'llm.max_in_flight' must be at least 1")
+
+
+@dataclass
+class DaemonConfig:
+    """Schedule for ``serve``: adaptive per-show polling and periodic digest flushes."""
+
+    flush_interval_minutes: float = 60.0
+    min_poll_minutes: float = 15.0
+    max_poll_hours: float = 24.0
+    # Used until a show has two releases to measure its cadence from.
+    default_poll_minutes: float = 60.0
+    # Polls per typical release gap once a show's next episode is overdue.
+    polls_per_release: int = 8
+
+    def __post_init__(self) -> None:
+        if self.flush_interval_minutes <= 0 or self.min_poll_minutes <= 0 or self.default_poll_minutes <= 0:
+            raise ValueError("'daemon' intervals must be positive")
+        if self.max_poll_hours * 60 < self.min_poll_minutes:
+            raise ValueError("'daemon.max_poll_hours' must not be shorter than 'min_poll_minutes'")
+        if self.polls_per_release < 1:
+            raise ValueError("'daemon.polls_per_release' must be at least 1")
 
 
 @dataclass
@@ -38,6 +230,23 @@ class DigestConfig:
     state_file: Path = Path("data/state.json")
     transcript_cache: Path = Path("data/transcripts")
     timezone: str = "UTC"
+    max_concurrency: int = 1
+    streaming_summaries: bool = False
+    summary_workers: int = 1
+    summary_strategy: str = "positional"
+    http_cache: HttpCacheConfig = field(default_factory=HttpCacheConfig)
+    summary_cache: SummaryCacheConfig = field(default_factory=SummaryCacheConfig)
+    episode_fetch: EpisodeFetchConfig = field(default_factory=EpisodeFetchConfig)
+    transcript_fetch: TranscriptFetchConfig = field(default_factory=TranscriptFetchConfig)
+    negative_cache: NegativeCacheConfig = field(default_factory=NegativeCacheConfig)
+    lexicons: LexiconConfig = field(default_factory=LexiconConfig)
+    llm: LLMConfig = field(default_factory=LLMConfig)
+    boilerplate: BoilerplateConfig = field(default_factory=BoilerplateConfig)
+    daemon: DaemonConfig = field(default_factory=DaemonConfig)
+    # Write per-stage timings next to the digest (<date>.metrics.json and podcast_digest.prom).
+    metrics: bool = False
+    # ``(index, count)`` from ``run --shard i/N``: process only this shard's shows.
+    shard: Optional[Tuple[int, int]] = None
 
 
 def load_config(path: Path) -> DigestConfig:
@@ -57,6 +266,26 @@ def load_config(path: Path) -> DigestConfig:
     state_file = Path(raw.get("state_file", "data/state.json"))
     transcript_cache = Path(raw.get("transcript_cache", "data/transcripts"))
     timezone = raw.get("timezone", "UTC")
+    max_concurrency = int(raw.get("max_concurrency", 1))
+    if max_concurrency < 1:
+        raise ValueError("'max_concurrency' must be at least 1")
+    streaming_summaries = bool(raw.get("streaming_summaries", False))
+    summary_workers = int(raw.get("summary_workers", 1))
+    summary_strategy = raw.get("summary_strategy", "positional")
+    if summary_strategy not in SUMMARY_STRATEGIES:
+        raise ValueError(f"'summary_strategy' must be one of {', '.join(SUMMARY_STRATEGIES)}")
+    if summary_workers < 0:
+        raise ValueError("'summary_workers' must be 0 (all cores) or a positive count")
+    http_cache = HttpCacheConfig(**raw.get("http_cache", {}))
+    summary_cache = SummaryCacheConfig(**raw.get("summary_cache", {}))
+    metrics = bool(raw.get("metrics", False))
+    episode_fetch = EpisodeFetchConfig(**raw.get("episode_fetch", {}))
+    transcript_fetch = TranscriptFetchConfig(**raw.get("transcript_fetch", {}))
+    negative_cache = NegativeCacheConfig(**raw.get("negative_cache", {}))
+    lexicons = LexiconConfig(**raw.get("lexicons", {}))
+    llm = LLMConfig(**raw.get("llm", {}))
+    boilerplate = BoilerplateConfig(**raw.get("boilerplate", {}))
+    daemon = DaemonConfig(**raw.get("daemon", {}))
 
     return DigestConfig(
         shows=shows,
@@ -64,4 +293,18 @@ def load_config(path: Path) -> DigestConfig:
         state_file=state_file,
         transcript_cache=transcript_cache,
         timezone=timezone,
+        max_concurrency=max_concurrency,
+        streaming_summaries=streaming_summaries,
+        summary_workers=summary_workers,
+        summary_strategy=summary_strategy,
+        http_cache=http_cache,
+        summary_cache=summary_cache,
+        episode_fetch=episode_fetch,
+        transcript_fetch=transcript_fetch,
+        negative_cache=negative_cache,
+        lexicons=lexicons,
+        llm=llm,
+        boilerplate=boilerplate,
+        daemon=daemon,
+        metrics=metrics,
     )
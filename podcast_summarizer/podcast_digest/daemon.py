@@ -0,0 +1,183 @@
+"""Long-running ``serve`` mode: adaptive per-show polling with periodic digest flushes.
+
+Each show is polled on its own schedule derived from its release cadence. Right after a
+release the next poll is far away; the interval halves as the expected next release
+approaches, and once a show is overdue it is polled ``polls_per_release`` times per typical
+gap. All intervals are clamped to ``[min_poll_minutes, max_poll_hours]``.
+
+New episodes are summarized as soon as they are found and buffered; every
+``flush_interval_minutes`` the buffer is written to the day's digest in append mode and
+state is committed.
+"""
+from __future__ import annotations
+
+import logging
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from podcast_digest import metrics
+from podcast_digest.config import DaemonConfig, DigestConfig
+from podcast_digest.digest import DigestRunner, ShowOutcomes
+from podcast_digest.models import Episode, EpisodeOutcome
+
+LOGGER = logging.getLogger(__name__)
+
+# Release times remembered per show for the cadence estimate.
+CADENCE_SAMPLE = 10
+
+PollShow = Callable[[str, Optional[datetime]], ShowOutcomes]
+RecentReleases = Callable[[str, int], List[datetime]]
+
+
+@dataclass
+class ShowSchedule:
+    show_id: str
+    releases: List[datetime] = field(default_factory=list)
+    next_poll: datetime = datetime.min
+    polls: int = 0
+
+    def observe(self, published: Iterable[datetime]) -> None:
+        self.releases = sorted(set(self.releases).union(published))[-CADENCE_SAMPLE:]
+
+    def typical_gap(self) -> Optional[timedelta]:
+        gaps = [later - earlier for earlier, later in zip(self.releases, self.releases[1:])]
+        return statistics.median(gaps) if gaps else None
+
+    def interval(self, now: datetime, config: DaemonConfig) -> timedelta:
+        gap = self.typical_gap()
+        if gap is None:
+            wait = timedelta(minutes=config.default_poll_minutes)
+        else:
+            expected = self.releases[-1] + gap
+            wait = (expected - now) / 2 if now < expected else gap / config.polls_per_release
+        return min(max(wait, timedelta(minutes=config.min_poll_minutes)), timedelta(hours=config.max_poll_hours))
+
+
+class DigestDaemon:
+    """Polls shows when they are due and flushes buffered outcomes into the digest."""
+
+    def __init__(
+        self,
+        config: DigestConfig,
+        runner: DigestRunner,
+        show_ids: List[str],
+        poll_show: PollShow,
+        recent_releases: Optional[RecentReleases] = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        self.config = config
+        self.runner = runner
+        self.show_ids = show_ids
+        self.poll_show = poll_show
+        self.recent_releases = recent_releases
+        self.clock = clock
+        self.schedules = {show_id: ShowSchedule(show_id) for show_id in show_ids}
+        # Outcomes found since the last flush, per show, and the newest release among them.
+        self.pending: Dict[str, Tuple[List[Episode], List[EpisodeOutcome]]] = {}
+        self.pending_since: Dict[str, datetime] = {}
+        self.next_flush = clock() + timedelta(minutes=config.daemon.flush_interval_minutes)
+        self._stop = threading.Event()
+
+    def seed(self) -> None:
+        """Learn each show's cadence from its newest releases (one request per show)."""
+
+        if self.recent_releases is None:
+            return
+        with ThreadPoolExecutor(max_workers=self.config.max_concurrency, thread_name_prefix="digest-seed") as pool:
+            for show_id, releases in zip(self.show_ids, pool.map(self._sample, self.show_ids)):
+                self.schedules[show_id].observe(releases)
+
+    def _sample(self, show_id: str) -> List[datetime]:
+        try:
+            return self.recent_releases(show_id, CADENCE_SAMPLE)
+        except Exception:
+            LOGGER.exception("Could not fetch release history for %s", show_id)
+            return []
+
+    def _poll(self, show_id: str) -> Optional[ShowOutcomes]:
+        try:
+            return self.poll_show(show_id, self.pending_since.get(show_id))
+        except Exception:
+            LOGGER.exception("Polling %s failed", show_id)
+            return None
+
+    def poll_due(self) -> int:
+        now = self.clock()
+        due = [show_id for show_id in self.show_ids if self.schedules[show_id].next_poll <= now]
+        if not due:
+            return 0
+        # The runner lives as long as the daemon; pick up transcripts written since the last poll.
+        try:
+            self.runner.transcript_provider.refresh()
+        except OSError:
+            LOGGER.exception("Could not refresh the transcript index")
+        if self.config.max_concurrency <= 1:
+            results = [self._poll(show_id) for show_id in due]
+        else:
+            with ThreadPoolExecutor(max_workers=self.config.max_concurrency, thread_name_prefix="digest-show") as pool:
+                results = list(pool.map(self._poll, due))
+        for show_id, result in zip(due, results):
+            schedule = self.schedules[show_id]
+            schedule.polls += 1
+            if result is None:
+                schedule.next_poll = now + timedelta(minutes=self.config.daemon.min_poll_minutes)
+                continue
+            _, episodes, outcomes = result
+            if episodes:
+                schedule.observe(episode.published_at for episode in episodes)
+                buffered_episodes, buffered_outcomes = self.pending.setdefault(show_id, ([], []))
+                buffered_episodes.extend(episodes)
+                buffered_outcomes.extend(outcomes)
+                self.pending_since[show_id] = max(episode.published_at for episode in buffered_episodes)
+                LOGGER.info("Found %d new episode(s) for %s", len(episodes), show_id)
+            schedule.next_poll = now + schedule.interval(now, self.config.daemon)
+        return len(due)
+
+    def flush(self) -> None:
+        """Write buffered outcomes into today's digest and commit state."""
+
+        self.next_flush = self.clock() + timedelta(minutes=self.config.daemon.flush_interval_minutes)
+        if not self.pending:
+            return
+        ordered = [(show_id, *self.pending[show_id]) for show_id in self.show_ids if show_id in self.pending]
+        try:
+            document = self.runner.run(ordered)
+        except Exception:
+            # Nothing was committed; keep the buffer and try again at the next flush.
+            LOGGER.exception("Writing the digest failed; retrying %d show(s) at the next flush", len(ordered))
+            return
+        self.pending.clear()
+        self.pending_since.clear()
+        LOGGER.info("Digest updated at %s", document.output_path)
+        recorder = metrics.recorder()
+        if recorder is not None:
+            counts = {
+                "episodes_total": document.total_new_episodes,
+                "episodes_summarized": document.summarized_count,
+                "episodes_unavailable": document.unavailable_count,
+            }
+            recorder.write(self.config.output.output_dir, document.date, counts)
+
+    def step(self) -> float:
+        """Run whatever is due; return the seconds until the next poll or flush."""
+
+        self.poll_due()
+        if self.clock() >= self.next_flush:
+            self.flush()
+        upcoming = min([*(schedule.next_poll for schedule in self.schedules.values()), self.next_flush])
+        return max((upcoming - self.clock()).total_seconds(), 0.0)
+
+    def serve(self) -> None:
+        self.seed()
+        try:
+            while not self._stop.is_set():
+                self._stop.wait(self.step())
+        finally:
+            self.flush()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -1,76 +1,332 @@
 """Digest orchestration."""
 from __future__ import annotations
 
+import hashlib
 import logging
-from datetime import datetime
-from typing import List
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+from podcast_digest import metrics, profiling
+from podcast_digest.boilerplate import BoilerplateFilter, BoilerplateIndex
 from podcast_digest.config import DigestConfig
-from podcast_digest.models import DigestDocument, Episode
+from podcast_digest.features import DEFAULT_EXTRACTOR, FeatureExtractor
+from podcast_digest.llm import LLMSummarizer, LLMUnavailableError, load_llm_summarizer
+from podcast_digest.models import DigestDocument, Episode, EpisodeOutcome, EpisodeSummary, TranscriptResult
 from podcast_digest.renderer import (
-    build_document,
     render_daily_overview,
     render_episode,
+    render_error,
     render_unavailable,
+    summarize_stream,
     summarize_transcript,
-    write_document,
 )
-from podcast_digest.state import StateStore
-from podcast_digest.transcripts import load_provider
+from podcast_digest.state import open_state_store
+from podcast_digest.summary_cache import SummaryCache
+from podcast_digest.transcripts import NegativeCache, TranscriptProvider, load_provider
+from podcast_digest.writer import WRITERS, DigestWriter, ShardDigestWriter
 
 LOGGER = logging.getLogger(__name__)
 
+ShowOutcomes = Tuple[str, List[Episode], List[EpisodeOutcome]]
+
+
+def summarize_and_render(
+    episode: Episode,
+    transcript_text: str,
+    strategy: str = "positional",
+    features: FeatureExtractor = DEFAULT_EXTRACTOR,
+) -> Tuple[EpisodeSummary, str]:
+    """Process-pool entry point; kept at module level so it can be pickled."""
+
+    with metrics.span("summarize"):
+        summary = summarize_transcript(episode, transcript_text, strategy, features)
+    with metrics.span("render"):
+        return summary, render_episode(summary)
+
 
 class DigestRunner:
-    def __init__(self, config: DigestConfig) -> None:
+    """Summarizes episodes and writes the digest.
+
+    ``remote_providers`` are asked, in order, for transcripts missing from the local cache;
+    only they are subject to the configured negative cache.
+    """
+
+    def __init__(self, config: DigestConfig, remote_providers: Sequence[TranscriptProvider] = ()) -> None:
         self.config = config
-        self.state = StateStore(config.state_file)
-        self.transcript_provider = load_provider(config.transcript_cache)
+        lexicons = config.lexicons
+        self.features = FeatureExtractor(lexicons.action, lexicons.question, lexicons.quote_max_chars)
+        self.state = open_state_store(config.state_file)
+        self.negative_cache: Optional[NegativeCache] = None
+        if config.negative_cache.path and not remote_providers:
+            LOGGER.warning("negative_cache.path is set but no remote transcript providers are configured; ignoring it")
+        elif config.negative_cache.path:
+            self.negative_cache = NegativeCache(
+                config.negative_cache.path,
+                ttl=timedelta(hours=config.negative_cache.ttl_hours),
+                max_backoff=timedelta(hours=config.negative_cache.max_backoff_hours),
+                max_age=timedelta(days=config.negative_cache.max_age_days),
+            )
+        fetch = config.transcript_fetch
+        self.transcript_provider = load_provider(
+            config.transcript_cache,
+            timeout=fetch.timeout_seconds,
+            hedge_after=fetch.hedge_after_seconds,
+            negative_cache=self.negative_cache,
+            remote=remote_providers,
+        )
+        self.boilerplate: Optional[BoilerplateIndex] = None
+        if config.boilerplate.directory:
+            self.boilerplate = BoilerplateIndex(
+                config.boilerplate.directory,
+                min_episodes=config.boilerplate.min_episodes,
+                history_episodes=config.boilerplate.history_episodes,
+            )
+            self.transcript_provider = BoilerplateFilter(self.transcript_provider, self.boilerplate)
+        self.summary_cache: Optional[SummaryCache] = None
+        if config.summary_cache.directory:
+            self.summary_cache = SummaryCache(config.summary_cache.directory, max_bytes=config.summary_cache.max_bytes)
+            if config.streaming_summaries:
+                LOGGER.info("Streamed transcripts are written to the summary cache but always re-summarized")
+        self.llm: Optional[LLMSummarizer] = load_llm_summarizer(config.llm) if config.llm.enabled else None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _summary_pool(self) -> Optional[ProcessPoolExecutor]:
+        workers = self.config.summary_workers or os.cpu_count() or 1
+        # LLM summaries wait on HTTP, which the show threads already overlap.
+        if workers <= 1 or self.llm is not None:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned workers: forking while the show threads hold locks is not safe.
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        if self.llm is not None:
+            self.llm.close()
+        self.transcript_provider.close()
+        self.state.close()
+
+    def _cached_summary(self, cache_key: Optional[str]) -> Optional[Tuple[EpisodeSummary, str]]:
+        if self.summary_cache is None or cache_key is None:
+            return None
+        return self.summary_cache.get(cache_key)
+
+    def _cache_key(self, episode: Episode, transcript_text: str, strategy: Optional[str] = None) -> Optional[str]:
+        if self.summary_cache is None:
+            return None
+        return SummaryCache.key(episode, transcript_text, strategy or self.config.summary_strategy, self.features)
+
+    def _store_summary(self, cache_key: Optional[str], summary: EpisodeSummary, markdown: str) -> None:
+        if self.summary_cache is not None and cache_key is not None:
+            self.summary_cache.put(cache_key, summary, markdown)
+
+    def _summarize_with_llm(self, episode: Episode, transcript_text: str) -> Optional[Tuple[EpisodeSummary, str]]:
+        cache_key = self._cache_key(episode, transcript_text, self.llm.cache_tag)
+        cached = self._cached_summary(cache_key)
+        if cached is not None:
+            return cached
+        try:
+            with profiling.episode_timer(episode, len(transcript_text)), metrics.span("summarize"):
+                summary = self.llm.summarize(episode, transcript_text)
+        except LLMUnavailableError as exc:
+            LOGGER.debug("LLM summary of %s failed: %s", episode.id, exc)
+            return None
+        with metrics.span("render"):
+            markdown = render_episode(summary)
+        # Only LLM results are stored under the LLM key, so fallbacks are retried on the next run.
+        self._store_summary(cache_key, summary, markdown)
+        return summary, markdown
+
+    def summarize_episode(self, episode: Episode, transcript_text: str) -> EpisodeOutcome:
+        if self.llm is not None:
+            result = self._summarize_with_llm(episode, transcript_text)
+            if result is not None:
+                summary, markdown = result
+                return EpisodeOutcome(episode=episode, status="summarized", markdown=markdown, summary=summary)
+        cache_key = self._cache_key(episode, transcript_text)
+        cached = self._cached_summary(cache_key)
+        if cached is None:
+            with profiling.episode_timer(episode, len(transcript_text)):
+                cached = summarize_and_render(episode, transcript_text, self.config.summary_strategy, self.features)
+            self._store_summary(cache_key, *cached)
+        summary, markdown = cached
+        return EpisodeOutcome(episode=episode, status="summarized", markdown=markdown, summary=summary)
+
+    def summarize_episode_stream(self, episode: Episode, chunks: Iterable[str]) -> EpisodeOutcome:
+        if self.llm is not None:
+            # Map-reduce needs the whole transcript to plan its windows.
+            return self.summarize_episode(episode, "".join(chunks))
+        # The transcript hash is only known once the stream is consumed, so a streamed episode
+        # can be stored in the summary cache but not served from it.
+        hasher = hashlib.sha256() if self.summary_cache is not None else None
+
+        def hashed(stream: Iterable[str]) -> Iterator[str]:
+            for chunk in stream:
+                hasher.update(chunk.encode("utf-8"))
+                yield chunk
+
+        # Chunks are read lazily, so for streamed transcripts this span includes the reads.
+        with profiling.episode_timer(episode) as timer:
+            with metrics.span("summarize"):
+                stream = hashed(chunks) if hasher is not None else chunks
+                summary = summarize_stream(episode, timer.count(stream), self.config.summary_strategy, self.features)
+            with metrics.span("render"):
+                markdown = render_episode(summary)
+        if hasher is not None:
+            cache_key = SummaryCache.key_for_digest(
+                episode, hasher.hexdigest(), self.config.summary_strategy, self.features
+            )
+            self._store_summary(cache_key, summary, markdown)
+        return EpisodeOutcome(episode=episode, status="summarized", markdown=markdown, summary=summary)
 
     def process_episode(self, episode: Episode, transcript_text: str) -> str:
-        summary = summarize_transcript(episode, transcript_text)
-        return render_episode(summary)
+        return self.summarize_episode(episode, transcript_text).markdown
+
+    def process_episode_stream(self, episode: Episode, chunks: Iterable[str]) -> str:
+        return self.summarize_episode_stream(episode, chunks).markdown
 
     def handle_unavailable(self, episode: Episode) -> str:
         return render_unavailable(episode)
 
-    def build_daily_overview(self, sections: List[str], stats: dict) -> str:
+    def unavailable_outcome(self, episode: Episode) -> EpisodeOutcome:
+        return EpisodeOutcome(episode=episode, status="unavailable", markdown=render_unavailable(episode))
+
+    def error_outcome(self, episode: Episode, error: Optional[str]) -> EpisodeOutcome:
+        return EpisodeOutcome(episode=episode, status="error", markdown=render_error(episode, error), error=error)
+
+    def process_transcripts(self, items: Iterable[Tuple[Episode, TranscriptResult]]) -> List[EpisodeOutcome]:
+        """Produce one outcome per episode, in input order.
+
+        With ``summary_workers`` other than 1, full-text transcripts are summarized and rendered
+        in a process pool; streamed transcripts are consumed in-process as they arrive.
+        """
+
+        pool = self._summary_pool()
+        pending: List[Union[EpisodeOutcome, Tuple[Episode, Optional[str], int, Future]]] = []
+        for episode, result in items:
+            if result.status == "available" and result.chunks is not None:
+                pending.append(self.summarize_episode_stream(episode, result.chunks))
+            elif result.status == "available" and result.text:
+                if pool is None:
+                    pending.append(self.summarize_episode(episode, result.text))
+                    continue
+                cache_key = self._cache_key(episode, result.text)
+                cached = self._cached_summary(cache_key)
+                if cached is not None:
+                    summary, markdown = cached
+                    pending.append(EpisodeOutcome(episode=episode, status="summarized", markdown=markdown, summary=summary))
+                else:
+                    future = pool.submit(
+                        summarize_and_render, episode, result.text, self.config.summary_strategy, self.features
+                    )
+                    pending.append((episode, cache_key, len(result.text), future))
+            elif result.status == "error":
+                pending.append(self.error_outcome(episode, result.error))
+            else:
+                pending.append(self.unavailable_outcome(episode))
+
+        outcomes: List[EpisodeOutcome] = []
+        for item in pending:
+            if isinstance(item, tuple):
+                episode, cache_key, chars, future = item
+                # Pool workers run in other processes; only the wait for their result is timed here.
+                with profiling.episode_timer(episode, chars), metrics.span("summary_pool_wait"):
+                    summary, markdown = future.result()
+                self._store_summary(cache_key, summary, markdown)
+                item = EpisodeOutcome(episode=episode, status="summarized", markdown=markdown, summary=summary)
+            outcomes.append(item)
+        return outcomes
+
+    def overview_text(self, stats: dict) -> str:
         if stats["summarized"] == 0:
-            overview = "No new transcripts were available today."
-        else:
-            overview = f"Generated summaries for {stats['summarized']} episodes across {stats['total']} new releases."
-        return render_daily_overview(datetime.utcnow(), overview, stats)
-
-    def run(self, episodes_by_show: List[tuple[str, List[Episode], List[str]]]) -> DigestDocument:
-        date = datetime.utcnow()
-        show_sections: List[str] = []
+            return "No new transcripts were available today."
+        return f"Generated summaries for {stats['summarized']} episodes across {stats['total']} new releases."
+
+    def build_daily_overview(self, sections: List[str], stats: dict) -> str:
+        return render_daily_overview(datetime.utcnow(), self.overview_text(stats), stats)
+
+    def writer_names(self) -> List[str]:
+        return ["shard"] if self.config.shard else list(self.config.output.formats)
+
+    def open_writers(self, date: datetime) -> List[DigestWriter]:
+        append = self.config.output.mode == "append"
+        output_dir = self.config.output.output_dir
+        if self.config.shard:
+            # Shard workers only write their sections; ``merge`` renders the configured formats.
+            return [ShardDigestWriter(output_dir, date, append=append, shard=self.config.shard)]
+        return [WRITERS[name](output_dir, date, append=append) for name in self.config.output.formats]
+
+    def run(self, episodes_by_show: Iterable[ShowOutcomes], date: Optional[datetime] = None) -> DigestDocument:
+        """Write the digest in every configured format, streaming each show as soon as it is available.
+
+        ``episodes_by_show`` may be a lazy iterable (e.g. ``Executor.map`` results), in which
+        case earlier shows are written while later ones are still being processed. Each
+        outcome is visited once and handed to all format writers. ``date`` picks the day
+        file and defaults to now (UTC).
+        """
+
+        date = date or datetime.utcnow()
+        shows: List[str] = []
+        total_new = 0
         summarized = 0
         unavailable = 0
 
-        for show_id, episodes, rendered in episodes_by_show:
-            if not episodes:
-                continue
-            show_sections.append(f"## {episodes[0].show_name}\n")
-            for block, episode in zip(rendered, episodes):
-                show_sections.append(block)
-                self.state.update_last_processed(show_id, episode.published_at)
-                if "Transcript unavailable" in block:
-                    unavailable += 1
-                else:
-                    summarized += 1
+        # State is committed once, and only after the digest has been written.
+        with self.state.transaction():
+            writers = self.open_writers(date)
+            primary = writers[0]
+            try:
+                for show_id, episodes, outcomes in episodes_by_show:
+                    if not episodes:
+                        continue
+                    show_name = episodes[0].show_name
+                    shows.append(show_name)
+                    for episode in episodes:
+                        self.state.update_last_processed(show_id, episode.published_at)
+                    with metrics.show_scope(show_id), metrics.span("write_show"):
+                        for writer in writers[1:]:
+                            writer.write_show(show_id, show_name, outcomes)
+                        new_outcomes = primary.write_show(show_id, show_name, outcomes)
+                    for outcome in new_outcomes:
+                        total_new += 1
+                        if outcome.summarized:
+                            summarized += 1
+                        else:
+                            unavailable += 1
 
-        total_new = len([ep for _, eps, _ in episodes_by_show for ep in eps])
-        stats = {"total": total_new, "summarized": summarized, "unavailable": unavailable}
-        daily_overview = self.build_daily_overview(show_sections, stats)
-        content = "\n".join([daily_overview, *show_sections])
-        output_path = write_document(content, self.config.output.output_dir, date)
+                previous = primary.previous_stats
+                stats = {
+                    "total": previous["total"] + total_new,
+                    "summarized": previous["summarized"] + summarized,
+                    "unavailable": previous["unavailable"] + unavailable,
+                }
+                overview = self.overview_text(stats)
+                with metrics.span("write_document"):
+                    output_paths = {
+                        name: writer.finalize(overview, stats) for name, writer in zip(self.writer_names(), writers)
+                    }
+            except BaseException:
+                for writer in writers:
+                    writer.abort()
+                raise
 
         return DigestDocument(
             date=date,
             total_new_episodes=total_new,
             summarized_count=summarized,
             unavailable_count=unavailable,
-            overview=daily_overview,
-            show_sections=show_sections,
-            output_path=output_path,
+            overview=render_daily_overview(date, overview, stats),
+            shows=shows,
+            output_path=output_paths[self.writer_names()[0]],
+            output_paths=output_paths,
         )
@@ -0,0 +1,99 @@
+"""Single-pass sentence classification for quotes, action items and open questions."""
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Dict, Iterable, Optional, Sequence
+
+# Cue phrases are matched as case-insensitive substrings, so "try" also matches "entry".
+DEFAULT_ACTION_PHRASES = ("should", "try", "plan", "recommend")
+DEFAULT_QUESTION_PHRASES: Sequence[str] = ()
+# Sentences shorter than this are quote candidates.
+QUOTE_MAX_CHARS = 180
+
+QUOTE = 1
+ACTION = 2
+QUESTION = 4
+ALL_FEATURES = QUOTE | ACTION | QUESTION
+
+
+def _trie_pattern(phrases: Iterable[str]) -> Optional[str]:
+    """Compile phrases into one prefix-factored alternation.
+
+    ``(?:sh(?:ould|ip)|try)`` rather than ``should|ship|try``: at each position the regex
+    engine follows a single branch per character, so matching cost depends on the
+    phrase length rather than the number of phrases.
+    """
+
+    trie: Dict[str, Dict] = {}
+    for phrase in phrases:
+        if not phrase:
+            continue
+        node = trie
+        for char in phrase.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}
+    if not trie:
+        return None
+
+    def render(node: Dict[str, Dict]) -> str:
+        # A phrase ending here already matched; longer phrases sharing the prefix add nothing to search().
+        if "" in node:
+            return ""
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return render(trie)
+
+
+class FeatureExtractor:
+    """Classifies a sentence as quote / action item / open question with one regex search per lexicon."""
+
+    def __init__(
+        self,
+        action_phrases: Sequence[str] = DEFAULT_ACTION_PHRASES,
+        question_phrases: Sequence[str] = DEFAULT_QUESTION_PHRASES,
+        quote_max_chars: int = QUOTE_MAX_CHARS,
+    ) -> None:
+        self.action_phrases = tuple(action_phrases)
+        self.question_phrases = tuple(question_phrases)
+        self.quote_max_chars = quote_max_chars
+        action = _trie_pattern(self.action_phrases)
+        question = _trie_pattern(self.question_phrases)
+        # Patterns hold lower-cased phrases and run against the lower-cased sentence: cheaper than
+        # re.IGNORECASE, and exactly the ``phrase in sentence.lower()`` semantics.
+        self._action = re.compile(action) if action else None
+        self._question = re.compile(question) if question else None
+
+    @property
+    def is_default(self) -> bool:
+        return (
+            self.action_phrases == DEFAULT_ACTION_PHRASES
+            and tuple(self.question_phrases) == tuple(DEFAULT_QUESTION_PHRASES)
+            and self.quote_max_chars == QUOTE_MAX_CHARS
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Short stable id of the lexicons, used to key cached summaries."""
+
+        raw = "\x1f".join([*self.action_phrases, "\x1e", *self.question_phrases, "\x1e", str(self.quote_max_chars)])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+    def classify(self, sentence: str, wanted: int = ALL_FEATURES) -> int:
+        """Return a bit mask of ``QUOTE``, ``ACTION`` and ``QUESTION``, testing only the ``wanted`` bits."""
+
+        flags = QUOTE if wanted & QUOTE and len(sentence) < self.quote_max_chars else 0
+        if wanted & QUESTION and sentence.endswith("?"):
+            flags |= QUESTION
+            wanted &= ~QUESTION
+        if wanted & (ACTION | QUESTION):
+            lowered = sentence.lower()
+            if wanted & ACTION and self._action is not None and self._action.search(lowered):
+                flags |= ACTION
+            if wanted & QUESTION and self._question is not None and self._question.search(lowered):
+                flags |= QUESTION
+        return flags
+
+
+DEFAULT_EXTRACTOR = FeatureExtractor()
@@ -0,0 +1,94 @@
+"""Conditional-request cache for API responses."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from podcast_digest.cache import DEFAULT_MAX_BYTES, DiskCache
+
+
+@dataclass
+class CachedResponse:
+    body: str
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ResponseCache:
+    """Stores response bodies with their validators and tracks how much traffic they save.
+
+    Entries younger than ``ttl_seconds`` are served without contacting the server;
+    older ones are revalidated with ``If-None-Match`` / ``If-Modified-Since``.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float = 0, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        raw = self.store.get(url)
+        if raw is None:
+            return None
+        try:
+            return CachedResponse(**json.loads(raw))
+        except (ValueError, TypeError):
+            self.store.delete(url)
+            return None
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.stored_at < self.ttl_seconds
+
+    def conditional_headers(self, entry: CachedResponse) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def record_hit(self, entry: CachedResponse, revalidated: bool = False) -> None:
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry.body.encode("utf-8"))
+            if revalidated:
+                self.revalidated += 1
+
+    def store_response(self, url: str, body: str, headers: Dict[str, str]) -> None:
+        with self._lock:
+            self.misses += 1
+        entry = CachedResponse(
+            body=body,
+            stored_at=time.time(),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+        )
+        if entry.etag or entry.last_modified or self.ttl_seconds > 0:
+            self.store.set(url, json.dumps(asdict(entry)).encode("utf-8"))
+
+    def refresh(self, url: str, entry: CachedResponse, headers: Dict[str, str]) -> None:
+        """Restart the TTL of an entry after a 304, picking up any rotated validators."""
+
+        entry.stored_at = time.time()
+        entry.etag = headers.get("etag", entry.etag)
+        entry.last_modified = headers.get("last-modified", entry.last_modified)
+        self.store.set(url, json.dumps(asdict(entry)).encode("utf-8"))
+        self.record_hit(entry, revalidated=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "bytes_saved": self.bytes_saved,
+            "size_bytes": self.store.size,
+        }
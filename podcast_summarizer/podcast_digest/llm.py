@@ -0,0 +1,282 @@
+"""Map-reduce episode summaries from a local LLM behind an Ollama-compatible HTTP API.
+
+A transcript is packed into sentence-aligned windows of at most ``chunk_tokens`` tokens.
+Each window is summarized independently (map), at most ``max_in_flight`` requests at a
+time across all shows, and the window summaries are folded into the episode overview
+(reduce). Responses are cached by prompt hash, so re-running a digest only sends the
+windows that changed.
+
+Any transport failure raises :class:`LLMUnavailableError`; callers fall back to the
+deterministic summarizer in :mod:`podcast_digest.renderer`.
+"""
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from podcast_digest import metrics
+from podcast_digest.cache import DiskCache
+from podcast_digest.config import LLMConfig
+from podcast_digest.models import Episode, EpisodeSummary, SummarySection
+from podcast_digest.renderer import (
+    MAX_ACTION_ITEMS,
+    MAX_OPEN_QUESTIONS,
+    MAX_QUOTES,
+    MAX_TAKEAWAYS,
+    _split_sentences,
+)
+from podcast_digest.transport import ConnectionPool
+
+LOGGER = logging.getLogger(__name__)
+
+# Rough size of a Llama-family token in English text; only used to bound window sizes.
+CHARS_PER_TOKEN = 4
+# After a failed request the endpoint is skipped for this long instead of timing out per episode.
+UNAVAILABLE_COOLDOWN_SECONDS = 60.0
+# Part of every cache key; bump when the prompts change.
+PROMPT_VERSION = "1"
+
+MAP_PROMPT = """You are summarizing one part of a podcast transcript.
+Reply with a JSON object with these keys:
+"summary": two or three sentences on what this part covers,
+"takeaways": up to three key points,
+"quotes": up to two short sentences copied word for word from the text,
+"action_items": concrete things the listener is told to do,
+"open_questions": questions raised but not answered.
+Use empty lists when nothing fits.
+
+Transcript part:
+{text}
+"""
+
+REDUCE_PROMPT = """Below are summaries of consecutive parts of one podcast episode.
+Write a single paragraph of at most five sentences summarizing the whole episode.
+Reply with the paragraph only.
+
+{parts}
+"""
+
+
+class LLMUnavailableError(Exception):
+    """The LLM endpoint could not be reached or returned an unusable response."""
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def chunk_transcript(text: str, max_tokens: int) -> List[str]:
+    """Pack sentences into windows of at most ``max_tokens`` estimated tokens.
+
+    Sentences longer than a window (e.g. unpunctuated transcripts) are split on whitespace.
+    """
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for sentence in _split_sentences(text):
+        pieces = [sentence] if len(sentence) <= budget else _split_words(sentence, budget)
+        for piece in pieces:
+            if current and size + 1 + len(piece) > budget:
+                chunks.append(" ".join(current))
+                current, size = [], 0
+            size += len(piece) + (1 if current else 0)
+            current.append(piece)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _split_words(sentence: str, budget: int) -> List[str]:
+    pieces: List[str] = []
+    current: List[str] = []
+    size = 0
+    for word in sentence.split():
+        if current and size + 1 + len(word) > budget:
+            pieces.append(" ".join(current))
+            current, size = [], 0
+        size += len(word) + (1 if current else 0)
+        current.append(word)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+class OllamaClient:
+    """Minimal client for ``POST /api/generate`` (non-streaming)."""
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        timeout: float = 120.0,
+        transport: Optional[ConnectionPool] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.transport = transport or ConnectionPool(timeout=timeout)
+
+    def generate(self, prompt: str, json_format: bool = False) -> str:
+        payload: Dict = {"model": self.model, "prompt": prompt, "stream": False, "options": {"temperature": 0}}
+        if json_format:
+            payload["format"] = "json"
+        try:
+            resp = self.transport.request(
+                "POST",
+                f"{self.base_url}/api/generate",
+                headers={"Content-Type": "application/json"},
+                body=json.dumps(payload).encode("utf-8"),
+            )
+        except (OSError, http.client.HTTPException) as exc:
+            raise LLMUnavailableError(f"{self.base_url}: {exc}") from exc
+        if resp.status != 200:
+            raise LLMUnavailableError(f"{self.base_url} returned HTTP {resp.status}")
+        try:
+            return json.loads(resp.text)["response"]
+        except (ValueError, KeyError, TypeError) as exc:
+            raise LLMUnavailableError(f"Unreadable response from {self.base_url}") from exc
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def _string_list(value: object) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _parse_chunk(raw: str, chunk: str) -> Dict[str, List[str]]:
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        # Model ignored the JSON instruction; keep its text as the part summary.
+        return {"summary": [raw.strip()], "takeaways": [], "quotes": [], "action_items": [], "open_questions": []}
+    summary = data.get("summary")
+    return {
+        "summary": [str(summary).strip()] if summary else [],
+        "takeaways": _string_list(data.get("takeaways")),
+        # Only quotes that really occur in the transcript; models paraphrase.
+        "quotes": [quote for quote in _string_list(data.get("quotes")) if quote in chunk],
+        "action_items": _string_list(data.get("action_items")),
+        "open_questions": _string_list(data.get("open_questions")),
+    }
+
+
+def _merge(parts: List[Dict[str, List[str]]], key: str, limit: int) -> List[str]:
+    merged = dict.fromkeys(item for part in parts for item in part[key])
+    return list(merged)[:limit]
+
+
+class LLMSummarizer:
+    """Summarizes episodes with map-reduce over transcript windows; safe to share across threads."""
+
+    def __init__(
+        self,
+        client: OllamaClient,
+        chunk_tokens: int = 1500,
+        max_in_flight: int = 2,
+        cache: Optional[DiskCache] = None,
+    ) -> None:
+        self.client = client
+        self.chunk_tokens = chunk_tokens
+        self.cache = cache
+        # The semaphore bounds requests from every thread; the executor only fans out the map step.
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm")
+        self._unavailable_until = 0.0
+
+    @property
+    def cache_tag(self) -> str:
+        """Distinguishes LLM summaries from deterministic ones in the summary cache."""
+
+        return f"llm-{self.client.model}-{PROMPT_VERSION}"
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        self.client.close()
+
+    def _generate(self, prompt: str, json_format: bool = False) -> str:
+        key = hashlib.sha256(f"{self.client.model}\0{PROMPT_VERSION}\0{json_format}\0{prompt}".encode("utf-8")).hexdigest()
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached.decode("utf-8")
+        if time.monotonic() < self._unavailable_until:
+            raise LLMUnavailableError("endpoint unavailable, cooling down")
+        try:
+            with self._slots, metrics.span("llm_request"):
+                response = self.client.generate(prompt, json_format)
+        except LLMUnavailableError as exc:
+            if time.monotonic() >= self._unavailable_until:
+                LOGGER.warning(
+                    "LLM endpoint unavailable (%s); using the deterministic summarizer for %.0fs",
+                    exc,
+                    UNAVAILABLE_COOLDOWN_SECONDS,
+                )
+            self._unavailable_until = time.monotonic() + UNAVAILABLE_COOLDOWN_SECONDS
+            raise
+        if self.cache is not None:
+            self.cache.set(key, response.encode("utf-8"))
+        return response
+
+    def _map_chunk(self, chunk: str) -> Dict[str, List[str]]:
+        return _parse_chunk(self._generate(MAP_PROMPT.format(text=chunk), json_format=True), chunk)
+
+    def _reduce(self, summaries: List[str]) -> str:
+        if len(summaries) <= 1:
+            return summaries[0] if summaries else ""
+        # Group summaries into windows (at least two per group, so every round shrinks the list).
+        budget = self.chunk_tokens * CHARS_PER_TOKEN
+        groups: List[List[str]] = [[]]
+        size = 0
+        for summary in summaries:
+            if len(groups[-1]) >= 2 and size + len(summary) > budget:
+                groups.append([])
+                size = 0
+            groups[-1].append(summary)
+            size += len(summary)
+        prompts = [
+            REDUCE_PROMPT.format(parts="\n\n".join(f"Part {idx}: {text}" for idx, text in enumerate(group, start=1)))
+            for group in groups
+        ]
+        if len(prompts) == 1:
+            return self._generate(prompts[0]).strip()
+        return self._reduce([text.strip() for text in self._executor.map(self._generate, prompts)])
+
+    def summarize(self, episode: Episode, transcript_text: str) -> EpisodeSummary:
+        """Summarize one episode; raises :class:`LLMUnavailableError` if the endpoint fails."""
+
+        chunks = chunk_transcript(transcript_text, self.chunk_tokens)
+        parts = list(self._executor.map(self._map_chunk, chunks))
+        summaries = [part["summary"][0] for part in parts if part["summary"]]
+        overview = self._reduce(summaries) or "Transcript provided no readable content."
+        segments = [
+            SummarySection(heading=f"Segment {idx}", body=part["summary"][0])
+            for idx, part in enumerate(parts, start=1)
+            if part["summary"]
+        ]
+        return EpisodeSummary(
+            episode=episode,
+            overview=overview,
+            segments=segments,
+            takeaways=_merge(parts, "takeaways", MAX_TAKEAWAYS),
+            quotes=_merge(parts, "quotes", MAX_QUOTES),
+            action_items=_merge(parts, "action_items", MAX_ACTION_ITEMS),
+            open_questions=_merge(parts, "open_questions", MAX_OPEN_QUESTIONS),
+        )
+
+
+def load_llm_summarizer(config: LLMConfig) -> LLMSummarizer:
+    client = OllamaClient(config.base_url, config.model, timeout=config.timeout_seconds)
+    cache = DiskCache(config.cache_directory, max_bytes=config.cache_max_bytes) if config.cache_directory else None
+    return LLMSummarizer(client, chunk_tokens=config.chunk_tokens, max_in_flight=config.max_in_flight, cache=cache)
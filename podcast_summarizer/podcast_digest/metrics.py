@@ -0,0 +1,211 @@
+"""Per-stage timing spans with JSON and Prometheus textfile export.
+
+Instrumentation is off unless :func:`enable` installs a recorder. While disabled,
+:func:`span` returns one shared no-op context manager, so instrumented code pays a
+global lookup and nothing else.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds, as in the Prometheus client's default histogram.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_FILE = "podcast_digest.prom"
+METRIC_PREFIX = "podcast_digest"
+
+_NULL_SPAN = nullcontext()
+_RECORDER: Optional["MetricsRecorder"] = None
+_CURRENT_SHOW: contextvars.ContextVar[str] = contextvars.ContextVar("podcast_digest_show", default="")
+
+
+@dataclass
+class Histogram:
+    counts: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    total: float = 0.0
+    count: int = 0
+    max: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            index = len(BUCKETS)
+        self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict:
+        cumulative, running = {}, 0
+        for bound, count in zip([*BUCKETS, "+Inf"], self.counts):
+            running += count
+            cumulative[str(bound)] = running
+        return {"count": self.count, "sum": self.total, "max": self.max, "buckets": cumulative}
+
+
+class MetricsRecorder:
+    """Collects span durations keyed by ``(stage, show)``; safe to share across threads."""
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, show: Optional[str] = None) -> None:
+        key = (stage, _CURRENT_SHOW.get() if show is None else show)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def by_stage(self) -> Dict[str, Histogram]:
+        stages: Dict[str, Histogram] = {}
+        with self._lock:
+            for (stage, _), histogram in self._histograms.items():
+                stages.setdefault(stage, Histogram()).merge(histogram)
+        return stages
+
+    def by_show(self) -> Dict[str, Dict[str, Histogram]]:
+        shows: Dict[str, Dict[str, Histogram]] = {}
+        with self._lock:
+            for (stage, show), histogram in self._histograms.items():
+                if show:
+                    shows.setdefault(show, {})[stage] = histogram
+        return shows
+
+    def report(self, extra: Optional[Dict] = None) -> Dict:
+        return {
+            "started_at": datetime.utcfromtimestamp(self.started_at).isoformat() + "Z",
+            "wall_seconds": self.elapsed,
+            **(extra or {}),
+            "stages": {stage: histogram.to_dict() for stage, histogram in sorted(self.by_stage().items())},
+            "shows": {
+                show: {stage: histogram.to_dict() for stage, histogram in sorted(stages.items())}
+                for show, stages in sorted(self.by_show().items())
+            },
+        }
+
+    def prometheus(self, extra: Optional[Dict[str, int]] = None) -> str:
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Time spent per pipeline stage and show in the last digest run.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            items = sorted(self._histograms.items())
+        for (stage, show), histogram in items:
+            labels = f'stage="{_escape(stage)}",show="{_escape(show)}"'
+            running = 0
+            for bound, count in zip([*BUCKETS, "+Inf"], histogram.counts):
+                running += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        gauges = {"run_duration_seconds": round(self.elapsed, 6), "last_run_timestamp_seconds": int(self.started_at)}
+        gauges.update(extra or {})
+        for key, value in gauges.items():
+            lines.append(f"# TYPE {METRIC_PREFIX}_{key} gauge")
+            lines.append(f"{METRIC_PREFIX}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, output_dir: Path, date: datetime, extra: Optional[Dict[str, int]] = None) -> Tuple[Path, Path]:
+        """Write ``<date>.metrics.json`` and the textfile-collector file into ``output_dir``."""
+
+        report_path = output_dir / f"{date.date().isoformat()}.metrics.json"
+        prometheus_path = output_dir / PROMETHEUS_FILE
+        _atomic_write(report_path, json.dumps(self.report(extra), indent=2) + "\n")
+        # The textfile collector may read at any time, so the file must only ever appear complete.
+        _atomic_write(prometheus_path, self.prometheus(extra))
+        return report_path, prometheus_path
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class _Span:
+    __slots__ = ("recorder", "stage", "start")
+
+    def __init__(self, recorder: MetricsRecorder, stage: str) -> None:
+        self.recorder = recorder
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.recorder.observe(self.stage, time.perf_counter() - self.start)
+
+
+def span(stage: str) -> ContextManager:
+    """Time the enclosed block under ``stage`` (and the current show, if any)."""
+
+    recorder = _RECORDER
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, stage)
+
+
+@contextmanager
+def show_scope(show_id: str) -> Iterator[None]:
+    """Attribute spans recorded in this block (on this thread) to ``show_id``."""
+
+    if _RECORDER is None:
+        yield
+        return
+    token = _CURRENT_SHOW.set(show_id)
+    try:
+        yield
+    finally:
+        _CURRENT_SHOW.reset(token)
+
+
+def enable() -> MetricsRecorder:
+    global _RECORDER
+    _RECORDER = MetricsRecorder()
+    return _RECORDER
+
+
+def disable() -> None:
+    global _RECORDER
+    _RECORDER = None
+
+
+def recorder() -> Optional[MetricsRecorder]:
+    return _RECORDER
@@ -1,10 +1,10 @@
 """Data models for the podcast digest."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 
 @dataclass
@@ -26,6 +26,8 @@ class TranscriptResult:
     source: Optional[str] = None
     confidence: Optional[float] = None
     error: Optional[str] = None
+    # Lazily read transcript text, set instead of ``text`` by streaming providers.
+    chunks: Optional[Iterable[str]] = None
 
 
 @dataclass
@@ -45,6 +47,67 @@ class EpisodeSummary:
     open_questions: List[str]
 
 
+@dataclass
+class EpisodeOutcome:
+    """Result of processing one episode: ``summarized``, ``unavailable`` or ``error``."""
+
+    episode: Episode
+    status: str
+    markdown: str
+    summary: Optional[EpisodeSummary] = None
+    error: Optional[str] = None
+
+    @property
+    def summarized(self) -> bool:
+        return self.status == "summarized"
+
+
+def summary_to_dict(summary: EpisodeSummary) -> Dict[str, Any]:
+    data = asdict(summary)
+    data["episode"]["published_at"] = summary.episode.published_at.isoformat()
+    return data
+
+
+def summary_from_dict(data: Dict[str, Any]) -> EpisodeSummary:
+    episode_data = dict(data["episode"])
+    episode_data["published_at"] = datetime.fromisoformat(episode_data["published_at"])
+    return EpisodeSummary(
+        episode=Episode(**episode_data),
+        overview=data["overview"],
+        segments=[SummarySection(**segment) for segment in data["segments"]],
+        takeaways=list(data["takeaways"]),
+        quotes=list(data["quotes"]),
+        action_items=list(data["action_items"]),
+        open_questions=list(data["open_questions"]),
+    )
+
+
+def outcome_to_record(outcome: EpisodeOutcome) -> Dict[str, Any]:
+    """Lossless form of an outcome, for handing it between processes (e.g. shard sections)."""
+
+    episode = asdict(outcome.episode)
+    episode["published_at"] = outcome.episode.published_at.isoformat()
+    return {
+        "episode": episode,
+        "status": outcome.status,
+        "markdown": outcome.markdown,
+        "summary": summary_to_dict(outcome.summary) if outcome.summary is not None else None,
+        "error": outcome.error,
+    }
+
+
+def outcome_from_record(data: Dict[str, Any]) -> EpisodeOutcome:
+    episode_data = dict(data["episode"])
+    episode_data["published_at"] = datetime.fromisoformat(episode_data["published_at"])
+    return EpisodeOutcome(
+        episode=Episode(**episode_data),
+        status=data["status"],
+        markdown=data["markdown"],
+        summary=summary_from_dict(data["summary"]) if data.get("summary") else None,
+        error=data.get("error"),
+    )
+
+
 @dataclass
 class DigestDocument:
     date: datetime
@@ -52,5 +115,6 @@ class DigestDocument:
     summarized_count: int
     unavailable_count: int
     overview: str
-    show_sections: List[str]
+    shows: List[str]
     output_path: Path
+    output_paths: Dict[str, Path] = field(default_factory=dict)
@@ -0,0 +1,311 @@
+"""Whole-run profiling for ``run --profile``.
+
+Two modes are available:
+
+* ``sampling`` (default): a background thread snapshots every thread's stack at a fixed
+  interval. Overhead is low and independent of call counts, so it is safe in production.
+  Output is collapsed stacks (``frame;frame;frame count``), readable by ``flamegraph.pl``,
+  speedscope and similar tools.
+* ``deterministic``: ``cProfile`` on every thread. Exact call counts, higher overhead.
+  Output is a ``.pstats`` file for ``pstats``/snakeviz. From Python 3.12 cProfile is built
+  on ``sys.monitoring``, which allows one active profiler per process, so only the thread
+  that starts the profile gets its own profiler there.
+
+Both modes write a text summary with the hottest functions grouped by package module and
+the slowest episodes with their transcript sizes. Work done in ``summary_workers``
+processes is not visible to the profiler; those episodes are timed by how long the run
+waited for their result, which understates episodes that finished while earlier ones
+were still being collected.
+"""
+from __future__ import annotations
+
+import cProfile
+import heapq
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from podcast_digest.models import Episode
+
+PROFILE_MODES = ("sampling", "deterministic")
+DEFAULT_INTERVAL = 0.005
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Frames outside the package are charged to the nearest calling package module.
+OTHER_MODULE = "other"
+
+_PROFILER: Optional["RunProfiler"] = None
+# Before 3.12 every thread can run its own cProfile instance; see the module docstring.
+_PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+@dataclass
+class EpisodeTiming:
+    episode_id: str
+    show_name: str
+    title: str
+    seconds: float
+    transcript_chars: int
+
+
+def package_module(filename: str) -> Optional[str]:
+    """Return ``spotify``, ``renderer``, ... for files in this package, else ``None``."""
+
+    if os.path.dirname(os.path.abspath(filename)) != PACKAGE_DIR:
+        return None
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _frame_label(filename: str, name: str) -> str:
+    module = package_module(filename)
+    if module is not None:
+        return f"podcast_digest.{module}:{name}"
+    return f"{os.path.splitext(os.path.basename(filename))[0]}:{name}"
+
+
+class _EpisodeTimer:
+    __slots__ = ("profiler", "episode", "chars", "start")
+
+    def __init__(self, profiler: "RunProfiler", episode: Episode, chars: int) -> None:
+        self.profiler = profiler
+        self.episode = episode
+        self.chars = chars
+
+    def count(self, chunks: Iterable[str]) -> Iterator[str]:
+        for chunk in chunks:
+            self.chars += len(chunk)
+            yield chunk
+
+    def __enter__(self) -> "_EpisodeTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        episode = self.episode
+        self.profiler.record_episode(
+            EpisodeTiming(episode.id, episode.show_name, episode.title, time.perf_counter() - self.start, self.chars)
+        )
+
+
+class _NullEpisodeTimer:
+    __slots__ = ()
+
+    def count(self, chunks: Iterable[str]) -> Iterable[str]:
+        return chunks
+
+    def __enter__(self) -> "_NullEpisodeTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_TIMER = _NullEpisodeTimer()
+
+
+def episode_timer(episode: Episode, transcript_chars: int = 0):
+    """Time one episode's summarization; a shared no-op unless a profile is running.
+
+    For streamed transcripts pass the chunks through ``timer.count`` to measure their size.
+    """
+
+    profiler = _PROFILER
+    if profiler is None:
+        return _NULL_TIMER
+    return _EpisodeTimer(profiler, episode, transcript_chars)
+
+
+class RunProfiler:
+    """Profiles everything between :meth:`start` and :meth:`stop` across all threads."""
+
+    def __init__(self, mode: str = "sampling", interval: float = DEFAULT_INTERVAL) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.episodes: List[EpisodeTiming] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._profiles: List[cProfile.Profile] = []
+        self._local = threading.local()
+
+    # Lifecycle ----------------------------------------------------------------------
+
+    def start(self) -> "RunProfiler":
+        global _PROFILER
+        _PROFILER = self
+        if self.mode == "sampling":
+            self._sampler = threading.Thread(target=self._sample_loop, name="digest-profiler", daemon=True)
+            self._sampler.start()
+        else:
+            if _PER_THREAD_PROFILES:
+                # New threads pick up the hook and switch themselves to their own cProfile instance.
+                threading.setprofile(self._thread_hook)
+            self._enable_thread_profile()
+        return self
+
+    def stop(self) -> None:
+        global _PROFILER
+        _PROFILER = None
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        else:
+            if _PER_THREAD_PROFILES:
+                threading.setprofile(None)
+            profile = getattr(self._local, "profile", None)
+            if profile is not None:
+                profile.disable()
+
+    def __enter__(self) -> "RunProfiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _enable_thread_profile(self) -> None:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active in this process; leave this thread unprofiled.
+            return
+        self._local.profile = profile
+        with self._lock:
+            self._profiles.append(profile)
+
+    def _thread_hook(self, frame, event, arg) -> None:
+        sys.setprofile(None)
+        self._enable_thread_profile()
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code.co_filename, frame.f_code.co_name))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def record_episode(self, timing: EpisodeTiming) -> None:
+        with self._lock:
+            self.episodes.append(timing)
+
+    # Reporting ------------------------------------------------------------------------
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def hot_functions(self) -> List[Tuple[str, str, float]]:
+        """``(module, function, self share)`` rows, hottest first; shares are fractions of the total."""
+
+        rows: Dict[Tuple[str, str], float] = {}
+        if self.mode == "sampling":
+            total = sum(self.stacks.values()) or 1
+            for stack, count in self.stacks.items():
+                frames = stack.split(";")
+                leaf = frames[-1]
+                key = (_owning_module(frames), leaf)
+                rows[key] = rows.get(key, 0.0) + count / total
+        else:
+            stats = self._stats()
+            if stats is None:
+                return []
+            total = sum(entry[2] for entry in stats.stats.values()) or 1.0
+            owners: Dict[tuple, str] = {}
+            for func, entry in stats.stats.items():
+                key = (_calling_module(stats.stats, func, owners), _frame_label(func[0], func[2]))
+                rows[key] = rows.get(key, 0.0) + entry[2] / total
+        return sorted(((module, name, share) for (module, name), share in rows.items()), key=lambda row: -row[2])
+
+    def module_shares(self) -> List[Tuple[str, float]]:
+        shares: Dict[str, float] = {}
+        for module, _, share in self.hot_functions():
+            shares[module] = shares.get(module, 0.0) + share
+        return sorted(shares.items(), key=lambda item: -item[1])
+
+    def slowest_episodes(self, limit: int) -> List[EpisodeTiming]:
+        with self._lock:
+            return heapq.nlargest(limit, self.episodes, key=lambda timing: timing.seconds)
+
+    def summary(self, top: int = 20) -> str:
+        lines = [f"Profile mode: {self.mode}"]
+        if self.mode == "sampling":
+            # Wall-clock samples: threads blocked on I/O or locks are counted too.
+            lines.append(f"Stack samples: {self.samples} (all threads, every {self.interval * 1000:g} ms)")
+        lines += ["", "Time by package module (library code is charged to its caller):"]
+        lines += [f"  {share:7.1%}  {module}" for module, share in self.module_shares()]
+        lines += ["", f"Top {top} functions by self time:"]
+        lines += [f"  {share:7.1%}  [{module}] {name}" for module, name, share in self.hot_functions()[:top]]
+        lines += ["", f"Slowest {top} episodes:"]
+        lines += [
+            f"  {timing.seconds * 1000:9.1f} ms  {timing.transcript_chars:>10} chars  "
+            f"{timing.episode_id}  {timing.show_name} - {timing.title}"
+            for timing in self.slowest_episodes(top)
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, output_dir: Path, date: datetime, top: int = 20) -> List[Path]:
+        """Write the summary plus collapsed stacks (sampling) or a ``.pstats`` file (deterministic)."""
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{date.date().isoformat()}.profile"
+        paths = []
+        if self.mode == "sampling":
+            folded = output_dir / f"{stem}.folded"
+            folded.write_text("".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items())), encoding="utf-8")
+            paths.append(folded)
+        else:
+            stats = self._stats()
+            if stats is not None:
+                dump = output_dir / f"{stem}.pstats"
+                stats.dump_stats(str(dump))
+                paths.append(dump)
+        summary = output_dir / f"{stem}.txt"
+        summary.write_text(self.summary(top), encoding="utf-8")
+        paths.append(summary)
+        return paths
+
+
+def _calling_module(table: Dict, func: tuple, owners: Dict[tuple, str], depth: int = 0) -> str:
+    """Package module of ``func``, or of its heaviest caller chain for library functions."""
+
+    if func in owners:
+        return owners[func]
+    module = package_module(func[0])
+    if module is None:
+        module = OTHER_MODULE
+        callers = table.get(func, (0, 0, 0, 0, {}))[4]
+        if callers and depth < 32:
+            owners[func] = OTHER_MODULE  # guards against recursive call cycles
+            heaviest = max(callers, key=lambda caller: callers[caller][3])
+            module = _calling_module(table, heaviest, owners, depth + 1)
+    owners[func] = module
+    return module
+
+
+def _owning_module(frames: List[str]) -> str:
+    for label in reversed(frames):
+        if label.startswith("podcast_digest."):
+            return label[len("podcast_digest.") :].split(":", 1)[0]
+    return OTHER_MODULE
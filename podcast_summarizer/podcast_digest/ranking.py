@@ -0,0 +1,164 @@
+"""Extractive sentence ranking for the ``ranked`` summary strategy.
+
+Sentences become L2-normalised TF-IDF rows of a sparse matrix ``X`` kept in coordinate
+form (row, term, weight). The sentence similarity graph ``W = X Xᵀ`` is never built:
+TextRank's power iteration only needs ``W p``, which is ``X (Xᵀ p)`` and costs two
+passes over the non-zeros. Scoring is therefore linear in transcript length.
+
+NumPy is used when installed; otherwise an equivalent pure-Python implementation runs.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from collections import defaultdict
+from itertools import count
+from typing import Dict, List, Sequence, Tuple
+
+try:  # Optional dependency
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None
+
+DAMPING = 0.85
+ITERATIONS = 30
+# Sentences shorter than this many content words are scored proportionally lower.
+MIN_CONTENT_WORDS = 4
+
+# Content words are at least two characters long.
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9']+")
+STOPWORDS = frozenset(
+    """a about above after again all also am an and any are as at be because been before being below
+    between both but by can could did do does doing down during each few for from further had has have
+    having he her here hers him his how i if in into is it its itself just let me more most my no nor not
+    now of off on once only or other our ours out over own really same she so some such than that the their
+    them then there these they this those through to too under until up very was we were what when where
+    which while who whom why will with would yeah yes you your yours okay oh um uh like know think going
+    get got right well""".split()
+)
+
+# (rows, cols, values, n_sentences, n_terms); lists, or NumPy arrays when NumPy is available.
+Matrix = Tuple[Sequence[int], Sequence[int], Sequence[float], int, int]
+
+
+def _term_ids(sentences: Sequence[str]) -> Tuple[List[List[int]], int]:
+    # Unseen tokens get the next free id on first lookup.
+    vocabulary: Dict[str, int] = defaultdict(count().__next__)
+    ids = [
+        [vocabulary[token] for token in _TOKEN.findall(sentence.lower()) if token not in STOPWORDS]
+        for sentence in sentences
+    ]
+    return ids, len(vocabulary)
+
+
+def tfidf_matrix(sentences: Sequence[str]) -> Tuple[Matrix, List[int]]:
+    """Return ``(rows, cols, values, n_sentences, n_terms)`` with L2-normalised rows, and content words per sentence.
+
+    Weights are sublinear term frequency times smoothed inverse document frequency.
+    """
+
+    ids, terms = _term_ids(sentences)
+    n = len(sentences)
+    word_counts = [len(row) for row in ids]
+    if np is not None:
+        return _tfidf_numpy(ids, n, terms), word_counts
+
+    counts: List[Dict[int, int]] = []
+    document_frequency = [0] * terms
+    for row_ids in ids:
+        row: Dict[int, int] = {}
+        for term in row_ids:
+            row[term] = row.get(term, 0) + 1
+        for term in row:
+            document_frequency[term] += 1
+        counts.append(row)
+
+    idf = [math.log((1 + n) / (1 + df)) + 1.0 for df in document_frequency]
+    rows: List[int] = []
+    cols: List[int] = []
+    values: List[float] = []
+    for index, row in enumerate(counts):
+        weights = [(term, (1 + math.log(occurrences)) * idf[term]) for term, occurrences in row.items()]
+        norm = math.sqrt(sum(weight * weight for _, weight in weights)) or 1.0
+        for term, weight in weights:
+            rows.append(index)
+            cols.append(term)
+            values.append(weight / norm)
+    return (rows, cols, values, n, terms), word_counts
+
+
+def _tfidf_numpy(ids: List[List[int]], n: int, terms: int) -> Matrix:
+    lengths = np.fromiter((len(row) for row in ids), dtype=np.int64, count=n)
+    flat_rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+    flat_terms = np.fromiter((term for row in ids for term in row), dtype=np.int64, count=int(lengths.sum()))
+    # Each distinct (sentence, term) pair becomes one non-zero with its occurrence count.
+    pairs, counts = np.unique(flat_rows * max(terms, 1) + flat_terms, return_counts=True)
+    rows = pairs // max(terms, 1)
+    cols = pairs % max(terms, 1)
+    document_frequency = np.bincount(cols, minlength=terms)
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1.0
+    values = (1 + np.log(counts)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n))
+    values = values / np.where(norms > 0, norms, 1.0)[rows]
+    return rows, cols, values, n, terms
+
+
+def _textrank_numpy(matrix: Matrix) -> List[float]:
+    rows, cols, values, n, terms = matrix
+    r = np.asarray(rows, dtype=np.int64)
+    c = np.asarray(cols, dtype=np.int64)
+    v = np.asarray(values, dtype=np.float64)
+
+    def similarity_times(p):
+        # W p with the self-similarity diagonal (1 for every non-empty row) removed.
+        projected = np.bincount(c, weights=v * p[r], minlength=terms)
+        return np.bincount(r, weights=v * projected[c], minlength=n) - self_sim * p
+
+    self_sim = np.bincount(r, weights=v * v, minlength=n)
+    degree = similarity_times(np.ones(n))
+    inverse_degree = np.divide(1.0, degree, out=np.zeros(n), where=degree > 1e-12)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(ITERATIONS):
+        scores = (1 - DAMPING) / n + DAMPING * similarity_times(scores * inverse_degree)
+    return scores.tolist()
+
+
+def _textrank_python(matrix: Matrix) -> List[float]:
+    rows, cols, values, n, terms = matrix
+    self_sim = [0.0] * n
+    for row, value in zip(rows, values):
+        self_sim[row] += value * value
+
+    def similarity_times(p: List[float]) -> List[float]:
+        projected = [0.0] * terms
+        for row, col, value in zip(rows, cols, values):
+            projected[col] += value * p[row]
+        out = [-self_sim[index] * p[index] for index in range(n)]
+        for row, col, value in zip(rows, cols, values):
+            out[row] += value * projected[col]
+        return out
+
+    degree = similarity_times([1.0] * n)
+    inverse_degree = [1.0 / d if d > 1e-12 else 0.0 for d in degree]
+    scores = [1.0 / n] * n
+    for _ in range(ITERATIONS):
+        spread = similarity_times([score * inv for score, inv in zip(scores, inverse_degree)])
+        scores = [(1 - DAMPING) / n + DAMPING * value for value in spread]
+    return scores
+
+
+def score_sentences(sentences: Sequence[str]) -> List[float]:
+    """TextRank centrality of each sentence over TF-IDF cosine similarity."""
+
+    if not sentences:
+        return []
+    matrix, word_counts = tfidf_matrix(sentences)
+    scores = _textrank_numpy(matrix) if np is not None else _textrank_python(matrix)
+    return [score * min(words, MIN_CONTENT_WORDS) / MIN_CONTENT_WORDS for score, words in zip(scores, word_counts)]
+
+
+def top_indices(scores: Sequence[float], candidates: Sequence[int], limit: int) -> List[int]:
+    """The ``limit`` best-scoring candidates, returned in transcript order (ties keep the earlier one)."""
+
+    return sorted(heapq.nsmallest(limit, candidates, key=lambda index: (-scores[index], index)))
@@ -1,20 +1,73 @@
-"""Markdown rendering and deterministic summarization utilities."""
+"""Markdown, JSON and HTML rendering and deterministic summarization utilities."""
 from __future__ import annotations
 
 import math
 import re
-from datetime import datetime, timezone
-from pathlib import Path
-from typing import List
+from datetime import datetime
+from html import escape
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-from podcast_digest.models import DigestDocument, Episode, EpisodeSummary, SummarySection
+from podcast_digest.config import SUMMARY_STRATEGIES
+from podcast_digest.features import (
+    ACTION,
+    ALL_FEATURES,
+    DEFAULT_EXTRACTOR,
+    QUESTION,
+    QUOTE,
+    QUOTE_MAX_CHARS,
+    FeatureExtractor,
+)
+from podcast_digest.models import Episode, EpisodeOutcome, EpisodeSummary, SummarySection
+from podcast_digest.ranking import score_sentences, top_indices
+
+
+# Bump whenever summarization or rendering output changes; it is part of every summary cache key.
+SUMMARIZER_VERSION = "1"
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+MAX_QUOTES = 10
+FALLBACK_QUOTES = 5
+MAX_ACTION_ITEMS = 10
+MAX_OPEN_QUESTIONS = 8
+MAX_TAKEAWAYS = 20
+OVERVIEW_SENTENCES = 4
+TAKEAWAYS_PER_SEGMENT = 2
 
 
 def _split_sentences(text: str) -> List[str]:
-    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+    sentences = _SENTENCE_BREAK.split(text.strip())
     return [s.strip() for s in sentences if s.strip()]
 
 
+def _iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """Incrementally split a stream of text chunks exactly like :func:`_split_sentences`.
+
+    Only the unfinished sentence is carried between chunks, plus the previous chunk's last
+    character so a break straddling two chunks is still seen by the look-behind.
+    """
+
+    pending: List[str] = []
+    last_char = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        window = last_char + chunk
+        start = len(last_char)
+        for match in _SENTENCE_BREAK.finditer(window):
+            pending.append(window[start : match.start()])
+            sentence = "".join(pending).strip()
+            pending = []
+            if sentence:
+                yield sentence
+            start = match.end()
+        pending.append(window[start:])
+        last_char = chunk[-1]
+    tail = "".join(pending).strip()
+    if tail:
+        yield tail
+
+
 def _segment_sentences(sentences: List[str], desired_segments: int) -> List[List[str]]:
     if not sentences:
         return []
@@ -23,52 +76,123 @@ def _segment_sentences(sentences: List[str], desired_segments: int) -> List[List
     return [sentences[i : i + chunk_size] for i in range(0, len(sentences), chunk_size)]
 
 
-def summarize_transcript(episode: Episode, transcript_text: str) -> EpisodeSummary:
-    sentences = _split_sentences(transcript_text)
-    segments_raw = _segment_sentences(sentences, min(12, max(5, len(sentences) // 8 or 1)))
+class _SummaryBuilder:
+    """Classifies sentences as they arrive and assembles the :class:`EpisodeSummary`.
 
-    overview_sentences = sentences[:4] if sentences else []
-    overview = " ".join(overview_sentences) or "Transcript provided no readable content."
+    Quotes, action items and questions are capped while streaming, so the only buffer that
+    grows with the transcript is the sentence list the segment breakdown is built from.
+    """
 
-    segments: List[SummarySection] = []
-    for idx, seg_sentences in enumerate(segments_raw, start=1):
-        if not seg_sentences:
-            continue
-        heading_source = seg_sentences[0][:80]
-        heading = f"Segment {idx}: {heading_source}" if len(heading_source) > 10 else f"Segment {idx}"
-        body = " ".join(seg_sentences)
-        segments.append(SummarySection(heading=heading, body=body))
-
-    takeaways: List[str] = []
-    for seg in segments:
-        sentences_seg = _split_sentences(seg.body)
-        sample = " ".join(sentences_seg[:2]) if sentences_seg else seg.body
-        if sample:
-            takeaways.append(sample)
-    takeaways = takeaways[:20]
-
-    quotes = [s for s in sentences if len(s) < 180][:10]
-    if not quotes and sentences:
-        quotes = sentences[:5]
-
-    action_items: List[str] = []
-    for s in sentences:
-        if any(token in s.lower() for token in ["should", "try", "plan", "recommend"]):
-            action_items.append(s)
-    action_items = action_items[:10]
-
-    question_sentences = [s for s in sentences if s.endswith("?")]
-    open_questions = question_sentences[:8]
-
-    return EpisodeSummary(
-        episode=episode,
-        overview=overview,
-        segments=segments,
-        takeaways=takeaways,
-        quotes=quotes,
-        action_items=action_items,
-        open_questions=open_questions,
-    )
+    def __init__(
+        self, episode: Episode, strategy: str = "positional", features: FeatureExtractor = DEFAULT_EXTRACTOR
+    ) -> None:
+        if strategy not in SUMMARY_STRATEGIES:
+            raise ValueError(f"Unknown summary strategy: {strategy}")
+        self.episode = episode
+        self.strategy = strategy
+        self.features = features
+        self.wanted = ALL_FEATURES
+        self.sentences: List[str] = []
+        self.quotes: List[str] = []
+        self.action_items: List[str] = []
+        self.open_questions: List[str] = []
+
+    def add(self, sentence: str) -> None:
+        self.sentences.append(sentence)
+        # Lists that are already full are not tested at all.
+        wanted = self.wanted
+        if not wanted:
+            return
+        flags = self.features.classify(sentence, wanted)
+        if flags & QUOTE:
+            self.quotes.append(sentence)
+            if len(self.quotes) >= MAX_QUOTES:
+                self.wanted &= ~QUOTE
+        if flags & ACTION:
+            self.action_items.append(sentence)
+            if len(self.action_items) >= MAX_ACTION_ITEMS:
+                self.wanted &= ~ACTION
+        if flags & QUESTION:
+            self.open_questions.append(sentence)
+            if len(self.open_questions) >= MAX_OPEN_QUESTIONS:
+                self.wanted &= ~QUESTION
+
+    def build(self) -> EpisodeSummary:
+        sentences = self.sentences
+        segments_raw = _segment_sentences(sentences, min(12, max(5, len(sentences) // 8 or 1)))
+        scores = score_sentences(sentences) if self.strategy == "ranked" else None
+
+        if scores:
+            picked = top_indices(scores, range(len(sentences)), OVERVIEW_SENTENCES)
+            overview = " ".join(sentences[index] for index in picked)
+        else:
+            overview = " ".join(sentences[:OVERVIEW_SENTENCES]) or "Transcript provided no readable content."
+
+        segments: List[SummarySection] = []
+        takeaways: List[str] = []
+        start = 0
+        for idx, seg_sentences in enumerate(segments_raw, start=1):
+            if not seg_sentences:
+                continue
+            heading_source = seg_sentences[0][:80]
+            heading = f"Segment {idx}: {heading_source}" if len(heading_source) > 10 else f"Segment {idx}"
+            segments.append(SummarySection(heading=heading, body=" ".join(seg_sentences)))
+            # Segment bodies re-split into exactly these sentences, so take them directly.
+            if scores:
+                picked = top_indices(scores, range(start, start + len(seg_sentences)), TAKEAWAYS_PER_SEGMENT)
+                takeaways.append(" ".join(sentences[index] for index in picked))
+            else:
+                takeaways.append(" ".join(seg_sentences[:TAKEAWAYS_PER_SEGMENT]))
+            start += len(seg_sentences)
+        takeaways = takeaways[:MAX_TAKEAWAYS]
+
+        if scores:
+            short = [index for index, sentence in enumerate(sentences) if len(sentence) < self.features.quote_max_chars]
+            picked = top_indices(scores, short, MAX_QUOTES)
+            if not picked:
+                picked = top_indices(scores, range(len(sentences)), FALLBACK_QUOTES)
+            quotes = [sentences[index] for index in picked]
+        else:
+            quotes = self.quotes or sentences[:FALLBACK_QUOTES]
+
+        return EpisodeSummary(
+            episode=self.episode,
+            overview=overview,
+            segments=segments,
+            takeaways=takeaways,
+            quotes=quotes,
+            action_items=self.action_items,
+            open_questions=self.open_questions,
+        )
+
+
+def summarize_transcript(
+    episode: Episode,
+    transcript_text: str,
+    strategy: str = "positional",
+    features: FeatureExtractor = DEFAULT_EXTRACTOR,
+) -> EpisodeSummary:
+    builder = _SummaryBuilder(episode, strategy, features)
+    for sentence in _split_sentences(transcript_text):
+        builder.add(sentence)
+    return builder.build()
+
+
+def summarize_stream(
+    episode: Episode,
+    chunks: Iterable[str],
+    strategy: str = "positional",
+    features: FeatureExtractor = DEFAULT_EXTRACTOR,
+) -> EpisodeSummary:
+    """Summarize a transcript delivered as text chunks, e.g. read straight from a file handle.
+
+    Produces the same :class:`EpisodeSummary` as :func:`summarize_transcript` on the joined text.
+    """
+
+    builder = _SummaryBuilder(episode, strategy, features)
+    for sentence in _iter_sentences(chunks):
+        builder.add(sentence)
+    return builder.build()
 
 
 def render_daily_overview(date: datetime, overview: str, stats: dict) -> str:
@@ -131,15 +255,82 @@ def render_unavailable(episode: Episode) -> str:
     return "\n".join(lines)
 
 
-def build_document(doc: DigestDocument) -> str:
-    date_display = doc.date.astimezone(timezone.utc).date().isoformat()
-    header = f"# Podcast Digest — {date_display}\n\n"
-    body = "\n".join(doc.show_sections)
-    return header + doc.overview + "\n\n" + body
+def render_error(episode: Episode, error: Optional[str]) -> str:
+    return f"### {episode.title}\n**Transcript unavailable — error fetching transcript**\n{error or ''}\n"
+
+
+def outcome_to_dict(outcome: EpisodeOutcome) -> Dict[str, Any]:
+    episode = outcome.episode
+    data: Dict[str, Any] = {
+        "id": episode.id,
+        "title": episode.title,
+        "published_at": episode.published_at.isoformat(),
+        "duration_min": episode.duration_ms // 60000,
+        "spotify_url": episode.spotify_url,
+        "status": outcome.status,
+    }
+    if outcome.error:
+        data["error"] = outcome.error
+    summary = outcome.summary
+    if summary is not None:
+        data["summary"] = {
+            "overview": summary.overview,
+            "segments": [{"heading": segment.heading, "body": segment.body} for segment in summary.segments],
+            "takeaways": summary.takeaways,
+            "quotes": summary.quotes,
+            "action_items": summary.action_items,
+            "open_questions": summary.open_questions,
+        }
+    return data
+
+
+def _html_list(items: List[str], empty: str) -> List[str]:
+    if not items:
+        return [f"<ul><li>{escape(empty)}</li></ul>"]
+    return ["<ul>", *(f"<li>{escape(item)}</li>" for item in items), "</ul>"]
+
+
+def render_outcome_html(outcome: EpisodeOutcome) -> str:
+    episode = outcome.episode
+    lines = [
+        f'<article class="episode" id="episode-{escape(episode.id)}">',
+        f"<h3>{escape(episode.title)}</h3>",
+        f'<p class="meta">Published: {episode.published_at.isoformat()} | Duration: {episode.duration_ms // 60000} min'
+        f' | <a href="{escape(episode.spotify_url)}">Spotify</a></p>',
+    ]
+    summary = outcome.summary
+    if summary is None:
+        notice = "error fetching transcript" if outcome.status == "error" else "summary not generated"
+        lines.append(f'<p class="unavailable"><strong>Transcript unavailable — {notice}</strong></p>')
+        if outcome.error:
+            lines.append(f"<p>{escape(outcome.error)}</p>")
+    else:
+        lines.extend(["<h4>Overview</h4>", f"<p>{escape(summary.overview)}</p>", "<h4>Structured breakdown</h4>", "<ul>"])
+        for segment in summary.segments:
+            lines.append(f"<li><strong>{escape(segment.heading)}</strong> — {escape(segment.body)}</li>")
+        lines.extend(["</ul>", "<h4>Key takeaways</h4>", *_html_list(summary.takeaways, "")])
+        lines.append("<h4>Notable quotes</h4>")
+        lines.extend(f"<blockquote>{escape(quote)}</blockquote>" for quote in summary.quotes)
+        lines.append("<h4>Action items / recommendations</h4>")
+        lines.extend(_html_list(summary.action_items, "No explicit action items were captured in the transcript."))
+        lines.append("<h4>Open questions</h4>")
+        lines.extend(_html_list(summary.open_questions, "No open questions were recorded in the transcript."))
+    lines.extend(["</article>", ""])
+    return "\n".join(lines)
 
 
-def write_document(content: str, output_dir: Path, date: datetime) -> Path:
-    output_dir.mkdir(parents=True, exist_ok=True)
-    path = output_dir / f"{date.date().isoformat()}.md"
-    path.write_text(content, encoding="utf-8")
-    return path
+def render_daily_overview_html(date: datetime, overview: str, stats: dict) -> str:
+    title = f"Podcast Digest — {date.date().isoformat()}"
+    lines = [
+        "<!DOCTYPE html>",
+        '<html lang="en">',
+        f'<head><meta charset="utf-8"><title>{escape(title)}</title></head>',
+        "<body>",
+        f"<h1>{escape(title)}</h1>",
+        "<h2>Daily overview</h2>",
+        f"<p>{escape(overview.strip())}</p>",
+        f'<p class="stats">New episodes: {stats["total"]} | Summarized: {stats["summarized"]}'
+        f' | Transcript unavailable: {stats["unavailable"]}</p>',
+        "",
+    ]
+    return "\n".join(lines)
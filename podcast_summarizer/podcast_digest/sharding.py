@@ -0,0 +1,92 @@
+"""Split the configured shows across workers with rendezvous hashing.
+
+``run --shard i/N`` processes only the shows assigned to shard ``i``: each show goes to the
+shard with the highest ``sha1(shard, show_id)`` score. Workers need no coordination, every
+host computes the same assignment, and going from N to N+1 shards only moves the ~1/(N+1)
+of shows the new shard wins. Shard workers write their sections below ``shards/`` in the
+output directory; :func:`merge_shards` combines them into the day's digest.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from podcast_digest.digest import ShowOutcomes
+from podcast_digest.writer import SHARD_DIRECTORY, ShardSection, read_shard_file
+
+LOGGER = logging.getLogger(__name__)
+
+Shard = Tuple[int, int]
+
+_SHARD_SPEC = re.compile(r"\s*(\d+)\s*/\s*(\d+)\s*")
+
+
+def parse_shard(value: str) -> Shard:
+    """Parse ``"i/N"`` (1-based) into ``(i, N)``."""
+
+    match = _SHARD_SPEC.fullmatch(value)
+    if not match:
+        raise ValueError(f"Shard must look like i/N, got {value!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {value!r}")
+    return index, count
+
+
+def shard_for(show_id: str, count: int) -> int:
+    if count == 1:
+        return 1
+    return max(range(1, count + 1), key=lambda index: hashlib.sha1(f"{index}:{show_id}".encode("utf-8")).digest())
+
+
+def select_shows(show_ids: Sequence[str], shard: Shard) -> List[str]:
+    index, count = shard
+    return [show_id for show_id in show_ids if shard_for(show_id, count) == index]
+
+
+def report_directory(output_dir: Path, shard: Shard) -> Path:
+    """Where a shard worker writes metrics and profiles, so workers sharing an output directory do not collide."""
+
+    index, count = shard
+    return output_dir / SHARD_DIRECTORY / f"shard-{index}-of-{count}"
+
+
+def shard_files(output_dir: Path, date: datetime) -> List[Path]:
+    return sorted((output_dir / SHARD_DIRECTORY).glob(f"{date.date().isoformat()}.shard-*.jsonl"))
+
+
+def merge_shards(output_dir: Path, date: datetime, show_order: Sequence[str]) -> List[ShowOutcomes]:
+    """Collect the day's shard sections as ``(show_id, episodes, outcomes)`` in ``show_order``.
+
+    Shows missing from ``show_order`` follow in shard order. Missing shards are logged, not
+    fatal: merging again once they arrive adds their shows to the digest.
+    """
+
+    sections: Dict[str, ShardSection] = {}
+    seen: Dict[int, int] = {}
+    for path in shard_files(output_dir, date):
+        shard, shows = read_shard_file(path)
+        if shard is not None:
+            seen[shard[0]] = shard[1]
+        for show_id, name, outcomes in shows:
+            if show_id in sections:
+                # A show moved shards after a resize; keep every episode once.
+                known = {outcome.episode.id for outcome in sections[show_id][2]}
+                sections[show_id][2].extend(outcome for outcome in outcomes if outcome.episode.id not in known)
+            else:
+                sections[show_id] = (show_id, name, list(outcomes))
+    counts = set(seen.values())
+    if len(counts) > 1:
+        LOGGER.warning("Shard files for %s disagree on the shard count: %s", date.date(), sorted(counts))
+    for count in counts:
+        missing = [index for index in range(1, count + 1) if index not in seen]
+        if missing:
+            LOGGER.warning("No section file yet for shard(s) %s of %d", ", ".join(map(str, missing)), count)
+
+    rank = {show_id: position for position, show_id in enumerate(show_order)}
+    ordered = sorted(sections.values(), key=lambda section: rank.get(section[0], len(rank)))
+    return [(show_id, [outcome.episode for outcome in outcomes], outcomes) for show_id, _, outcomes in ordered]
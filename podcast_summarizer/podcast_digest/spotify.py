@@ -2,19 +2,39 @@
 from __future__ import annotations
 
 import base64
+import contextvars
 import json
 import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Dict, Iterable, List, Optional
-from urllib import request, parse, error
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+from urllib import parse, error
 
+from podcast_digest import metrics
+from podcast_digest.http_cache import ResponseCache
 from podcast_digest.models import Episode
+from podcast_digest.transport import ConnectionPool, TransportResponse
 
 LOGGER = logging.getLogger(__name__)
 
-SPOTIFY_API_BASE = "https://api.spotify.com/v1"
-SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+# Both endpoints can be pointed elsewhere, e.g. at the fake server in ``benchmarks/fake_spotify.py``.
+SPOTIFY_API_BASE = os.environ.get("SPOTIFY_API_BASE", "https://api.spotify.com/v1")
+SPOTIFY_TOKEN_URL = os.environ.get("SPOTIFY_TOKEN_URL", "https://accounts.spotify.com/api/token")
+# Refresh the bearer token this many seconds before Spotify says it expires.
+TOKEN_REFRESH_MARGIN = 60.0
+# Maximum number of IDs accepted by the multi-show endpoint.
+SHOWS_BATCH_SIZE = 50
+# Rate-limited (429) and server-error responses are retried this many times.
+MAX_RETRIES = 3
+# Base delay for exponential backoff when the server does not send Retry-After.
+RETRY_BACKOFF_SECONDS = 0.5
+MAX_RETRY_DELAY_SECONDS = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 class SpotifyAuthError(Exception):
@@ -35,61 +55,172 @@ class SimpleResponse:
 
 
 class SpotifyClient:
-    """Lightweight Spotify Web API client using urllib."""
+    """Lightweight Spotify Web API client over a pooled keep-alive transport."""
 
-    def __init__(self, client_id: str, client_secret: str, timeout: float = 10.0) -> None:
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        timeout: float = 10.0,
+        transport: Optional[ConnectionPool] = None,
+        cache: Optional[ResponseCache] = None,
+        prefetch_pages: int = 0,
+    ) -> None:
         self.client_id = client_id
         self.client_secret = client_secret
         self.timeout = timeout
+        self.transport = transport or ConnectionPool(timeout=timeout)
+        self.cache = cache
         self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+        self.prefetch_pages = prefetch_pages
+
+    def _token_valid(self) -> bool:
+        return bool(self._token) and time.monotonic() < self._token_expires_at - TOKEN_REFRESH_MARGIN
 
     def _auth_headers(self) -> Dict[str, str]:
-        if not self._token:
-            self.refresh_token()
+        if not self._token_valid():
+            with self._token_lock:
+                if not self._token_valid():
+                    self.refresh_token()
         return {"Authorization": f"Bearer {self._token}"}
 
     def refresh_token(self) -> None:
         data = parse.urlencode({"grant_type": "client_credentials"}).encode()
         auth_header = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
-        req = request.Request(
-            SPOTIFY_TOKEN_URL,
-            data=data,
-            headers={"Authorization": f"Basic {auth_header}", "Content-Type": "application/x-www-form-urlencoded"},
-        )
+        headers = {"Authorization": f"Basic {auth_header}", "Content-Type": "application/x-www-form-urlencoded"}
         try:
-            with request.urlopen(req, timeout=self.timeout) as resp:
-                body = resp.read().decode()
-                payload = json.loads(body)
-                self._token = payload.get("access_token")
+            resp = self.transport.request("POST", SPOTIFY_TOKEN_URL, headers=headers, body=data)
+            if not (200 <= resp.status < 300):
+                raise SpotifyAuthError(f"Token endpoint returned HTTP {resp.status}")
+            payload = json.loads(resp.text)
+        except SpotifyAuthError:
+            raise
         except Exception as exc:  # pragma: no cover - network errors
             raise SpotifyAuthError(f"Failed to fetch token: {exc}") from exc
+        self._token = payload.get("access_token")
+        self._token_expires_at = time.monotonic() + float(payload.get("expires_in", 3600))
+
+    def invalidate_token(self) -> None:
+        with self._token_lock:
+            self._token = None
+            self._token_expires_at = 0.0
 
-    def resolve_show_id(self, url: str) -> str:
+    def close(self) -> None:
+        self.transport.close()
+
+    @staticmethod
+    def resolve_show_id(url: str) -> str:
         if "open.spotify.com/show/" in url:
             return url.rstrip("/").split("/")[-1].split("?")[0]
         return url
 
     def _get(self, path: str, params: Optional[Dict[str, str]] = None) -> SimpleResponse:
-        query = f"?{parse.urlencode(params)}" if params else ""
-        req = request.Request(f"{SPOTIFY_API_BASE}{path}{query}", headers=self._auth_headers())
-        with request.urlopen(req, timeout=self.timeout) as resp:
-            text = resp.read().decode()
-            return SimpleResponse(status_code=resp.status, text=text)
+        with metrics.span("spotify_get"):
+            query = f"?{parse.urlencode(params)}" if params else ""
+            url = f"{SPOTIFY_API_BASE}{path}{query}"
+            cached = self.cache.lookup(url) if self.cache else None
+            if cached and self.cache.is_fresh(cached):
+                self.cache.record_hit(cached)
+                return SimpleResponse(status_code=200, text=cached.body)
+
+            conditional = self.cache.conditional_headers(cached) if cached else {}
+            resp = self._send(url, conditional)
+
+            if self.cache:
+                if resp.status == 304 and cached:
+                    self.cache.refresh(url, cached, resp.headers)
+                    return SimpleResponse(status_code=200, text=cached.body)
+                if resp.status == 200:
+                    self.cache.store_response(url, resp.text, resp.headers)
+            return SimpleResponse(status_code=resp.status, text=resp.text)
+
+    def _send(self, url: str, extra_headers: Dict[str, str]) -> TransportResponse:
+        attempt = 0
+        reauthenticated = False
+        while True:
+            resp = self.transport.request("GET", url, headers={**self._auth_headers(), **extra_headers})
+            if resp.status == 401 and not reauthenticated:
+                # Revoked or clock-skewed token: fetch a fresh one and retry once.
+                self.invalidate_token()
+                reauthenticated = True
+                continue
+            if resp.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                delay = self._retry_delay(resp, attempt)
+                LOGGER.warning("HTTP %d from %s; retrying in %.1fs", resp.status, url, delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            return resp
+
+    @staticmethod
+    def _retry_delay(resp: TransportResponse, attempt: int) -> float:
+        retry_after = resp.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), MAX_RETRY_DELAY_SECONDS)
+            except ValueError:
+                pass
+        return min(RETRY_BACKOFF_SECONDS * 2**attempt, MAX_RETRY_DELAY_SECONDS)
 
     def get_show(self, show_id: str) -> Dict:
         resp = self._get(f"/shows/{show_id}")
         resp.raise_for_status()
         return resp.json()
 
-    def iter_episodes(self, show_id: str, limit: int = 50) -> Iterable[Dict]:  # pragma: no cover - network
-        offset = 0
-        while True:
-            resp = self._get(
-                f"/shows/{show_id}/episodes",
-                params={"offset": offset, "limit": limit, "market": "US"},
-            )
+    def get_shows(self, show_ids: List[str]) -> Dict[str, Dict]:
+        """Resolve many shows through ``/shows?ids=``, ``SHOWS_BATCH_SIZE`` IDs per request."""
+
+        unique_ids = list(dict.fromkeys(show_id for show_id in show_ids if show_id))
+        shows: Dict[str, Dict] = {}
+        for start in range(0, len(unique_ids), SHOWS_BATCH_SIZE):
+            batch = unique_ids[start : start + SHOWS_BATCH_SIZE]
+            resp = self._get("/shows", params={"ids": ",".join(batch), "market": "US"})
             resp.raise_for_status()
-            data = resp.json()
+            for show in resp.json().get("shows", []):
+                # Unknown IDs come back as null entries.
+                if show and show.get("id"):
+                    shows[show["id"]] = show
+        return shows
+
+    def _episode_page(self, show_id: str, offset: int, limit: int) -> Dict:
+        resp = self._get(
+            f"/shows/{show_id}/episodes",
+            params={"offset": offset, "limit": limit, "market": "US"},
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def iter_episodes(
+        self, show_id: str, limit: int = 50, max_items: Optional[int] = None, prefetch: int = 0
+    ) -> Iterable[Dict]:
+        """Yield a show's episodes newest first.
+
+        ``max_items`` stops paging once that many episodes have been requested. With
+        ``prefetch`` above zero, up to that many following pages are fetched concurrently
+        while the current one is consumed; pages not yet consumed when the caller stops are
+        cancelled or discarded.
+        """
+
+        if max_items is not None:
+            limit = min(limit, max_items)
+        data = self._episode_page(show_id, 0, limit)
+        items = data.get("items", [])
+        yield from items
+        if not items or data.get("next") is None:
+            return
+
+        end = data.get("total")
+        if max_items is not None:
+            end = min(end, max_items) if end is not None else max_items
+        if prefetch and end is not None:
+            yield from self._prefetched_pages(show_id, range(limit, end, limit), limit, prefetch)
+            return
+
+        offset = limit
+        while end is None or offset < end:
+            data = self._episode_page(show_id, offset, limit)
             items = data.get("items", [])
             if not items:
                 break
@@ -98,28 +229,101 @@ class SpotifyClient:
                 break
             offset += limit
 
-    def map_episode(self, raw: Dict, show_name: str) -> Episode:
+    def _prefetched_pages(self, show_id: str, offsets: range, limit: int, depth: int) -> Iterator[Dict]:
+        # One small pool per backfill: a shared one would serialize shows processed in parallel.
+        pool = ThreadPoolExecutor(max_workers=depth, thread_name_prefix="spotify-prefetch")
+        pending: Deque[Future] = deque()
+        remaining = iter(offsets)
+
+        def submit() -> None:
+            offset = next(remaining, None)
+            if offset is not None:
+                # Copy the context so spans recorded on pool threads keep the current show.
+                pending.append(pool.submit(contextvars.copy_context().run, self._episode_page, show_id, offset, limit))
+
+        try:
+            for _ in range(depth):
+                submit()
+            while pending:
+                data = pending.popleft().result()
+                submit()
+                items = data.get("items", [])
+                yield from items
+                if not items or data.get("next") is None:
+                    break
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _release_datetime(raw: Dict) -> datetime:
         release_date = raw.get("release_date") or raw.get("release_date_precision")
-        published_at = datetime.fromisoformat(release_date)
+        return datetime.fromisoformat(release_date)
+
+    def latest_release(self, show_id: str) -> Optional[datetime]:
+        """Release time of the newest episode, from a single one-item page."""
+
+        items = self._episode_page(show_id, 0, 1).get("items", [])
+        return self._release_datetime(items[0]) if items else None
+
+    def recent_releases(self, show_id: str, count: int) -> List[datetime]:
+        """Release times of the newest ``count`` episodes, from a single page."""
+
+        items = self._episode_page(show_id, 0, count).get("items", [])
+        return [self._release_datetime(item) for item in items]
+
+    def map_episode(self, raw: Dict, show_name: str, show_id: Optional[str] = None) -> Episode:
         return Episode(
             id=raw.get("id", ""),
-            show_id=raw.get("show", {}).get("id", ""),
+            show_id=raw.get("show", {}).get("id", "") or show_id or "",
             show_name=show_name,
             title=raw.get("name", ""),
             description=raw.get("description"),
-            published_at=published_at,
+            published_at=self._release_datetime(raw),
             duration_ms=raw.get("duration_ms", 0),
             spotify_url=raw.get("external_urls", {}).get("spotify", ""),
         )
 
-    def get_new_episodes(self, show_id: str, last_processed: Optional[datetime]) -> List[Episode]:
-        show_data = self.get_show(show_id)
+    def get_new_episodes(
+        self,
+        show_id: str,
+        last_processed: Optional[datetime],
+        show: Optional[Dict] = None,
+        max_episodes: Optional[int] = None,
+        max_age: Optional[timedelta] = None,
+        probe: bool = False,
+    ) -> List[Episode]:
+        """Return unseen episodes, oldest first.
+
+        ``show`` is the show object from :meth:`get_shows`; without it the show is fetched on its own.
+        ``max_episodes`` and ``max_age`` bound how far back paging goes. With ``probe``, a show
+        that has state is first checked with a one-episode request and skipped when nothing is newer.
+        """
+
+        if probe and last_processed is not None:
+            latest = self.latest_release(show_id)
+            if latest is None or latest <= last_processed:
+                return []
+
+        show_data = show if show is not None else self.get_show(show_id)
         show_name = show_data.get("name", show_id)
+        cutoff = last_processed
+        if max_age is not None:
+            oldest = datetime.utcnow() - max_age
+            cutoff = max(cutoff, oldest) if cutoff else oldest
+
+        options: Dict[str, int] = {}
+        if max_episodes is not None:
+            options["max_items"] = max_episodes
+        if last_processed is None and self.prefetch_pages:
+            options["prefetch"] = self.prefetch_pages
+
         episodes: List[Episode] = []
-        for raw in self.iter_episodes(show_id):
-            episode = self.map_episode(raw, show_name)
-            if last_processed and episode.published_at <= last_processed:
+        for raw in self.iter_episodes(show_id, **options):
+            episode = self.map_episode(raw, show_name, show_id)
+            if cutoff and episode.published_at <= cutoff:
                 break
             episodes.append(episode)
+            if max_episodes is not None and len(episodes) >= max_episodes:
+                break
         episodes.sort(key=lambda e: e.published_at)
         return episodes
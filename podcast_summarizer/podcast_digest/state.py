@@ -1,29 +1,178 @@
-"""State persistence helpers."""
+"""State persistence helpers.
+
+Several workers (``run --shard i/N``) may share one state file. Markers only ever move
+forward: a save merges this process's updates into what is on disk, keeping the later
+date per show, so workers never overwrite each other's progress.
+"""
 from __future__ import annotations
 
 import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Set
+
+from podcast_digest import metrics
+
+LOGGER = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+# A lease not released within this time is assumed to belong to a crashed worker.
+LEASE_SECONDS = 30.0
+# How long a save waits for another worker's lease (or SQLite write lock).
+LEASE_TIMEOUT_SECONDS = 60.0
+_LEASE_POLL_SECONDS = 0.05
+
+
+class StateLockError(TimeoutError):
+    """Another worker held the state lease for longer than the timeout."""
+
+
+class StateLease:
+    """Exclusive, expiring lock on a state file, held as ``<state>.lock`` next to it.
+
+    The lock file is created with ``O_EXCL`` (atomic on local disks and NFSv3+) and records
+    its owner and expiry. An expired lease is removed and re-acquired, so a worker that
+    crashed while saving blocks the others for at most ``ttl`` seconds.
+    """
+
+    def __init__(self, path: Path, ttl: float = LEASE_SECONDS, timeout: float = LEASE_TIMEOUT_SECONDS) -> None:
+        self.path = path.with_name(f"{path.name}.lock")
+        self.ttl = ttl
+        self.timeout = timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire(self) -> None:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if self._break_expired():
+                    continue
+                if time.monotonic() >= deadline:
+                    raise StateLockError(f"{self.path} is held by {self._read().get('owner', 'another worker')}")
+                time.sleep(_LEASE_POLL_SECONDS)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"owner": self.owner, "expires_at": time.time() + self.ttl}, handle)
+            return
+
+    def release(self) -> None:
+        if self._read().get("owner") == self.owner:
+            self.path.unlink(missing_ok=True)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _break_expired(self) -> bool:
+        lease = self._read()
+        try:
+            expires_at = float(lease["expires_at"])
+        except (KeyError, TypeError, ValueError):
+            # Not written yet (or the holder died before writing it): go by the file age.
+            try:
+                expires_at = self.path.stat().st_mtime + self.ttl
+            except FileNotFoundError:
+                return True
+        if time.time() < expires_at:
+            return False
+        LOGGER.warning("Taking over expired state lease %s from %s", self.path, lease.get("owner", "unknown"))
+        # Only remove the lease judged expired, not one another worker has taken over since.
+        if self._read() == lease:
+            self.path.unlink(missing_ok=True)
+        return True
+
+    def __enter__(self) -> "StateLease":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+def _later(current: Optional[str], candidate: str) -> str:
+    if current is None or datetime.fromisoformat(candidate) > datetime.fromisoformat(current):
+        return candidate
+    return current
 
 
 class StateStore:
-    """Persist last processed markers for shows."""
+    """Persist last processed markers for shows.
+
+    Updates made inside :meth:`transaction` are written once, when the outermost
+    transaction exits, and are rolled back if it raises. Every write goes to a temporary
+    file that atomically replaces ``path``, so a crash never leaves a truncated state file.
+    Saves hold a :class:`StateLease` while they re-read the file and merge in the shows
+    this process updated, so concurrent workers keep each other's markers.
+    """
 
     def __init__(self, path: Path) -> None:
         self.path = path
         self._data: Dict[str, str] = {}
+        # Shows updated since the last save; only these are merged into the file.
+        self._changed: Set[str] = set()
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._dirty = False
         self.load()
 
-    def load(self) -> None:
+    def _read_file(self) -> Dict[str, str]:
         if self.path.exists():
-            self._data = json.loads(self.path.read_text(encoding="utf-8"))
-        else:
-            self._data = {}
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        return {}
+
+    def load(self) -> None:
+        self._data = self._read_file()
 
     def save(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(json.dumps(self._data, indent=2), encoding="utf-8")
+        with self._lock, metrics.span("state_save"):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with StateLease(self.path):
+                merged = self._read_file()
+                for show_id in self._changed:
+                    merged[show_id] = _later(merged.get(show_id), self._data[show_id])
+                fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                        json.dump(merged, handle, indent=2)
+                        handle.flush()
+                        os.fsync(handle.fileno())
+                    os.replace(tmp_name, self.path)
+                except BaseException:
+                    Path(tmp_name).unlink(missing_ok=True)
+                    raise
+            self._data = merged
+            self._changed.clear()
+            self._dirty = False
+
+    @contextmanager
+    def transaction(self) -> Iterator["StateStore"]:
+        with self._lock:
+            snapshot = (dict(self._data), set(self._changed)) if self._depth == 0 else None
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if snapshot is not None:
+                    self._data, self._changed = snapshot
+                    self._dirty = False
+                raise
+            self._depth -= 1
+            if self._depth == 0 and self._dirty:
+                self.save()
 
     def last_processed(self, show_id: str) -> Optional[datetime]:
         raw = self._data.get(show_id)
@@ -32,5 +181,101 @@ class StateStore:
         return datetime.fromisoformat(raw)
 
     def update_last_processed(self, show_id: str, published_at: datetime) -> None:
-        self._data[show_id] = published_at.isoformat()
-        self.save()
+        with self._lock:
+            self._data[show_id] = published_at.isoformat()
+            self._changed.add(show_id)
+            if self._depth:
+                self._dirty = True
+            else:
+                self.save()
+
+    def close(self) -> None:
+        """Nothing is held open between saves."""
+
+
+class SqliteStateStore(StateStore):
+    """Keeps last processed markers in a SQLite database in WAL mode.
+
+    Each update is a single-row upsert that keeps the later date, so the cost does not grow
+    with the number of shows. Updates inside :meth:`transaction` are buffered and written in
+    one short write transaction at the end, so concurrent workers only wait on each other for
+    the commit rather than for a whole run.
+    """
+
+    UPSERT = (
+        "INSERT INTO last_processed (show_id, published_at) VALUES (?, ?) "
+        "ON CONFLICT(show_id) DO UPDATE SET published_at = max(published_at, excluded.published_at)"
+    )
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._pending: Dict[str, str] = {}
+        self._conn = sqlite3.connect(
+            str(path), timeout=LEASE_TIMEOUT_SECONDS, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS last_processed (show_id TEXT PRIMARY KEY, published_at TEXT NOT NULL)"
+        )
+        super().__init__(path)
+
+    def load(self) -> None:
+        with self._lock:
+            rows = self._conn.execute("SELECT show_id, published_at FROM last_processed").fetchall()
+            self._data = dict(rows)
+
+    def save(self) -> None:
+        # Rows are written as they change or when the transaction ends; nothing else is buffered.
+        self._dirty = False
+
+    def _write(self, rows: Dict[str, str]) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(self.UPSERT, list(rows.items()))
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self) -> Iterator["StateStore"]:
+        with self._lock:
+            outermost = self._depth == 0
+            snapshot = dict(self._data) if outermost else None
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if outermost:
+                    self._pending.clear()
+                    self._data = snapshot
+                raise
+            self._depth -= 1
+            if outermost and self._pending:
+                try:
+                    with metrics.span("state_save"):
+                        self._write(self._pending)
+                finally:
+                    self._pending.clear()
+
+    def update_last_processed(self, show_id: str, published_at: datetime) -> None:
+        with self._lock:
+            value = published_at.isoformat()
+            self._data[show_id] = value
+            if self._depth:
+                self._pending[show_id] = value
+            else:
+                self._write({show_id: value})
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_state_store(path: Path) -> StateStore:
+    """Pick the backend from the state file suffix: SQLite for ``.db``/``.sqlite``, JSON otherwise."""
+
+    if path.suffix.lower() in SQLITE_SUFFIXES:
+        return SqliteStateStore(path)
+    return StateStore(path)
@@ -0,0 +1,73 @@
+"""Content-addressed cache of episode summaries."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from podcast_digest.cache import DEFAULT_MAX_BYTES, DiskCache
+from podcast_digest.features import DEFAULT_EXTRACTOR, FeatureExtractor
+from podcast_digest.models import Episode, EpisodeSummary, summary_from_dict, summary_to_dict
+from podcast_digest.renderer import SUMMARIZER_VERSION
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SummaryCache:
+    """Maps (transcript hash, summarizer version, strategy and lexicons, episode id) to the summary and its Markdown.
+
+    Bumping ``SUMMARIZER_VERSION`` changes every key, so stale entries are never served
+    and age out through LRU eviction; :meth:`invalidate` drops them immediately.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+
+    @staticmethod
+    def key(
+        episode: Episode,
+        transcript_text: str,
+        strategy: str = "positional",
+        features: FeatureExtractor = DEFAULT_EXTRACTOR,
+    ) -> str:
+        digest = hashlib.sha256(transcript_text.encode("utf-8")).hexdigest()
+        return SummaryCache.key_for_digest(episode, digest, strategy, features)
+
+    @staticmethod
+    def key_for_digest(
+        episode: Episode,
+        digest: str,
+        strategy: str = "positional",
+        features: FeatureExtractor = DEFAULT_EXTRACTOR,
+    ) -> str:
+        """Like :meth:`key`, for a transcript whose SHA-256 was computed incrementally."""
+
+        # Positional keys with the default lexicons keep their original form so existing caches stay valid.
+        version = SUMMARIZER_VERSION if strategy == "positional" else f"{SUMMARIZER_VERSION}-{strategy}"
+        if not features.is_default:
+            version = f"{version}-{features.fingerprint}"
+        return f"{digest}:{version}:{episode.id}"
+
+    def get(self, key: str) -> Optional[Tuple[EpisodeSummary, str]]:
+        raw = self.store.get(key)
+        if raw is None:
+            return None
+        try:
+            payload = json.loads(raw)
+            return summary_from_dict(payload["summary"]), payload["markdown"]
+        except (ValueError, KeyError, TypeError):
+            LOGGER.warning("Dropping unreadable summary cache entry %s", key)
+            self.store.delete(key)
+            return None
+
+    def put(self, key: str, summary: EpisodeSummary, markdown: str) -> None:
+        payload = {"summary": summary_to_dict(summary), "markdown": markdown}
+        self.store.set(key, json.dumps(payload).encode("utf-8"))
+
+    def invalidate(self) -> None:
+        self.store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.store.hits, "misses": self.store.misses, "size_bytes": self.store.size}
@@ -1,14 +1,84 @@
 """Transcript provider abstractions."""
 from __future__ import annotations
 
+import contextvars
+import gzip
+import hashlib
+import io
+import itertools
+import json
 import logging
+import math
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Sequence, TextIO, Tuple
 
 from podcast_digest.models import Episode, TranscriptResult
 
 LOGGER = logging.getLogger(__name__)
 
+TRANSCRIPT_CHUNK_CHARS = 64 * 1024
+PLAIN_SUFFIX = ".txt"
+COMPRESSED_SUFFIX = ".txt.gz"
+INDEX_DIR = ".index"
+MANIFEST_NAME = "manifest.json"
+
+
+def _split_transcript_name(name: str) -> Optional[Tuple[str, str]]:
+    for suffix in (COMPRESSED_SUFFIX, PLAIN_SUFFIX):
+        if name.endswith(suffix) and not name.startswith("."):
+            return name[: -len(suffix)], suffix
+    return None
+
+
+def shard_for(episode_id: str) -> str:
+    return hashlib.sha1(episode_id.encode("utf-8")).hexdigest()[:2]
+
+
+@contextmanager
+def open_transcript(path: Path) -> Iterator[TextIO]:
+    """Open a cached transcript as text; ``.txt.gz`` files are memory-mapped and decompressed on the fly.
+
+    A zero-byte ``.txt.gz`` (say, left behind by a crash) reads as an empty transcript.
+    """
+
+    if not path.name.endswith(COMPRESSED_SUFFIX):
+        with path.open("r", encoding="utf-8") as handle:
+            yield handle
+        return
+    with path.open("rb") as raw:
+        if os.fstat(raw.fileno()).st_size == 0:
+            # mmap cannot map an empty file.
+            yield io.StringIO()
+            return
+        with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with gzip.GzipFile(fileobj=mapped, mode="rb") as decompressed:
+                with io.TextIOWrapper(decompressed, encoding="utf-8") as handle:
+                    yield handle
+
+
+def read_transcript(path: Path) -> str:
+    with open_transcript(path) as handle:
+        return handle.read()
+
+
+def iter_text_chunks(path: Path, chunk_chars: int = TRANSCRIPT_CHUNK_CHARS) -> Iterator[str]:
+    with open_transcript(path) as handle:
+        while True:
+            chunk = handle.read(chunk_chars)
+            if not chunk:
+                break
+            yield chunk
+
 
 class TranscriptProvider:
     """Interface for transcript providers."""
@@ -16,23 +86,274 @@ class TranscriptProvider:
     def get_transcript(self, episode: Episode) -> TranscriptResult:
         raise NotImplementedError
 
+    def stream_transcript(self, episode: Episode) -> TranscriptResult:
+        """Like :meth:`get_transcript`, but providers may return ``chunks`` instead of loading ``text``."""
+
+        return self.get_transcript(episode)
+
+    def refresh(self) -> None:
+        """Pick up transcripts that appeared since the provider was created (long-running processes)."""
+
+    def close(self) -> None:
+        """Release threads or connections held by the provider."""
+
+
+def prefetch_transcripts(
+    fetch: Callable[[Episode], TranscriptResult], episodes: Iterable[Episode], depth: int
+) -> Iterator[Tuple[Episode, TranscriptResult]]:
+    """Yield ``(episode, fetch(episode))`` in order, fetching up to ``depth`` episodes ahead.
+
+    Fetches run one at a time on a background thread, so providers see episodes in the same
+    order as without prefetching (the boilerplate index relies on it) while the caller
+    summarizes earlier ones. Fetches not yet consumed when the caller stops are cancelled.
+    """
+
+    if depth <= 0:
+        for episode in episodes:
+            yield episode, fetch(episode)
+        return
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcript-prefetch")
+    pending: Deque[Tuple[Episode, Future]] = deque()
+    remaining = iter(episodes)
+
+    def submit() -> None:
+        episode = next(remaining, None)
+        if episode is not None:
+            # Copy the context so spans recorded on the prefetch thread keep the current show.
+            pending.append((episode, pool.submit(contextvars.copy_context().run, fetch, episode)))
+
+    try:
+        for _ in range(depth):
+            submit()
+        while pending:
+            episode, future = pending.popleft()
+            result = future.result()
+            submit()
+            yield episode, result
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class TranscriptIndex:
+    """Manifest of cached transcripts, so availability checks need no per-episode syscalls.
+
+    Transcripts live in hash-prefix shard directories (``<cache>/<ab>/<episode_id>.txt[.gz]``);
+    plain files dropped straight into the cache root are still picked up. The manifest is
+    stored under ``.index/`` together with the cache root's mtime, so a run only rescans the
+    root when files were added or removed there since the manifest was written.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+        self.manifest_path = cache_dir / INDEX_DIR / MANIFEST_NAME
+        self._entries: Optional[Dict[str, str]] = None
+        self._root_mtime_ns = 0
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> Dict[str, str]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._load()
+        return self._entries
+
+    def lookup(self, episode_id: str) -> Optional[Path]:
+        relative = self.entries.get(episode_id)
+        return self.cache_dir / relative if relative else None
+
+    def refresh(self) -> None:
+        """Pick up transcripts added to the cache root since the manifest was loaded."""
+
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            elif self._root_changed():
+                self._rescan_root()
+                self._save()
+
+    def rescan(self) -> None:
+        """Rebuild the manifest from the cache root and every shard directory.
+
+        Unlike :meth:`refresh` this also finds files written straight into shard directories,
+        at the cost of listing them all.
+        """
+
+        with self._lock:
+            (self.cache_dir / INDEX_DIR).mkdir(parents=True, exist_ok=True)
+            previous = self._entries
+            self._entries = {}
+            self._scan_all()
+            if self._entries != previous:
+                self._save()
+
+    def _root_changed(self) -> bool:
+        return self.cache_dir.stat().st_mtime_ns != self._root_mtime_ns
+
+    def _load(self) -> None:
+        (self.cache_dir / INDEX_DIR).mkdir(parents=True, exist_ok=True)
+        try:
+            payload = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            self._entries = dict(payload["entries"])
+            self._root_mtime_ns = int(payload["root_mtime_ns"])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            self._entries = {}
+            self._scan_all()
+            self._save()
+            return
+        if self._root_changed():
+            self._rescan_root()
+            self._save()
+
+    @staticmethod
+    def _add(entries: Dict[str, str], episode_id: str, suffix: str, relative: str) -> None:
+        # Prefer the compressed copy when both formats exist.
+        if suffix == COMPRESSED_SUFFIX or episode_id not in entries:
+            entries[episode_id] = relative
+
+    def _rescan_root(self) -> None:
+        entries = {key: value for key, value in self._entries.items() if "/" in value}
+        self._root_mtime_ns = self.cache_dir.stat().st_mtime_ns
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                parsed = _split_transcript_name(entry.name)
+                if parsed and entry.is_file():
+                    self._add(entries, parsed[0], parsed[1], entry.name)
+        self._entries = entries
+
+    def _scan_all(self) -> None:
+        self._rescan_root()
+        entries = self._entries
+        with os.scandir(self.cache_dir) as it:
+            shards = [entry.name for entry in it if entry.is_dir() and len(entry.name) == 2]
+        for shard in shards:
+            with os.scandir(self.cache_dir / shard) as it:
+                for entry in it:
+                    parsed = _split_transcript_name(entry.name)
+                    if parsed and entry.is_file():
+                        self._add(entries, parsed[0], parsed[1], f"{shard}/{entry.name}")
+
+    def _save(self) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.manifest_path.parent, prefix=".manifest-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"root_mtime_ns": self._root_mtime_ns, "entries": self._entries}, handle)
+            os.replace(tmp_name, self.manifest_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def reindex(self) -> int:
+        """Move root-level transcripts into their shard directories and rebuild the manifest.
+
+        Returns the number of files moved.
+        """
+
+        with self._lock:
+            (self.cache_dir / INDEX_DIR).mkdir(parents=True, exist_ok=True)
+            moved = 0
+            with os.scandir(self.cache_dir) as it:
+                flat = [entry.name for entry in it if entry.is_file() and _split_transcript_name(entry.name)]
+            for name in flat:
+                episode_id, _ = _split_transcript_name(name)
+                shard_dir = self.cache_dir / shard_for(episode_id)
+                shard_dir.mkdir(exist_ok=True)
+                os.replace(self.cache_dir / name, shard_dir / name)
+                moved += 1
+            self._entries = {}
+            self._scan_all()
+            self._save()
+            return moved
+
+    def update(self, paths: Dict[str, Path]) -> None:
+        """Point episodes at new files (e.g. after compression) and persist the manifest once."""
+
+        entries = self.entries
+        with self._lock:
+            for episode_id, path in paths.items():
+                entries[episode_id] = path.relative_to(self.cache_dir).as_posix()
+            self._save()
+
 
 class CachedTranscriptProvider(TranscriptProvider):
-    """Reads transcripts from the local cache directory if present."""
+    """Reads transcripts from the local cache directory if present.
+
+    Both plain ``<episode_id>.txt`` and gzip-compressed ``<episode_id>.txt.gz`` files are
+    recognised, in shard directories or the cache root; the compressed copy wins when both
+    exist. Lookups go through a :class:`TranscriptIndex` loaded once per provider.
+    """
 
     def __init__(self, cache_dir: Path) -> None:
         self.cache_dir = cache_dir
+        self.index = TranscriptIndex(cache_dir)
 
-    def _cache_path(self, episode: Episode) -> Path:
-        return self.cache_dir / f"{episode.id}.txt"
+    def _locate(self, episode: Episode) -> Optional[Path]:
+        return self.index.lookup(episode.id)
+
+    def refresh(self) -> None:
+        self.index.rescan()
 
     def get_transcript(self, episode: Episode) -> TranscriptResult:
-        path = self._cache_path(episode)
-        if path.exists():
+        path = self._locate(episode)
+        if path is not None:
+            try:
+                text = read_transcript(path)
+            except FileNotFoundError:
+                LOGGER.warning("Transcript index is stale for %s; run reindex", episode.title)
+                return TranscriptResult(status="unavailable", source="cache")
+            except (EOFError, gzip.BadGzipFile):
+                LOGGER.warning("Cached transcript for %s is truncated or corrupt: %s", episode.title, path)
+                return TranscriptResult(status="unavailable", source="cache")
+            if not text:
+                LOGGER.warning("Cached transcript for %s is empty: %s", episode.title, path)
+                return TranscriptResult(status="unavailable", source="cache")
             LOGGER.info("Using cached transcript for %s", episode.title)
-            return TranscriptResult(status="available", text=path.read_text(encoding="utf-8"), source="cache")
+            return TranscriptResult(status="available", text=text, source="cache")
         return TranscriptResult(status="unavailable", source="cache")
 
+    def stream_transcript(self, episode: Episode) -> TranscriptResult:
+        path = self._locate(episode)
+        if path is None:
+            return TranscriptResult(status="unavailable", source="cache")
+        chunks = iter_text_chunks(path)
+        try:
+            first = next(chunks, None)
+        except FileNotFoundError:
+            LOGGER.warning("Transcript index is stale for %s; run reindex", episode.title)
+            return TranscriptResult(status="unavailable", source="cache")
+        except (EOFError, gzip.BadGzipFile):
+            LOGGER.warning("Cached transcript for %s is truncated or corrupt: %s", episode.title, path)
+            return TranscriptResult(status="unavailable", source="cache")
+        if not first:
+            LOGGER.warning("Cached transcript for %s is empty: %s", episode.title, path)
+            return TranscriptResult(status="unavailable", source="cache")
+        LOGGER.info("Streaming cached transcript for %s", episode.title)
+        return TranscriptResult(status="available", chunks=itertools.chain([first], chunks), source="cache")
+
+    def compress_plain_transcripts(self) -> int:
+        """Migrate plain ``.txt`` transcripts to ``.txt.gz`` in place; returns the number converted."""
+
+        converted: Dict[str, Path] = {}
+        for episode_id, relative in sorted(self.index.entries.items()):
+            if not relative.endswith(PLAIN_SUFFIX):
+                continue
+            plain = self.cache_dir / relative
+            target = plain.with_name(plain.name[: -len(PLAIN_SUFFIX)] + COMPRESSED_SUFFIX)
+            fd, tmp_name = tempfile.mkstemp(dir=plain.parent, prefix=".compress-")
+            try:
+                with plain.open("rb") as source, os.fdopen(fd, "wb") as raw:
+                    with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as compressed:
+                        shutil.copyfileobj(source, compressed)
+                os.replace(tmp_name, target)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+            plain.unlink()
+            converted[episode_id] = target
+        self.index.update(converted)
+        self.index.refresh()
+        return len(converted)
+
 
 class NullTranscriptProvider(TranscriptProvider):
     """Fallback provider that marks transcript as unavailable."""
@@ -43,21 +364,259 @@ class NullTranscriptProvider(TranscriptProvider):
 
 
 class ProviderChain(TranscriptProvider):
-    """Tries transcript providers in sequence until one returns available or error."""
+    """Tries transcript providers in sequence until one returns available or error.
+
+    By default each provider is asked in turn on the calling thread. ``timeouts`` (seconds per
+    provider, ``None`` for no limit) skip a provider that has not answered in time; its late
+    answer is discarded. With ``hedge_after`` the next provider is also asked once the current
+    one has been running that long, and the first available transcript wins. After an error
+    no further providers are started, but hedged requests already running may still win.
+    """
 
-    def __init__(self, *providers: TranscriptProvider) -> None:
+    def __init__(
+        self,
+        *providers: TranscriptProvider,
+        timeouts: Optional[Sequence[Optional[float]]] = None,
+        hedge_after: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
         self.providers = providers
+        self.timeouts = list(timeouts) if timeouts is not None else [None] * len(providers)
+        if len(self.timeouts) != len(providers):
+            raise ValueError("ProviderChain needs one timeout per provider")
+        self.hedge_after = hedge_after
+        self.max_workers = max_workers or 4 * len(providers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def concurrent(self) -> bool:
+        return self.hedge_after is not None or any(timeout is not None for timeout in self.timeouts)
 
     def get_transcript(self, episode: Episode) -> TranscriptResult:
+        return self._ask("get_transcript", episode)
+
+    def stream_transcript(self, episode: Episode) -> TranscriptResult:
+        return self._ask("stream_transcript", episode)
+
+    def refresh(self) -> None:
+        for provider in self.providers:
+            provider.refresh()
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                # Timed-out requests are abandoned rather than waited for.
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
         for provider in self.providers:
-            result = provider.get_transcript(episode)
-            if result.status in {"available", "error"}:
-                return result
-        return TranscriptResult(status="unavailable", source="chain")
+            provider.close()
+
+    def _ask(self, method: str, episode: Episode) -> TranscriptResult:
+        if not self.concurrent:
+            for provider in self.providers:
+                result = getattr(provider, method)(episode)
+                if result.status in {"available", "error"}:
+                    return result
+            return TranscriptResult(status="unavailable", source="chain")
+        return self._race(method, episode)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="transcript")
+            return self._executor
+
+    def _race(self, method: str, episode: Episode) -> TranscriptResult:
+        pool = self._pool()
+        pending: Dict[Future, int] = {}
+        deadlines: Dict[Future, float] = {}
+        launched = 0
+        hedge_at = math.inf
+        error: Optional[TranscriptResult] = None
+
+        def launch() -> None:
+            nonlocal launched, hedge_at
+            index = launched
+            launched += 1
+            call = getattr(self.providers[index], method)
+            future = pool.submit(contextvars.copy_context().run, call, episode)
+            now = time.monotonic()
+            pending[future] = index
+            timeout = self.timeouts[index]
+            deadlines[future] = now + timeout if timeout is not None else math.inf
+            hedge_at = now + self.hedge_after if self.hedge_after is not None else math.inf
+
+        launch()
+        while pending:
+            can_hedge = error is None and launched < len(self.providers)
+            wake = min(min(deadlines[future] for future in pending), hedge_at if can_hedge else math.inf)
+            wait_for = None if wake == math.inf else max(wake - time.monotonic(), 0.0)
+            done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=pending.__getitem__):
+                pending.pop(future)
+                result = future.result()
+                if result.status == "available":
+                    return result
+                if result.status == "error" and error is None:
+                    error = result
+            now = time.monotonic()
+            for future in [future for future in pending if deadlines[future] <= now]:
+                index = pending.pop(future)
+                LOGGER.warning(
+                    "Transcript provider %s timed out after %gs for %s",
+                    type(self.providers[index]).__name__,
+                    self.timeouts[index],
+                    episode.title,
+                )
+            if error is None and launched < len(self.providers) and (not pending or now >= hedge_at):
+                launch()
+        return error or TranscriptResult(status="unavailable", source="chain")
+
+
+class NegativeCache:
+    """Persistent record of transcript misses per ``(episode id, provider)``, with re-check backoff.
+
+    After the n-th consecutive miss a provider is not asked again for ``ttl * 2**(n-1)``, capped
+    at ``max_backoff``. Episodes published more than ``max_age`` ago are not re-checked once
+    they missed. Entries not consulted for ``max_age`` are dropped when the file is loaded or saved.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: timedelta = timedelta(hours=6),
+        max_backoff: timedelta = timedelta(days=7),
+        max_age: timedelta = timedelta(days=30),
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_backoff = max_backoff
+        self.max_age = max_age
+        self.clock = clock
+        self._max_exponent = max(0, math.ceil(math.log2(max_backoff / ttl)))
+        self.skipped = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        try:
+            entries = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except ValueError:
+            LOGGER.warning("Ignoring unreadable negative cache %s", path)
+            return
+        cutoff = clock() - max_age
+        self._entries = {
+            key: entry for key, entry in entries.items() if datetime.fromisoformat(entry["seen"]) >= cutoff
+        }
+        # Expired entries are dropped on load; the file is only rewritten when something changed.
+        self._dirty = len(self._entries) != len(entries)
+
+    @staticmethod
+    def _key(episode: Episode, provider: str) -> str:
+        return f"{provider}\x1f{episode.id}"
+
+    def should_check(self, episode: Episode, provider: str) -> bool:
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(self._key(episode, provider))
+            if entry is None:
+                return True
+            # Kept in memory and saved with the next change, so lookups alone do not rewrite the file.
+            entry["seen"] = now.isoformat()
+            if now - episode.published_at <= self.max_age:
+                # Cap the exponent first: ttl * 2**misses overflows timedelta after ~30 misses.
+                exponent = min(entry["misses"] - 1, self._max_exponent)
+                wait = min(self.ttl * 2**exponent, self.max_backoff)
+                if now >= datetime.fromisoformat(entry["checked"]) + wait:
+                    return True
+            self.skipped += 1
+            return False
+
+    def record(self, episode: Episode, provider: str, available: bool) -> None:
+        key = self._key(episode, provider)
+        with self._lock:
+            if available:
+                self._dirty |= self._entries.pop(key, None) is not None
+                return
+            now = self.clock().isoformat()
+            entry = self._entries.setdefault(key, {"misses": 0})
+            entry.update(misses=entry["misses"] + 1, checked=now, seen=now)
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            cutoff = self.clock() - self.max_age
+            self._entries = {
+                key: entry for key, entry in self._entries.items() if datetime.fromisoformat(entry["seen"]) >= cutoff
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(self._entries, handle)
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+            self._dirty = False
+
+    def stats(self) -> str:
+        return f"{self.skipped} provider checks skipped, {len(self._entries)} misses remembered"
+
+
+class NegativeCachingProvider(TranscriptProvider):
+    """Wraps a provider and skips it for episodes it recently had no transcript for.
+
+    Only ``unavailable`` answers are remembered; errors are retried on the next request.
+    """
+
+    def __init__(self, provider: TranscriptProvider, cache: NegativeCache, name: Optional[str] = None) -> None:
+        self.provider = provider
+        self.cache = cache
+        self.name = name or type(provider).__name__
+
+    def _ask(self, call: Callable[[Episode], TranscriptResult], episode: Episode) -> TranscriptResult:
+        if not self.cache.should_check(episode, self.name):
+            return TranscriptResult(status="unavailable", source="negative-cache")
+        result = call(episode)
+        if result.status != "error":
+            self.cache.record(episode, self.name, result.status == "available")
+        return result
+
+    def get_transcript(self, episode: Episode) -> TranscriptResult:
+        return self._ask(self.provider.get_transcript, episode)
+
+    def stream_transcript(self, episode: Episode) -> TranscriptResult:
+        return self._ask(self.provider.stream_transcript, episode)
+
+    def refresh(self) -> None:
+        self.provider.refresh()
+
+    def close(self) -> None:
+        self.provider.close()
+        self.cache.save()
+
 
+def load_provider(
+    cache_dir: Path,
+    timeout: Optional[float] = None,
+    hedge_after: Optional[float] = None,
+    negative_cache: Optional[NegativeCache] = None,
+    remote: Sequence[TranscriptProvider] = (),
+) -> TranscriptProvider:
+    """Create a default provider chain using local cache first, then any ``remote`` providers.
 
-def load_provider(cache_dir: Path) -> TranscriptProvider:
-    """Create a default provider chain using local cache first."""
+    With a ``negative_cache`` only the remote providers are wrapped: the local cache lookup is
+    cheap, and remembering its misses would hide transcripts dropped into it later.
+    """
 
     cache_dir.mkdir(parents=True, exist_ok=True)
-    return ProviderChain(CachedTranscriptProvider(cache_dir), NullTranscriptProvider())
+    if negative_cache is not None:
+        remote = [NegativeCachingProvider(provider, negative_cache) for provider in remote]
+    providers = (CachedTranscriptProvider(cache_dir), *remote, NullTranscriptProvider())
+    return ProviderChain(*providers, timeouts=[timeout] * len(providers), hedge_after=hedge_after)
@@ -0,0 +1,109 @@
+"""Keep-alive HTTP transport shared by the API clients."""
+from __future__ import annotations
+
+import http.client
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib import parse
+
+LOGGER = logging.getLogger(__name__)
+
+HostKey = Tuple[str, str, int]
+
+
+@dataclass
+class TransportResponse:
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def text(self) -> str:
+        return self.body.decode()
+
+
+class ConnectionPool:
+    """Reuses ``http.client`` connections per host; safe to share across threads.
+
+    A connection is checked out for the duration of one request/response exchange
+    and returned to the idle list afterwards, so concurrent callers never share a socket.
+    """
+
+    def __init__(self, timeout: float = 10.0, max_idle_per_host: int = 8) -> None:
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[HostKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _host_key(self, parts: parse.SplitResult) -> HostKey:
+        scheme = parts.scheme or "https"
+        default_port = 443 if scheme == "https" else 80
+        return scheme, parts.hostname or "", parts.port or default_port
+
+    def _acquire(self, key: HostKey) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _release(self, key: HostKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[bytes] = None,
+    ) -> TransportResponse:
+        parts = parse.urlsplit(url)
+        key = self._host_key(parts)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        while True:
+            conn = self._acquire(key)
+            reused = conn.sock is not None
+            try:
+                conn.request(method, target, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.HTTPException, ConnectionError) as exc:
+                conn.close()
+                if reused:
+                    # The server dropped an idle keep-alive socket; retry on a fresh connection.
+                    LOGGER.debug("Retrying %s %s after stale connection: %s", method, url, exc)
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return TransportResponse(
+                status=resp.status,
+                body=data,
+                headers={name.lower(): value for name, value in resp.getheaders()},
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
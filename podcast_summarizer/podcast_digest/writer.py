@@ -0,0 +1,286 @@
+"""Streaming writers for the daily digest document in Markdown, JSON and HTML."""
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from html import escape, unescape
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from podcast_digest.models import EpisodeOutcome, outcome_from_record, outcome_to_record
+from podcast_digest.renderer import outcome_to_dict, render_daily_overview, render_daily_overview_html, render_outcome_html
+
+_SHOW_MARKER = re.compile(r"^<!-- show:(.+?) -->$", re.MULTILINE)
+_EPISODE_MARKER = re.compile(r"^<!-- episode:(.+?) -->$", re.MULTILINE)
+_STATS_LINE = re.compile(r"New episodes: (\d+) \| Summarized: (\d+) \| Transcript unavailable: (\d+)")
+_HTML_SECTION = re.compile(r'<section class="show" data-show="([^"]*)">\n.*?</section>\n', re.DOTALL)
+_HTML_EPISODE_ID = re.compile(r'<article class="episode" id="episode-([^"]*)">')
+_HTML_FOOTER = "</body>\n</html>\n"
+# Shard workers write their sections here, below the output directory.
+SHARD_DIRECTORY = "shards"
+
+Stats = Dict[str, int]
+
+
+def _empty_stats() -> Stats:
+    return {"total": 0, "summarized": 0, "unavailable": 0}
+
+
+def _stats_from_text(content: str) -> Stats:
+    match = _STATS_LINE.search(content)
+    if not match:
+        return _empty_stats()
+    total, summarized, unavailable = (int(value) for value in match.groups())
+    return {"total": total, "summarized": summarized, "unavailable": unavailable}
+
+
+class DigestWriter:
+    """Streams show sections to a partial file and atomically publishes the digest on :meth:`finalize`.
+
+    The daily overview depends on counts that are only known at the end, so sections go to a
+    temporary body file first and are copied behind the overview when the run finishes.
+    In append mode the existing day file is kept verbatim: episodes for shows it already lists
+    are added to the end of their section, episodes already present are skipped, and only the
+    overview is regenerated. Subclasses supply the format-specific pieces; this class writes Markdown.
+    """
+
+    suffix = ".md"
+
+    def __init__(self, output_dir: Path, date: datetime, append: bool = False) -> None:
+        self.date = date
+        self.path = output_dir / self.filename(date)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.previous_stats: Stats = _empty_stats()
+        # Existing sections in document order, and the episode keys already listed per show id.
+        self._sections: List[Tuple[str, Any]] = []
+        self._known: Dict[str, Set[str]] = {}
+        self._additions: Dict[str, List[Any]] = {}
+        self._shows_written = 0
+        if append and self.path.exists():
+            self._parse_existing(self.path.read_text(encoding="utf-8"))
+        fd, self._body_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".partial")
+        self._body = os.fdopen(fd, "w", encoding="utf-8")
+
+    # Format hooks -----------------------------------------------------------------
+
+    def filename(self, date: datetime) -> str:
+        return f"{date.date().isoformat()}{self.suffix}"
+
+    def _parse_existing(self, content: str) -> None:
+        self.previous_stats = _stats_from_text(content)
+        # Every show section starts with "\n<!-- show:<id> -->\n## <show name>\n"; splitting on the
+        # marker keeps "## " lines inside summaries from starting a section of their own.
+        markers = list(_SHOW_MARKER.finditer(content))
+        starts = [match.start() - 1 for match in markers]
+        for match, start, end in zip(markers, starts, [*starts[1:], len(content)]):
+            show_id = match.group(1)
+            section = content[start:end]
+            self._sections.append((show_id, section))
+            self._known.setdefault(show_id, set()).update(_EPISODE_MARKER.findall(section))
+
+    def _key(self, outcome: EpisodeOutcome) -> str:
+        return outcome.episode.id
+
+    def _render_addition(self, outcome: EpisodeOutcome) -> Any:
+        # An invisible marker identifies the episode when appending; titles are not unique.
+        return f"<!-- episode:{outcome.episode.id} -->\n{outcome.markdown}"
+
+    def _render_show(self, show_id: str, show_name: str, outcomes: List[EpisodeOutcome]) -> str:
+        return f"\n<!-- show:{show_id} -->\n## {show_name}\n" + "".join(f"\n{self._render_addition(outcome)}" for outcome in outcomes)
+
+    def _render_existing(self, index: int, section: Any, additions: List[Any]) -> str:
+        return section + "".join(f"\n{block}" for block in additions)
+
+    def _header(self, overview: str, stats: Stats) -> str:
+        return render_daily_overview(self.date, overview, stats)
+
+    def _footer(self) -> str:
+        return ""
+
+    # Streaming --------------------------------------------------------------------
+
+    def write_show(self, show_id: str, show_name: str, outcomes: List[EpisodeOutcome]) -> List[EpisodeOutcome]:
+        """Write one show's episodes and return the outcomes that were new to the document."""
+
+        known = self._known.get(show_id)
+        if known is not None:
+            new = [outcome for outcome in outcomes if self._key(outcome) not in known]
+            known.update(self._key(outcome) for outcome in new)
+            self._additions.setdefault(show_id, []).extend(self._render_addition(outcome) for outcome in new)
+            return new
+
+        self._body.write(self._render_show(show_id, show_name, outcomes))
+        self._body.flush()
+        self._shows_written += 1
+        return list(outcomes)
+
+    def finalize(self, overview: str, stats: Stats) -> Path:
+        self._body.close()
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                out.write(self._header(overview, stats))
+                for index, (show_id, section) in enumerate(self._sections):
+                    out.write(self._render_existing(index, section, self._additions.get(show_id, [])))
+                with open(self._body_path, "r", encoding="utf-8") as body:
+                    shutil.copyfileobj(body, out)
+                out.write(self._footer())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        finally:
+            Path(self._body_path).unlink(missing_ok=True)
+        return self.path
+
+    def abort(self) -> None:
+        self._body.close()
+        Path(self._body_path).unlink(missing_ok=True)
+
+
+class JsonDigestWriter(DigestWriter):
+    """Writes ``{"date", "overview", "stats", "shows": [{"id", "name", "episodes": [...]}]}``."""
+
+    suffix = ".json"
+
+    def _parse_existing(self, content: str) -> None:
+        data = json.loads(content)
+        self.previous_stats = {**_empty_stats(), **data.get("stats", {})}
+        for show in data.get("shows", []):
+            self._sections.append((show["id"], show))
+            self._known.setdefault(show["id"], set()).update(episode["id"] for episode in show["episodes"])
+
+    def _key(self, outcome: EpisodeOutcome) -> str:
+        return outcome.episode.id
+
+    def _render_addition(self, outcome: EpisodeOutcome) -> Any:
+        return outcome_to_dict(outcome)
+
+    def _separator(self) -> str:
+        return ",\n" if self._sections or self._shows_written else "\n"
+
+    def _render_show(self, show_id: str, show_name: str, outcomes: List[EpisodeOutcome]) -> str:
+        show = {"id": show_id, "name": show_name, "episodes": [outcome_to_dict(outcome) for outcome in outcomes]}
+        return self._separator() + json.dumps(show, ensure_ascii=False)
+
+    def _render_existing(self, index: int, section: Any, additions: List[Any]) -> str:
+        show = {**section, "episodes": [*section["episodes"], *additions]}
+        return (",\n" if index else "\n") + json.dumps(show, ensure_ascii=False)
+
+    def _header(self, overview: str, stats: Stats) -> str:
+        header = json.dumps({"date": self.date.date().isoformat(), "overview": overview, "stats": stats}, ensure_ascii=False)
+        return header[:-1] + ', "shows": ['
+
+    def _footer(self) -> str:
+        return "\n]}\n"
+
+
+class HtmlDigestWriter(DigestWriter):
+    """Writes a standalone HTML page with one ``<section>`` per show."""
+
+    suffix = ".html"
+
+    def _parse_existing(self, content: str) -> None:
+        self.previous_stats = _stats_from_text(content)
+        for match in _HTML_SECTION.finditer(content):
+            show_id = unescape(match.group(1))
+            self._sections.append((show_id, match.group(0)))
+            self._known.setdefault(show_id, set()).update(
+                unescape(episode_id) for episode_id in _HTML_EPISODE_ID.findall(match.group(0))
+            )
+
+    def _key(self, outcome: EpisodeOutcome) -> str:
+        return outcome.episode.id
+
+    def _render_addition(self, outcome: EpisodeOutcome) -> Any:
+        return render_outcome_html(outcome)
+
+    def _render_show(self, show_id: str, show_name: str, outcomes: List[EpisodeOutcome]) -> str:
+        articles = "".join(render_outcome_html(outcome) for outcome in outcomes)
+        return f'<section class="show" data-show="{escape(show_id)}">\n<h2>{escape(show_name)}</h2>\n{articles}</section>\n'
+
+    def _render_existing(self, index: int, section: Any, additions: List[Any]) -> str:
+        closing = "</section>\n"
+        return section[: -len(closing)] + "".join(additions) + closing
+
+    def _header(self, overview: str, stats: Stats) -> str:
+        return render_daily_overview_html(self.date, overview, stats)
+
+    def _footer(self) -> str:
+        return _HTML_FOOTER
+
+
+class ShardDigestWriter(DigestWriter):
+    """Writes one shard's sections for :func:`read_shard_file` and the ``merge`` command.
+
+    JSON lines under ``<output_dir>/shards``: a header with the date, shard and stats, then
+    one ``{"show_id", "name", "episodes": [...]}`` line per show holding complete outcome
+    records, so the merged digest renders exactly as a single-process run would.
+    """
+
+    suffix = ".jsonl"
+
+    def __init__(self, output_dir: Path, date: datetime, append: bool = False, shard: Tuple[int, int] = (1, 1)) -> None:
+        self.shard = shard
+        self._show_ids: Dict[str, str] = {}
+        super().__init__(output_dir / SHARD_DIRECTORY, date, append=append)
+
+    def filename(self, date: datetime) -> str:
+        index, count = self.shard
+        return f"{date.date().isoformat()}.shard-{index}-of-{count}{self.suffix}"
+
+    def _parse_existing(self, content: str) -> None:
+        header, shows = _parse_shard_lines(content)
+        self.previous_stats = {**_empty_stats(), **header.get("stats", {})}
+        for show in shows:
+            self._sections.append((show["show_id"], show))
+            self._known.setdefault(show["show_id"], set()).update(record["episode"]["id"] for record in show["episodes"])
+
+    def _key(self, outcome: EpisodeOutcome) -> str:
+        return outcome.episode.id
+
+    def _render_addition(self, outcome: EpisodeOutcome) -> Any:
+        return outcome_to_record(outcome)
+
+    def _render_show(self, show_id: str, show_name: str, outcomes: List[EpisodeOutcome]) -> str:
+        show = {
+            "show_id": show_id,
+            "name": show_name,
+            "episodes": [outcome_to_record(outcome) for outcome in outcomes],
+        }
+        return json.dumps(show, ensure_ascii=False) + "\n"
+
+    def _render_existing(self, index: int, section: Any, additions: List[Any]) -> str:
+        return json.dumps({**section, "episodes": [*section["episodes"], *additions]}, ensure_ascii=False) + "\n"
+
+    def _header(self, overview: str, stats: Stats) -> str:
+        header = {"date": self.date.date().isoformat(), "shard": list(self.shard), "stats": stats}
+        return json.dumps(header) + "\n"
+
+
+def _parse_shard_lines(content: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    lines = [json.loads(line) for line in content.splitlines() if line.strip()]
+    if not lines:
+        return {}, []
+    return lines[0], lines[1:]
+
+
+ShardSection = Tuple[str, str, List[EpisodeOutcome]]
+
+
+def read_shard_file(path: Path) -> Tuple[Optional[Tuple[int, int]], List[ShardSection]]:
+    """Return a shard file's ``(index, count)`` and its ``(show_id, show_name, outcomes)`` sections."""
+
+    header, shows = _parse_shard_lines(path.read_text(encoding="utf-8"))
+    shard = tuple(header["shard"]) if "shard" in header else None
+    sections = [
+        (show["show_id"], show["name"], [outcome_from_record(record) for record in show["episodes"]]) for show in shows
+    ]
+    return shard, sections
+
+
+WRITERS = {"markdown": DigestWriter, "json": JsonDigestWriter, "html": HtmlDigestWriter}
@@ -1,6 +1,45 @@
 import sys
+import threading
+from http.server import ThreadingHTTPServer
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def http_server():
+    """Start ThreadingHTTPServer instances on localhost and shut them down afterwards."""
+
+    servers = []
+
+    def start(handler_cls):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def fake_spotify(http_server):
+    """Serve the benchmark fake Spotify API; ``start(**config)`` returns ``(base_url, state)``.
+
+    Tests using it exercise the benchmarks tree too, so mark them ``integration``.
+    """
+
+    fake = pytest.importorskip("benchmarks.fake_spotify")
+
+    def start(**config):
+        state = fake.FakeSpotifyState(fake.FakeSpotifyConfig(**config))
+        return http_server(fake.make_handler(state)), state
+
+    return start
@@ -0,0 +1,18 @@
+from benchmarks.run import build_cases, measure
+from benchmarks.synthetic import generate_transcript
+from podcast_digest.renderer import _split_sentences
+
+
+def test_synthetic_transcripts_are_deterministic_and_exact_size():
+    for style in ("mixed", "questions", "unpunctuated"):
+        text = generate_transcript(10_000, style=style)
+        assert len(text.encode("utf-8")) == 10_000
+        assert text == generate_transcript(10_000, style=style)
+    assert len(_split_sentences(generate_transcript(10_000, style="unpunctuated"))) == 1
+
+
+def test_quick_cases_run(tmp_path):
+    cases = [case for case in build_cases(tmp_path, quick=True) if "/1KB" in case.name or "digest_run" in case.name]
+    results = [measure(case, repeats=1) for case in cases]
+    assert {result.name.split("/")[0] for result in results} >= {"summarize_transcript", "digest_run"}
+    assert all(result.seconds > 0 for result in results)
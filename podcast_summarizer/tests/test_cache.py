@@ -0,0 +1,30 @@
+import os
+from pathlib import Path
+
+from podcast_digest.cache import DiskCache
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = DiskCache(tmp_path / "cache", max_bytes=250)
+    for idx, key in enumerate(["a", "b", "c"]):
+        cache.set(key, b"x" * 100)
+        os.utime(cache._path(key), (idx, idx))
+        if key == "b":
+            assert cache.get("a") == b"x" * 100
+            os.utime(cache._path("a"), (10, 10))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"x" * 100
+    assert cache.get("c") == b"x" * 100
+    assert cache.size <= 250
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disk_cache_clear(tmp_path: Path):
+    cache = DiskCache(tmp_path / "cache")
+    cache.set("a", b"data")
+
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert cache.size == 0
@@ -0,0 +1,50 @@
+import time
+from datetime import datetime
+from pathlib import Path
+
+from podcast_digest import cli
+from podcast_digest.config import DigestConfig, OutputConfig, ShowConfig
+from podcast_digest.models import Episode
+from podcast_digest.spotify import SpotifyClient
+
+
+class SlowSpotifyClient(SpotifyClient):
+    def __init__(self, delays):
+        super().__init__("id", "secret")
+        self.delays = delays
+
+    def get_shows(self, show_ids):
+        return {show_id: {"id": show_id, "name": f"Show {show_id}"} for show_id in show_ids}
+
+    def get_new_episodes(self, show_id, last_processed, show=None, **options):
+        time.sleep(self.delays[show_id])
+        return [
+            Episode(
+                id=f"{show_id}-ep",
+                show_id=show_id,
+                show_name=show["name"],
+                title=f"Episode of {show_id}",
+                description=None,
+                published_at=datetime(2024, 1, 2),
+                duration_ms=600000,
+                spotify_url=f"http://spotify/{show_id}",
+            )
+        ]
+
+
+def test_concurrent_process_keeps_show_order(tmp_path: Path, monkeypatch):
+    delays = {"a": 0.2, "b": 0.1, "c": 0.0}
+    monkeypatch.setattr(cli, "load_spotify_client", lambda *_: SlowSpotifyClient(delays))
+    config = DigestConfig(
+        shows=[ShowConfig(id=show_id) for show_id in delays],
+        output=OutputConfig(output_dir=tmp_path / "output"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+        max_concurrency=3,
+    )
+
+    cli.process(config)
+
+    content = next((tmp_path / "output").glob("*.md")).read_text(encoding="utf-8")
+    positions = [content.index(f"## Show {show_id}") for show_id in delays]
+    assert positions == sorted(positions)
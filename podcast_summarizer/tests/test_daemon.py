@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from podcast_digest.config import DaemonConfig, DigestConfig, OutputConfig, ShowConfig
+from podcast_digest.daemon import DigestDaemon, ShowSchedule
+from podcast_digest.digest import DigestRunner
+from podcast_digest.models import Episode
+from podcast_digest.transcripts import shard_for
+
+START = datetime(2024, 3, 1, 6, 0)
+# Daily show released at midnight; monthly show last released ten days before START.
+RELEASES = {
+    "daily": [datetime(2024, 2, 20) + timedelta(days=day) for day in range(15)],
+    "monthly": [datetime(2023, 11, 20) + timedelta(days=30 * month) for month in range(4)],
+}
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _episode(show_id, published):
+    return Episode(
+        id=f"{show_id}-{published:%Y%m%d}",
+        show_id=show_id,
+        show_name=f"Show {show_id}",
+        title=f"{show_id} {published:%Y-%m-%d}",
+        description=None,
+        published_at=published,
+        duration_ms=600000,
+        spotify_url="http://spotify/episode",
+    )
+
+
+def test_schedule_backs_off_after_release_and_tightens_when_due():
+    config = DaemonConfig(min_poll_minutes=15, max_poll_hours=24, polls_per_release=8)
+    schedule = ShowSchedule("daily", releases=[datetime(2024, 3, day) for day in range(1, 6)])
+
+    assert schedule.interval(datetime(2024, 3, 5, 1, 0), config) == timedelta(hours=11, minutes=30)
+    assert schedule.interval(datetime(2024, 3, 5, 23, 50), config) == timedelta(minutes=15)
+    assert schedule.interval(datetime(2024, 3, 6, 2, 0), config) == timedelta(hours=3)
+    assert ShowSchedule("new").interval(START, config) == timedelta(minutes=config.default_poll_minutes)
+
+
+def test_daemon_polls_by_cadence_and_flushes_once_per_interval(tmp_path: Path):
+    clock = FakeClock(START)
+    config = DigestConfig(
+        shows=[ShowConfig(id=show_id) for show_id in RELEASES],
+        output=OutputConfig(output_dir=tmp_path / "output", mode="append"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+        daemon=DaemonConfig(flush_interval_minutes=60),
+    )
+    runner = DigestRunner(config)
+    polled = []
+
+    def poll(show_id, since):
+        polled.append(show_id)
+        last = max(filter(None, [runner.state.last_processed(show_id), since]), default=clock.now - timedelta(days=1))
+        episodes = [_episode(show_id, day) for day in RELEASES[show_id] if last < day <= clock.now]
+        return show_id, episodes, [runner.unavailable_outcome(episode) for episode in episodes]
+
+    def recent(show_id, count):
+        return [day for day in RELEASES[show_id] if day <= clock.now][-count:]
+
+    daemon = DigestDaemon(config, runner, list(RELEASES), poll, recent_releases=recent, clock=clock)
+    daemon.seed()
+    while clock.now < START + timedelta(days=3):
+        clock.now += timedelta(seconds=daemon.step())
+    daemon.flush()
+
+    # Fixed hourly polling would have made 144 requests over these three days.
+    assert polled.count("daily") < 40
+    assert polled.count("monthly") <= 4
+    assert runner.state.last_processed("daily") == datetime(2024, 3, 4)
+    content = next((tmp_path / "output").glob("*.md")).read_text(encoding="utf-8")
+    assert content.count("### daily 2024-03-02") == 1
+
+
+def test_transcript_written_between_polls_is_summarized(tmp_path: Path):
+    clock = FakeClock(START)
+    cache = tmp_path / "cache"
+    config = DigestConfig(
+        shows=[ShowConfig(id="daily")],
+        output=OutputConfig(output_dir=tmp_path / "output", mode="append"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=cache,
+    )
+    runner = DigestRunner(config)
+    released = [START - timedelta(hours=6)]
+
+    def poll(show_id, since):
+        episodes = [_episode(show_id, released[-1])]
+        items = ((episode, runner.transcript_provider.get_transcript(episode)) for episode in episodes)
+        return show_id, episodes, runner.process_transcripts(items)
+
+    daemon = DigestDaemon(config, runner, ["daily"], poll, clock=clock)
+    daemon.poll_due()
+    assert daemon.pending["daily"][1][0].status == "unavailable"
+
+    # The transcript lands in its shard directory while the daemon is running.
+    episode = _episode("daily", START + timedelta(hours=1))
+    shard_dir = cache / shard_for(episode.id)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    (shard_dir / f"{episode.id}.txt").write_text("Fresh insight arrives. You should try it.", encoding="utf-8")
+    released.append(episode.published_at)
+    clock.now += timedelta(days=1)
+    daemon.poll_due()
+
+    assert daemon.pending["daily"][1][-1].status == "summarized"
+    runner.close()
+
+
+def test_failed_flush_keeps_pending_episodes(tmp_path: Path, monkeypatch):
+    clock = FakeClock(START)
+    config = DigestConfig(
+        shows=[ShowConfig(id="daily")],
+        output=OutputConfig(output_dir=tmp_path / "output", mode="append"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+    )
+    runner = DigestRunner(config)
+
+    def poll(show_id, since):
+        episodes = [_episode(show_id, datetime(2024, 2, 29))]
+        return show_id, episodes, [runner.unavailable_outcome(episode) for episode in episodes]
+
+    daemon = DigestDaemon(config, runner, ["daily"], poll, clock=clock)
+    daemon.poll_due()
+    original_run = runner.run
+    monkeypatch.setattr(runner, "run", lambda ordered: (_ for _ in ()).throw(OSError("disk full")))
+    daemon.flush()
+    assert "daily" in daemon.pending
+
+    monkeypatch.setattr(runner, "run", original_run)
+    daemon.flush()
+    assert not daemon.pending
+    assert runner.state.last_processed("daily") == datetime(2024, 2, 29)
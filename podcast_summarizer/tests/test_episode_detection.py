@@ -1,5 +1,8 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
+import pytest
+
+from podcast_digest import spotify
 from podcast_digest.spotify import SpotifyClient
 
 
@@ -48,3 +51,66 @@ def test_get_new_episodes_filters_by_last_processed():
     assert episodes[0].id == "ep2"
     assert client.calls["get_show"] == 1
     assert client.calls["iter_episodes"] == 1
+
+
+def test_get_new_episodes_uses_batched_show_data():
+    client = DummySpotifyClient()
+
+    episodes = client.get_new_episodes("show123", None, show={"id": "show123", "name": "Batched Show"})
+
+    assert [episode.id for episode in episodes] == ["ep1", "ep2"]
+    assert episodes[0].show_name == "Batched Show"
+    assert client.calls["get_show"] == 0
+
+
+def _fake_client(fake_spotify, monkeypatch, prefetch_pages=0):
+    base, state = fake_spotify(shows=2, episodes_per_show=300)
+    monkeypatch.setattr(spotify, "SPOTIFY_API_BASE", f"{base}/v1")
+    monkeypatch.setattr(spotify, "SPOTIFY_TOKEN_URL", f"{base}/api/token")
+    return SpotifyClient("id", "secret", prefetch_pages=prefetch_pages), state
+
+
+@pytest.mark.integration
+def test_backfill_window_stops_paging_early(fake_spotify, monkeypatch):
+    client, state = _fake_client(fake_spotify, monkeypatch, prefetch_pages=3)
+
+    episodes = client.get_new_episodes("show00001", None, show={"name": "Fake"}, max_episodes=120)
+    recent = client.get_new_episodes(
+        "show00001", None, show={"name": "Fake"}, max_age=datetime.utcnow() - datetime(2023, 12, 1)
+    )
+    client.close()
+
+    assert len(episodes) == 120
+    assert episodes[-1].id == "show00001-ep0000"
+    assert episodes[0].id == "show00001-ep0119"
+    assert state.counts["episodes"] == 3 + 1
+    assert [episode.id for episode in recent] == [f"show00001-ep{idx:04d}" for idx in range(8, -1, -1)]
+
+
+@pytest.mark.integration
+def test_prefetched_backfill_matches_sequential_paging(fake_spotify, monkeypatch):
+    client, state = _fake_client(fake_spotify, monkeypatch, prefetch_pages=4)
+    sequential = SpotifyClient("id", "secret")
+
+    prefetched = client.get_new_episodes("show00000", None, show={"name": "Fake"})
+    expected = sequential.get_new_episodes("show00000", None, show={"name": "Fake"})
+    client.close()
+    sequential.close()
+
+    assert len(prefetched) == 300
+    assert prefetched == expected
+
+
+@pytest.mark.integration
+def test_latest_episode_probe_skips_unchanged_shows(fake_spotify, monkeypatch):
+    client, state = _fake_client(fake_spotify, monkeypatch)
+    newest = client.latest_release("show00000")
+
+    unchanged = client.get_new_episodes("show00000", newest, probe=True)
+    changed = client.get_new_episodes("show00000", newest - timedelta(days=1), probe=True)
+    client.close()
+
+    assert unchanged == []
+    assert [episode.id for episode in changed] == ["show00000-ep0000"]
+    assert state.counts["show"] == 1
+    assert state.counts["episodes"] == 1 + 1 + 2
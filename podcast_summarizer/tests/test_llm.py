@@ -0,0 +1,121 @@
+import json
+import socket
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+from podcast_digest.cache import DiskCache
+from podcast_digest.config import DigestConfig, LLMConfig, OutputConfig
+from podcast_digest.digest import DigestRunner
+from podcast_digest.llm import LLMSummarizer, OllamaClient, chunk_transcript, estimate_tokens
+from podcast_digest.models import Episode
+from podcast_digest.renderer import summarize_transcript
+
+TRANSCRIPT = " ".join(f"Sentence {idx} talks about topic {idx % 7} in some detail." for idx in range(120))
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    requests = []
+    in_flight = 0
+    max_in_flight = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.requests.append(payload)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.02)
+        prompt = payload["prompt"]
+        if payload.get("format") == "json":
+            first = prompt.split("Transcript part:\n", 1)[1].split(". ")[0] + "."
+            reply = {
+                "summary": f"Covers {first}",
+                "takeaways": [first],
+                "quotes": [first, "A quote nobody said."],
+                "action_items": ["Take notes."],
+                "open_questions": [],
+            }
+            response = json.dumps(reply)
+        else:
+            response = f"Episode overview from {prompt.count('Part ')} parts."
+        body = json.dumps({"model": payload["model"], "response": response, "done": True}).encode()
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _episode():
+    return Episode(
+        id="ep1",
+        show_id="demo",
+        show_name="Demo Show",
+        title="Episode 1",
+        description=None,
+        published_at=datetime(2024, 1, 1),
+        duration_ms=600000,
+        spotify_url="http://spotify/ep1",
+    )
+
+
+def test_chunks_respect_token_budget():
+    chunks = chunk_transcript(TRANSCRIPT + " " + "word " * 500, max_tokens=100)
+
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks).split() == (TRANSCRIPT + " " + "word " * 500).split()
+
+
+def test_map_reduce_summary_is_bounded_and_cached(http_server, tmp_path: Path):
+    StubOllamaHandler.requests = []
+    StubOllamaHandler.max_in_flight = 0
+    base_url = http_server(StubOllamaHandler)
+    cache = DiskCache(tmp_path / "llm")
+    summarizer = LLMSummarizer(OllamaClient(base_url, "llama2"), chunk_tokens=100, max_in_flight=3, cache=cache)
+
+    summary = summarizer.summarize(_episode(), TRANSCRIPT)
+    chunks = chunk_transcript(TRANSCRIPT, 100)
+    sent = len(StubOllamaHandler.requests)
+
+    assert len(chunks) > 3
+    assert len(summary.segments) == len(chunks)
+    assert summary.overview.startswith("Episode overview")
+    assert summary.quotes and "A quote nobody said." not in summary.quotes
+    assert summary.action_items == ["Take notes."]
+    assert StubOllamaHandler.max_in_flight <= 3
+    assert sent > len(chunks)
+
+    # Unchanged windows are answered from the cache.
+    assert summarizer.summarize(_episode(), TRANSCRIPT) == summary
+    assert len(StubOllamaHandler.requests) == sent
+    summarizer.close()
+
+
+def test_runner_falls_back_when_endpoint_is_down(tmp_path: Path):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    config = DigestConfig(
+        shows=[],
+        output=OutputConfig(output_dir=tmp_path / "output"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+        llm=LLMConfig(enabled=True, base_url=f"http://127.0.0.1:{port}", timeout_seconds=2),
+    )
+    runner = DigestRunner(config)
+
+    outcome = runner.summarize_episode(_episode(), TRANSCRIPT)
+    runner.close()
+
+    assert outcome.summary == summarize_transcript(_episode(), TRANSCRIPT)
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+from podcast_digest import metrics
+from podcast_digest.config import DigestConfig, OutputConfig, ShowConfig
+from podcast_digest.digest import DigestRunner
+from podcast_digest.models import Episode
+
+
+def _episode(idx: int) -> Episode:
+    return Episode(
+        id=f"ep{idx}",
+        show_id="demo",
+        show_name="Demo Show",
+        title=f"Episode {idx}",
+        description=None,
+        published_at=datetime(2024, 1, idx),
+        duration_ms=600000,
+        spotify_url=f"http://spotify/ep{idx}",
+    )
+
+
+def test_spans_are_shared_noops_when_disabled():
+    metrics.disable()
+    assert metrics.span("summarize") is metrics.span("render")
+    with metrics.show_scope("demo"), metrics.span("summarize"):
+        pass
+    assert metrics.recorder() is None
+
+
+def test_run_records_stages_per_show_and_exports(tmp_path: Path):
+    config = DigestConfig(
+        shows=[ShowConfig(id="demo")],
+        output=OutputConfig(output_dir=tmp_path / "output"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+    )
+    recorder = metrics.enable()
+    try:
+        runner = DigestRunner(config)
+        episodes = [_episode(1), _episode(2)]
+        with metrics.show_scope("demo"):
+            outcomes = [runner.summarize_episode(episode, "We should try it. Why not? It works.") for episode in episodes]
+        document = runner.run([("demo", episodes, outcomes)])
+    finally:
+        metrics.disable()
+
+    report_path, prometheus_path = recorder.write(config.output.output_dir, document.date, {"episodes_total": 2})
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["episodes_total"] == 2
+    assert report["stages"]["summarize"]["count"] == 2
+    assert report["stages"]["state_save"]["count"] == 1
+    assert report["shows"]["demo"]["render"]["buckets"]["+Inf"] == 2
+    assert "write_document" in report["stages"]
+
+    text = prometheus_path.read_text(encoding="utf-8")
+    assert 'podcast_digest_stage_duration_seconds_count{stage="summarize",show="demo"} 2' in text
+    assert "podcast_digest_episodes_total 2" in text
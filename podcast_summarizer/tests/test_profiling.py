@@ -0,0 +1,99 @@
+import cProfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from podcast_digest import profiling
+from podcast_digest.config import DigestConfig, OutputConfig, ShowConfig
+from podcast_digest.digest import DigestRunner
+from podcast_digest.models import Episode, TranscriptResult
+from podcast_digest.renderer import summarize_transcript
+
+TRANSCRIPT = " ".join(f"Point {idx} is worth repeating? We should try it." for idx in range(4000))
+
+
+def _episode(idx: int) -> Episode:
+    return Episode(
+        id=f"ep{idx}",
+        show_id="demo",
+        show_name="Demo Show",
+        title=f"Episode {idx}",
+        description=None,
+        published_at=datetime(2024, 1, 1),
+        duration_ms=600000,
+        spotify_url=f"http://spotify/ep{idx}",
+    )
+
+
+@pytest.mark.parametrize("mode", profiling.PROFILE_MODES)
+def test_profile_reports_modules_and_slowest_episodes(tmp_path: Path, mode):
+    config = DigestConfig(
+        shows=[ShowConfig(id="demo")],
+        output=OutputConfig(output_dir=tmp_path / "output"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+    )
+    runner = DigestRunner(config)
+
+    with profiling.RunProfiler(mode, interval=0.001) as profiler:
+        runner.summarize_episode(_episode(1), TRANSCRIPT[:1000])
+        runner.summarize_episode(_episode(2), TRANSCRIPT)
+        runner.summarize_episode_stream(_episode(3), iter([TRANSCRIPT[:500], TRANSCRIPT[500:2000]]))
+        # Give the sampler enough stacks to see the summarizer regardless of GIL scheduling.
+        deadline = time.monotonic() + 5
+        while mode == "sampling" and profiler.samples < 50 and time.monotonic() < deadline:
+            summarize_transcript(_episode(9), TRANSCRIPT)
+    paths = profiler.write(tmp_path / "output", datetime(2024, 1, 1), top=2)
+
+    slowest = profiler.slowest_episodes(2)
+    assert slowest[0].episode_id == "ep2"
+    assert slowest[0].transcript_chars == len(TRANSCRIPT)
+    assert {timing.episode_id: timing.transcript_chars for timing in profiler.episodes}["ep3"] == 2000
+    assert "renderer" in dict(profiler.module_shares())
+    assert [path.name for path in paths] == [
+        "2024-01-01.profile.folded" if mode == "sampling" else "2024-01-01.profile.pstats",
+        "2024-01-01.profile.txt",
+    ]
+    assert profiling.episode_timer(_episode(4)) is profiling.episode_timer(_episode(5))
+
+
+def test_pool_summarized_episodes_are_timed(tmp_path: Path):
+    config = DigestConfig(
+        shows=[ShowConfig(id="demo")],
+        output=OutputConfig(output_dir=tmp_path / "output"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+        summary_workers=2,
+    )
+    runner = DigestRunner(config)
+    items = [(_episode(idx), TranscriptResult(status="available", text=TRANSCRIPT[: 1000 * idx])) for idx in (1, 2)]
+
+    with profiling.RunProfiler("sampling", interval=0.01) as profiler:
+        runner.process_transcripts(items)
+    runner.close()
+
+    assert {timing.episode_id: timing.transcript_chars for timing in profiler.episodes} == {"ep1": 1000, "ep2": 2000}
+
+
+def test_deterministic_mode_skips_threads_when_a_profiler_is_active(monkeypatch):
+    main = threading.get_ident()
+
+    class SingleProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            # Python 3.12+ behaviour: a second active profiler is refused.
+            if threading.get_ident() != main:
+                raise ValueError("Another profiling tool is already active")
+            super().enable(*args, **kwargs)
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", SingleProfile)
+    with profiling.RunProfiler("deterministic") as profiler:
+        worker = threading.Thread(target=summarize_transcript, args=(_episode(1), TRANSCRIPT[:2000]))
+        worker.start()
+        worker.join()
+        summarize_transcript(_episode(2), TRANSCRIPT[:2000])
+
+    assert len(profiler._profiles) == 1
+    assert profiler.hot_functions()
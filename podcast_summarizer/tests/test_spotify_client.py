@@ -0,0 +1,138 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from urllib import parse
+
+import pytest
+
+from podcast_digest import spotify
+from podcast_digest.http_cache import ResponseCache
+from podcast_digest.spotify import SpotifyClient
+
+
+class FakeSpotifyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    token_requests = 0
+    client_ports = []
+    expires_in = 3600
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        type(self).token_requests += 1
+        self._send_json({"access_token": f"token-{self.token_requests}", "expires_in": self.expires_in})
+
+    def do_GET(self):
+        type(self).client_ports.append(self.client_address[1])
+        url = parse.urlsplit(self.path)
+        if url.path == "/v1/shows":
+            ids = parse.parse_qs(url.query)["ids"][0].split(",")
+            shows = [None if show_id == "missing" else {"id": show_id, "name": f"Show {show_id}"} for show_id in ids]
+            self._send_json({"shows": shows})
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self._send_json({"id": "show1", "name": "Pooled Show"})
+
+
+def make_client(http_server, monkeypatch, expires_in=3600, cache=None):
+    handler = type("Handler", (FakeSpotifyHandler,), {"token_requests": 0, "client_ports": [], "expires_in": expires_in})
+    base = http_server(handler)
+    monkeypatch.setattr(spotify, "SPOTIFY_API_BASE", f"{base}/v1")
+    monkeypatch.setattr(spotify, "SPOTIFY_TOKEN_URL", f"{base}/api/token")
+    return SpotifyClient("id", "secret", cache=cache), handler
+
+
+def test_requests_reuse_one_connection(http_server, monkeypatch):
+    client, handler = make_client(http_server, monkeypatch)
+
+    for _ in range(3):
+        assert client.get_show("show1")["name"] == "Pooled Show"
+    client.close()
+
+    assert len(handler.client_ports) == 3
+    assert len(set(handler.client_ports)) == 1
+    assert handler.token_requests == 1
+
+
+def test_token_refreshed_before_expiry(http_server, monkeypatch):
+    client, handler = make_client(http_server, monkeypatch, expires_in=spotify.TOKEN_REFRESH_MARGIN + 1)
+
+    client.get_show("show1")
+    assert handler.token_requests == 1
+    monkeypatch.setattr(client, "_token_expires_at", client._token_expires_at - 2)
+    client.get_show("show1")
+    client.close()
+
+    assert handler.token_requests == 2
+
+
+def test_get_shows_batches_ids(http_server, monkeypatch):
+    client, handler = make_client(http_server, monkeypatch)
+    show_ids = [f"s{i}" for i in range(spotify.SHOWS_BATCH_SIZE + 5)] + ["missing", "s0"]
+
+    shows = client.get_shows(show_ids)
+    client.close()
+
+    assert len(handler.client_ports) == 2
+    assert len(shows) == spotify.SHOWS_BATCH_SIZE + 5
+    assert shows["s3"]["name"] == "Show s3"
+    assert "missing" not in shows
+
+
+def test_conditional_requests_served_from_cache(http_server, monkeypatch, tmp_path):
+    cache = ResponseCache(tmp_path / "http")
+    client, handler = make_client(http_server, monkeypatch, cache=cache)
+
+    first = client.get_show("show1")
+    second = client.get_show("show1")
+    client.close()
+
+    assert first == second == {"id": "show1", "name": "Pooled Show"}
+    assert len(handler.client_ports) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["revalidated"]) == (1, 1, 1)
+    assert stats["bytes_saved"] > 0
+
+
+def test_fresh_cache_entries_skip_network(http_server, monkeypatch, tmp_path):
+    cache = ResponseCache(tmp_path / "http", ttl_seconds=300)
+    client, handler = make_client(http_server, monkeypatch, cache=cache)
+
+    client.get_show("show1")
+    client.get_show("show1")
+    client.close()
+
+    assert len(handler.client_ports) == 1
+    assert cache.hits == 1
+
+
+@pytest.mark.integration
+def test_throttled_and_failed_requests_are_retried(fake_spotify, monkeypatch):
+    base, state = fake_spotify(shows=3, episodes_per_show=120, throttle_every=2, error_rate=0.2)
+    monkeypatch.setattr(spotify, "SPOTIFY_API_BASE", f"{base}/v1")
+    monkeypatch.setattr(spotify, "SPOTIFY_TOKEN_URL", f"{base}/api/token")
+    monkeypatch.setattr(spotify, "RETRY_BACKOFF_SECONDS", 0.0)
+    client = SpotifyClient("id", "secret")
+
+    shows = client.get_shows(["show00000", "show00001", "nope"])
+    episodes = client.get_new_episodes("show00001", None, show=shows["show00001"])
+    client.close()
+
+    assert sorted(shows) == ["show00000", "show00001"]
+    assert len(episodes) == 120
+    assert episodes[0].published_at < episodes[-1].published_at
+    assert state.counts["episodes"] == 3
+    assert state.counts["throttled"] > 0
@@ -0,0 +1,122 @@
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from podcast_digest.config import DigestConfig, OutputConfig
+from podcast_digest.digest import DigestRunner
+from podcast_digest.state import SqliteStateStore, StateLease, StateLockError, StateStore, open_state_store
+
+
+def test_transaction_writes_once_on_commit(tmp_path: Path, monkeypatch):
+    store = StateStore(tmp_path / "state.json")
+    saves = []
+    original_save = store.save
+    monkeypatch.setattr(store, "save", lambda: (saves.append(1), original_save()))
+
+    with store.transaction():
+        for day in range(1, 4):
+            store.update_last_processed(f"show{day}", datetime(2024, 1, day))
+        assert not store.path.exists()
+
+    assert len(saves) == 1
+    assert json.loads(store.path.read_text(encoding="utf-8"))["show3"].startswith("2024-01-03")
+
+
+def test_transaction_rolls_back_on_error(tmp_path: Path):
+    store = StateStore(tmp_path / "state.json")
+    store.update_last_processed("show", datetime(2024, 1, 1))
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.update_last_processed("show", datetime(2024, 2, 1))
+            raise RuntimeError("boom")
+
+    assert store.last_processed("show") == datetime(2024, 1, 1)
+    assert StateStore(store.path).last_processed("show") == datetime(2024, 1, 1)
+
+
+def test_sqlite_backend_selected_by_suffix(tmp_path: Path):
+    path = tmp_path / "state.sqlite"
+    store = open_state_store(path)
+    assert isinstance(store, SqliteStateStore)
+
+    with store.transaction():
+        store.update_last_processed("show", datetime(2024, 1, 5))
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.update_last_processed("show", datetime(2024, 3, 1))
+            raise RuntimeError("boom")
+    store.close()
+
+    reopened = open_state_store(path)
+    assert reopened.last_processed("show") == datetime(2024, 1, 5)
+    reopened.close()
+
+
+def test_concurrent_workers_keep_each_others_markers(tmp_path: Path):
+    path = tmp_path / "state.json"
+    first, second = StateStore(path), StateStore(path)
+
+    with first.transaction():
+        first.update_last_processed("a", datetime(2024, 1, 2))
+    with second.transaction():
+        second.update_last_processed("b", datetime(2024, 1, 3))
+        # A stale marker never moves a show back.
+        second.update_last_processed("a", datetime(2024, 1, 1))
+
+    assert StateStore(path).last_processed("a") == datetime(2024, 1, 2)
+    assert StateStore(path).last_processed("b") == datetime(2024, 1, 3)
+    assert not StateLease(path).path.exists()
+
+
+def test_lease_waits_for_holder_and_takes_over_expired(tmp_path: Path):
+    path = tmp_path / "state.json"
+    holder = StateLease(path, ttl=60)
+    holder.acquire()
+    with pytest.raises(StateLockError):
+        StateLease(path, timeout=0.1).acquire()
+
+    # The holder crashed: once its lease expires the next worker saves normally.
+    lease = json.loads(holder.path.read_text(encoding="utf-8"))
+    holder.path.write_text(json.dumps({**lease, "expires_at": time.time() - 1}), encoding="utf-8")
+    store = StateStore(path)
+    store.update_last_processed("a", datetime(2024, 1, 1))
+    assert StateStore(path).last_processed("a") == datetime(2024, 1, 1)
+    assert not holder.path.exists()
+
+
+def test_sqlite_markers_only_move_forward(tmp_path: Path):
+    path = tmp_path / "state.sqlite"
+    first, second = SqliteStateStore(path), SqliteStateStore(path)
+    with first.transaction():
+        first.update_last_processed("a", datetime(2024, 1, 2))
+    with second.transaction():
+        second.update_last_processed("a", datetime(2024, 1, 1))
+        second.update_last_processed("b", datetime(2024, 1, 3))
+    first.close()
+    second.close()
+
+    reopened = SqliteStateStore(path)
+    assert reopened.last_processed("a") == datetime(2024, 1, 2)
+    assert reopened.last_processed("b") == datetime(2024, 1, 3)
+    reopened.close()
+
+
+def test_runner_close_closes_sqlite_state(tmp_path: Path):
+    config = DigestConfig(
+        shows=[],
+        output=OutputConfig(output_dir=tmp_path / "output"),
+        state_file=tmp_path / "state.sqlite",
+        transcript_cache=tmp_path / "cache",
+    )
+    runner = DigestRunner(config)
+    runner.state.update_last_processed("show", datetime(2024, 1, 5))
+    runner.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        runner.state._conn.execute("SELECT 1")
+    assert open_state_store(config.state_file).last_processed("show") == datetime(2024, 1, 5)
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from podcast_digest import ranking
+from podcast_digest.features import ACTION, DEFAULT_EXTRACTOR, FeatureExtractor
+from podcast_digest.models import Episode
+from podcast_digest.renderer import _split_sentences, summarize_stream, summarize_transcript
+
+TRANSCRIPT = (
+    "Welcome back to the show.  Today we plan to cover three topics!\n"
+    "Should you try the new framework? We recommend starting small. "
+    + " ".join(f"Point {idx} is worth repeating." for idx in range(60))
+    + " What happens next?  Nobody knows"
+)
+
+
+def _episode():
+    return Episode(
+        id="ep1",
+        show_id="demo",
+        show_name="Demo Show",
+        title="Episode 1",
+        description=None,
+        published_at=datetime(2024, 1, 1),
+        duration_ms=600000,
+        spotify_url="http://spotify/ep1",
+    )
+
+
+def test_stream_summary_matches_full_text_summary():
+    expected = summarize_transcript(_episode(), TRANSCRIPT)
+
+    for size in (1, 2, 7, 64, len(TRANSCRIPT)):
+        chunks = (TRANSCRIPT[i : i + size] for i in range(0, len(TRANSCRIPT), size))
+        assert summarize_stream(_episode(), chunks) == expected
+
+
+def test_summary_caps_feature_lists():
+    summary = summarize_transcript(_episode(), TRANSCRIPT)
+
+    assert len(summary.quotes) == 10
+    assert summary.action_items[:2] == ["Today we plan to cover three topics!", "Should you try the new framework?"]
+    assert summary.open_questions == ["Should you try the new framework?", "What happens next?"]
+    assert summary.takeaways[0] == "Welcome back to the show. Today we plan to cover three topics!"
+
+
+RANKED_TRANSCRIPT = (
+    "Hi everyone. Thanks for having me. "
+    "Battery chemistry decides how far an electric car can drive. "
+    "Solid state battery chemistry promises safer cells and a longer driving range. "
+    "My dog barked all morning. "
+    "Charging speed depends on battery chemistry and on cell temperature. "
+    "Anyway, see you next week."
+)
+
+
+def test_ranked_strategy_selects_central_sentences():
+    positional = summarize_transcript(_episode(), RANKED_TRANSCRIPT)
+    ranked = summarize_transcript(_episode(), RANKED_TRANSCRIPT, strategy="ranked")
+
+    assert positional.overview.startswith("Hi everyone.")
+    assert ranked.overview.startswith("Battery chemistry decides")
+    assert "Hi everyone." not in ranked.overview
+    scores = ranking.score_sentences(_split_sentences(RANKED_TRANSCRIPT))
+    assert scores.index(max(scores)) in (2, 3, 5)
+    assert scores[4] < min(scores[2], scores[3], scores[5])
+    assert ranked.segments == positional.segments
+    assert ranked.action_items == positional.action_items
+
+
+def test_ranked_strategy_is_stream_safe_and_numpy_optional(monkeypatch):
+    expected = summarize_transcript(_episode(), TRANSCRIPT, strategy="ranked")
+    chunks = (TRANSCRIPT[i : i + 7] for i in range(0, len(TRANSCRIPT), 7))
+    assert summarize_stream(_episode(), chunks, strategy="ranked") == expected
+
+    monkeypatch.setattr(ranking, "np", None)
+    assert summarize_transcript(_episode(), TRANSCRIPT, strategy="ranked") == expected
+
+
+def test_feature_extractor_matches_substring_scan():
+    phrases = ["should", "show", "sh", "try", "entry", "plan", "planning", "recommend", "a.b", "c++"]
+    extractor = FeatureExtractor(phrases)
+    sentences = _split_sentences(TRANSCRIPT) + ["ShOw me.", "Use c++ now.", "axb", "a.b?", "Nothing here."]
+
+    for sentence in sentences:
+        expected = any(phrase in sentence.lower() for phrase in phrases)
+        assert bool(extractor.classify(sentence) & ACTION) == expected, sentence
+
+
+def test_custom_lexicons_change_action_items_and_questions():
+    features = FeatureExtractor(action_phrases=["worth repeating"], question_phrases=["nobody knows"])
+    summary = summarize_transcript(_episode(), TRANSCRIPT, features=features)
+
+    assert summary.action_items[0] == "Point 0 is worth repeating."
+    assert summary.open_questions == ["Should you try the new framework?", "What happens next?", "Nobody knows"]
+    assert DEFAULT_EXTRACTOR.is_default and not features.is_default
@@ -1,19 +1,45 @@
-from datetime import datetime
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
-from podcast_digest.config import DigestConfig, OutputConfig, ShowConfig
+import pytest
+
+from podcast_digest import digest
+from podcast_digest.config import (
+    BoilerplateConfig,
+    DigestConfig,
+    NegativeCacheConfig,
+    OutputConfig,
+    ShowConfig,
+    SummaryCacheConfig,
+)
 from podcast_digest.digest import DigestRunner
-from podcast_digest.models import Episode
+from podcast_digest.models import Episode, TranscriptResult
+from podcast_digest.summary_cache import SummaryCache
+from podcast_digest.transcripts import (
+    CachedTranscriptProvider,
+    NegativeCache,
+    NegativeCachingProvider,
+    ProviderChain,
+    TranscriptIndex,
+    TranscriptProvider,
+    load_provider,
+    prefetch_transcripts,
+    shard_for,
+)
 
 
-def make_runner(tmp_path: Path) -> DigestRunner:
+def make_runner(tmp_path: Path, remote_providers=(), **overrides) -> DigestRunner:
     config = DigestConfig(
         shows=[ShowConfig(id="demo")],
         output=OutputConfig(output_dir=tmp_path / "output"),
         state_file=tmp_path / "state.json",
         transcript_cache=tmp_path / "cache",
+        **overrides,
     )
-    return DigestRunner(config)
+    return DigestRunner(config, remote_providers)
 
 
 def test_transcript_unavailable(tmp_path: Path):
@@ -48,7 +74,353 @@ def test_state_updates_on_run(tmp_path: Path):
         duration_ms=700000,
         spotify_url="http://spotify/ep2",
     )
-    section = runner.handle_unavailable(episode)
-    runner.run([(episode.show_id, [episode], [section])])
+    outcome = runner.unavailable_outcome(episode)
+    runner.run([(episode.show_id, [episode], [outcome])])
 
     assert runner.state.last_processed("demo").isoformat().startswith("2024-01-02")
+
+
+def test_cached_transcript_streams_in_chunks(tmp_path: Path):
+    runner = make_runner(tmp_path)
+    episode = Episode(
+        id="ep3",
+        show_id="demo",
+        show_name="Demo Show",
+        title="Episode 3",
+        description=None,
+        published_at=datetime(2024, 1, 3),
+        duration_ms=700000,
+        spotify_url="http://spotify/ep3",
+    )
+    text = "First sentence here. Second sentence here?"
+    (tmp_path / "cache" / "ep3.txt").write_text(text, encoding="utf-8")
+
+    result = runner.transcript_provider.stream_transcript(episode)
+
+    assert result.status == "available"
+    assert result.text is None
+    assert runner.process_episode_stream(episode, result.chunks) == runner.process_episode(episode, text)
+
+
+def test_process_pool_output_matches_serial(tmp_path: Path):
+    items = []
+    for idx in range(6):
+        episode = Episode(
+            id=f"ep{idx}",
+            show_id="demo",
+            show_name="Demo Show",
+            title=f"Episode {idx}",
+            description=None,
+            published_at=datetime(2024, 1, idx + 1),
+            duration_ms=600000,
+            spotify_url=f"http://spotify/ep{idx}",
+        )
+        text = " ".join(f"Episode {idx} sentence {n}. Should we try more?" for n in range(20 * (6 - idx)))
+        result = TranscriptResult(status="available", text=text) if idx != 2 else TranscriptResult(status="unavailable")
+        items.append((episode, result))
+
+    serial = make_runner(tmp_path / "serial").process_transcripts(items)
+    pooled_runner = make_runner(tmp_path / "pooled", summary_workers=2)
+    try:
+        pooled = pooled_runner.process_transcripts(items)
+    finally:
+        pooled_runner.close()
+
+    assert pooled == serial
+    assert pooled[2].status == "unavailable"
+    assert "Transcript unavailable" in pooled[2].markdown
+
+
+def test_summary_cache_skips_resummarizing(tmp_path: Path, monkeypatch):
+    runner = make_runner(tmp_path, summary_cache=SummaryCacheConfig(directory=tmp_path / "summaries"))
+    episode = Episode(
+        id="ep4",
+        show_id="demo",
+        show_name="Demo Show",
+        title="Episode 4",
+        description=None,
+        published_at=datetime(2024, 1, 4),
+        duration_ms=700000,
+        spotify_url="http://spotify/ep4",
+    )
+    text = "A cached sentence. Another one follows."
+    first = runner.process_episode(episode, text)
+
+    monkeypatch.setattr(digest, "summarize_transcript", lambda *_: pytest.fail("summary should be cached"))
+    assert runner.process_episode(episode, text) == first
+    assert runner.summary_cache.stats()["hits"] == 1
+
+    runner.summary_cache.invalidate()
+    assert runner.summary_cache.get(SummaryCache.key(episode, text)) is None
+
+    # Streamed summaries are stored under the same key as the joined text.
+    streamed = runner.summarize_episode_stream(episode, iter(["A cached sen", "tence. Another one follows."]))
+    assert runner.summary_cache.get(SummaryCache.key(episode, text)) == (streamed.summary, streamed.markdown)
+
+
+def test_compressed_transcripts_read_like_plain_files(tmp_path: Path):
+    runner = make_runner(tmp_path)
+    provider = CachedTranscriptProvider(tmp_path / "cache")
+    episode = Episode(
+        id="ep5",
+        show_id="demo",
+        show_name="Demo Show",
+        title="Episode 5",
+        description=None,
+        published_at=datetime(2024, 1, 5),
+        duration_ms=700000,
+        spotify_url="http://spotify/ep5",
+    )
+    text = "Compressed transcripts stay readable.\nDo they stream too?\n" * 500
+    (tmp_path / "cache" / "ep5.txt").write_text(text, encoding="utf-8")
+    expected = runner.process_episode(episode, text)
+
+    assert provider.compress_plain_transcripts() == 1
+    assert not (tmp_path / "cache" / "ep5.txt").exists()
+    assert (tmp_path / "cache" / "ep5.txt.gz").stat().st_size < len(text)
+
+    assert provider.get_transcript(episode).text == text
+    streamed = provider.stream_transcript(episode)
+    assert runner.process_episode_stream(episode, streamed.chunks) == expected
+
+
+def test_empty_or_truncated_compressed_transcripts_are_misses(tmp_path: Path):
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    (cache / "ep1.txt.gz").write_bytes(b"")
+    (cache / "ep2.txt.gz").write_bytes(gzip.compress(b"Cut off mid-sentence. " * 200)[:60])
+    provider = CachedTranscriptProvider(cache)
+
+    for episode in (_episode(1), _episode(2)):
+        assert provider.get_transcript(episode).status == "unavailable"
+        assert provider.stream_transcript(episode).status == "unavailable"
+
+
+def test_reindex_shards_cache_and_serves_from_manifest(tmp_path: Path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    for idx in range(3):
+        (cache_dir / f"ep{idx}.txt").write_text(f"Transcript {idx}.", encoding="utf-8")
+
+    assert TranscriptIndex(cache_dir).reindex() == 3
+    assert not list(cache_dir.glob("*.txt"))
+    assert (cache_dir / shard_for("ep1") / "ep1.txt").exists()
+
+    provider = CachedTranscriptProvider(cache_dir)
+    monkeypatch.setattr(Path, "exists", lambda self: pytest.fail("availability check should not stat"))
+    episode = Episode(
+        id="ep1",
+        show_id="demo",
+        show_name="Demo Show",
+        title="Episode 1",
+        description=None,
+        published_at=datetime(2024, 1, 1),
+        duration_ms=600000,
+        spotify_url="http://spotify/ep1",
+    )
+    assert provider.get_transcript(episode).text == "Transcript 1."
+    episode.id = "missing"
+    assert provider.get_transcript(episode).status == "unavailable"
+
+
+def test_index_picks_up_files_added_to_cache_root(tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    index = TranscriptIndex(cache_dir)
+    assert index.lookup("late") is None
+
+    (cache_dir / "late.txt").write_text("Arrived later.", encoding="utf-8")
+
+    assert TranscriptIndex(cache_dir).lookup("late") == cache_dir / "late.txt"
+    index.refresh()
+    assert index.lookup("late") == cache_dir / "late.txt"
+
+
+INTRO = "Welcome to Demo Show, the weekly podcast about building small things with care and patience."
+AD = "This episode is brought to you by Acme Mattress, use code DEMO for fifteen percent off your first order."
+
+
+def _boilerplate_episode(index: int) -> Episode:
+    return Episode(
+        id=f"bp{index}",
+        show_id="demo",
+        show_name="Demo Show",
+        title=f"Episode {index}",
+        description=None,
+        published_at=datetime(2024, 2, index + 1),
+        duration_ms=600000,
+        spotify_url=f"http://spotify/bp{index}",
+    )
+
+
+def test_recurring_boilerplate_is_stripped_and_index_persists(tmp_path: Path):
+    config = BoilerplateConfig(directory=tmp_path / "boilerplate", min_episodes=2)
+    runner = make_runner(tmp_path, boilerplate=config)
+    for index in range(4):
+        body = f"In part {index} we talked about topic number {index} and why it matters to everyone listening today."
+        # Sponsor reads vary slightly between episodes.
+        ad = AD.replace("fifteen", "twenty") if index % 2 else AD
+        (tmp_path / "cache" / f"bp{index}.txt").write_text(f"{INTRO} {ad} {body} Thanks.", encoding="utf-8")
+
+    # Re-processing an episode replaces its record instead of counting it twice.
+    texts = [runner.transcript_provider.get_transcript(_boilerplate_episode(index)).text for index in (0, 0, 1, 2)]
+
+    assert all(INTRO in text for text in texts[:3])
+    assert texts[3] == "In part 2 we talked about topic number 2 and why it matters to everyone listening today. Thanks."
+
+    restarted = make_runner(tmp_path, boilerplate=config)
+    result = restarted.transcript_provider.stream_transcript(_boilerplate_episode(3))
+    assert "".join(result.chunks).strip() == (
+        "In part 3 we talked about topic number 3 and why it matters to everyone listening today. Thanks."
+    )
+
+
+class SlowProvider(TranscriptProvider):
+    def __init__(self, delay: float, status: str = "available", name: str = "slow") -> None:
+        self.delay = delay
+        self.status = status
+        self.name = name
+        self.calls = []
+
+    def get_transcript(self, episode: Episode) -> TranscriptResult:
+        self.calls.append((episode.id, time.monotonic()))
+        time.sleep(self.delay)
+        return TranscriptResult(status=self.status, text=f"{self.name} {episode.id}.", source=self.name)
+
+
+def _episode(number: int) -> Episode:
+    return Episode(
+        id=f"ep{number}",
+        show_id="demo",
+        show_name="Demo Show",
+        title=f"Episode {number}",
+        description=None,
+        published_at=datetime(2024, 1, number),
+        duration_ms=600000,
+        spotify_url=f"http://spotify/ep{number}",
+    )
+
+
+def test_provider_chain_timeouts_and_hedging():
+    episode = _episode(1)
+    # Sequential by default: the fallback is never asked.
+    slow, fallback = SlowProvider(0.05), SlowProvider(0, name="fallback")
+    assert ProviderChain(slow, fallback).get_transcript(episode).source == "slow"
+    assert not fallback.calls
+
+    # A timed-out provider is skipped.
+    chain = ProviderChain(SlowProvider(1.0), SlowProvider(0, name="fallback"), timeouts=[0.05, None])
+    started = time.monotonic()
+    assert chain.get_transcript(episode).source == "fallback"
+    assert time.monotonic() - started < 0.5
+    chain.close()
+
+    # Hedged: the fallback starts after 50 ms and its answer wins over the slow one.
+    slow, fallback = SlowProvider(1.0), SlowProvider(0, name="fallback")
+    chain = ProviderChain(slow, fallback, hedge_after=0.05)
+    assert chain.get_transcript(episode).source == "fallback"
+    assert fallback.calls[0][1] - slow.calls[0][1] >= 0.05
+    chain.close()
+
+    # A fast miss moves on without waiting for the hedge delay.
+    chain = ProviderChain(SlowProvider(0, status="unavailable"), SlowProvider(0, name="fallback"), hedge_after=5)
+    assert chain.get_transcript(episode).source == "fallback"
+    chain.close()
+
+
+def test_prefetch_loads_ahead_in_order():
+    provider = SlowProvider(0.02)
+    episodes = [_episode(number) for number in range(1, 6)]
+    seen = []
+
+    for episode, result in prefetch_transcripts(provider.get_transcript, episodes, depth=2):
+        time.sleep(0.05)
+        seen.append(episode.id)
+        assert result.text == f"slow {episode.id}."
+        if episode.id == "ep1":
+            # Two transcripts ahead were loading while ep1 was being "summarized".
+            assert len(provider.calls) >= 2
+
+    assert seen == [episode.id for episode in episodes]
+    assert [call[0] for call in provider.calls] == seen
+
+
+def test_negative_cache_backs_off_and_persists(tmp_path: Path):
+    now = [datetime(2024, 1, 10)]
+    path = tmp_path / "misses.json"
+
+    def open_cache():
+        return NegativeCache(path, ttl=timedelta(hours=1), max_backoff=timedelta(hours=3), clock=lambda: now[0])
+
+    remote = SlowProvider(0, status="unavailable", name="remote")
+    provider = NegativeCachingProvider(remote, open_cache())
+    recent, old = _episode(9), _episode(1)
+    old.published_at = datetime(2023, 1, 1)
+
+    def checks_at(hours: float) -> int:
+        now[0] = datetime(2024, 1, 10) + timedelta(hours=hours)
+        assert provider.get_transcript(recent).status == "unavailable"
+        return len(remote.calls)
+
+    # Re-checks after 1h, then 2h later, then every 3h (the cap).
+    assert [checks_at(hours) for hours in (0, 0.5, 1, 2.5, 3, 5.5, 6, 9)] == [1, 1, 2, 2, 3, 3, 4, 5]
+    provider.get_transcript(old)
+    provider.close()
+
+    remote.status = "available"
+    reopened = NegativeCachingProvider(remote, open_cache())
+    now[0] += timedelta(days=1)
+    assert reopened.get_transcript(old).source == "negative-cache"
+    assert reopened.get_transcript(recent).source == "remote"
+    assert reopened.get_transcript(recent).source == "remote"
+    assert len(remote.calls) == 8
+
+
+def test_negative_cache_survives_large_miss_counts(tmp_path: Path):
+    path = tmp_path / "misses.json"
+    episode = _episode(9)
+    now = datetime(2024, 1, 10)
+    key = NegativeCache._key(episode, "remote")
+    entry = {"misses": 200, "checked": (now - timedelta(days=8)).isoformat(), "seen": now.isoformat()}
+    path.write_text(json.dumps({key: entry}), encoding="utf-8")
+
+    cache = NegativeCache(path, max_age=timedelta(days=3650), clock=lambda: now)
+
+    # The wait is capped at max_backoff (7 days) instead of overflowing.
+    assert cache.should_check(episode, "remote")
+    cache.record(episode, "remote", available=False)
+    assert not cache.should_check(episode, "remote")
+
+
+def test_negative_cache_leaves_local_cache_lookups_alone(tmp_path: Path):
+    remote = SlowProvider(0, status="unavailable", name="remote")
+    chain = load_provider(tmp_path / "cache", negative_cache=NegativeCache(tmp_path / "misses.json"), remote=[remote])
+    episode = _episode(9)
+
+    assert chain.get_transcript(episode).status == "unavailable"
+    (tmp_path / "cache" / f"{episode.id}.txt").write_text("Now it is here.", encoding="utf-8")
+    chain.refresh()
+    assert chain.get_transcript(episode).source == "cache"
+    assert len(remote.calls) == 1
+
+
+def test_runner_skips_remote_misses_within_backoff(tmp_path: Path):
+    remote = SlowProvider(0, status="unavailable", name="remote")
+    negative_cache = NegativeCacheConfig(path=tmp_path / "misses.json")
+    episode = _episode(9)
+    episode.published_at = datetime.utcnow() - timedelta(hours=1)
+
+    first = make_runner(tmp_path, [remote], negative_cache=negative_cache)
+    assert first.transcript_provider.get_transcript(episode).status == "unavailable"
+    first.close()
+    written = negative_cache.path.stat().st_ino
+
+    second = make_runner(tmp_path, [remote], negative_cache=negative_cache)
+    assert second.transcript_provider.get_transcript(episode).status == "unavailable"
+    second.close()
+
+    assert len(remote.calls) == 1
+    assert second.negative_cache.skipped == 1
+    # A run that only consulted the cache leaves the file alone.
+    assert negative_cache.path.stat().st_ino == written
+    assert make_runner(tmp_path, negative_cache=negative_cache).negative_cache is None
@@ -0,0 +1,170 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+from podcast_digest.cli import merge
+from podcast_digest.config import DigestConfig, OutputConfig, ShowConfig
+from podcast_digest.digest import DigestRunner
+from podcast_digest.models import Episode
+from podcast_digest.sharding import select_shows
+
+
+def make_runner(tmp_path: Path, mode: str = "overwrite") -> DigestRunner:
+    config = DigestConfig(
+        shows=[ShowConfig(id="a"), ShowConfig(id="b")],
+        output=OutputConfig(output_dir=tmp_path / "output", mode=mode),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+    )
+    return DigestRunner(config)
+
+
+def make_episode(show_id: str, number: int) -> Episode:
+    return Episode(
+        id=f"{show_id}{number}",
+        show_id=show_id,
+        show_name=f"Show {show_id.upper()}",
+        title=f"Episode {number}",
+        description=None,
+        published_at=datetime(2024, 1, number),
+        duration_ms=600000,
+        spotify_url=f"http://spotify/{show_id}{number}",
+    )
+
+
+def show_entry(runner: DigestRunner, show_id: str, numbers):
+    episodes = [make_episode(show_id, number) for number in numbers]
+    outcomes = [runner.unavailable_outcome(episode) for episode in episodes]
+    return show_id, episodes, outcomes
+
+
+def test_streamed_document_matches_joined_sections(tmp_path: Path):
+    runner = make_runner(tmp_path)
+    entries = [show_entry(runner, "a", [1, 2]), show_entry(runner, "b", [3])]
+
+    document = runner.run(iter(entries))
+
+    sections = []
+    for _, episodes, outcomes in entries:
+        sections.append(f"<!-- show:{episodes[0].show_id} -->\n## {episodes[0].show_name}\n")
+        sections.extend(f"<!-- episode:{outcome.episode.id} -->\n{outcome.markdown}" for outcome in outcomes)
+    expected = "\n".join([document.overview, *sections])
+    assert document.output_path.read_text(encoding="utf-8") == expected
+    assert document.shows == ["Show A", "Show B"]
+    assert not [path for path in document.output_path.parent.iterdir() if path.name.startswith(".")]
+
+
+def test_append_mode_merges_into_existing_day_file(tmp_path: Path):
+    first = make_runner(tmp_path, mode="append").run([show_entry(make_runner(tmp_path), "a", [1])])
+    before = first.output_path.read_text(encoding="utf-8")
+
+    runner = make_runner(tmp_path, mode="append")
+    document = runner.run([show_entry(runner, "a", [1, 2]), show_entry(runner, "b", [3])])
+    content = document.output_path.read_text(encoding="utf-8")
+
+    assert document.total_new_episodes == 2
+    assert "New episodes: 3 | Summarized: 0 | Transcript unavailable: 3" in content
+    assert content.count("### Episode 1") == 1
+    assert content.count("## Show A") == 1
+    assert content.index("### Episode 2") < content.index("## Show B") < content.index("### Episode 3")
+    assert content.startswith(before.split("## Daily overview")[0])
+    assert before[before.index("\n<!-- show:a -->") :] in content
+
+
+def test_append_sections_are_keyed_by_show_id(tmp_path: Path):
+    runner = make_runner(tmp_path, mode="append")
+    heading = make_episode("a", 1)
+    outcome = runner.unavailable_outcome(heading)
+    # Summary text can contain lines that look like a show heading.
+    outcome.markdown += "\n## Not a show\n"
+    runner.run([("a", [heading], [outcome])])
+    namesake = make_episode("b", 2)
+    namesake.show_name = "Show A"
+
+    rerun = make_runner(tmp_path, mode="append")
+    document = rerun.run([show_entry(rerun, "a", [1, 3]), ("b", [namesake], [rerun.unavailable_outcome(namesake)])])
+    content = document.output_path.read_text(encoding="utf-8")
+
+    assert document.total_new_episodes == 2
+    assert content.count("## Not a show") == 1
+    assert content.count("## Show A") == 2
+    assert content.index("## Not a show") < content.index("http://spotify/a3") < content.index("<!-- show:b -->")
+
+
+def test_append_keeps_episodes_that_share_a_title(tmp_path: Path):
+    runner = make_runner(tmp_path, mode="append")
+    runner.run([show_entry(runner, "a", [1])])
+    rerun = make_episode("a", 2)
+    rerun.title = "Episode 1"
+
+    document = make_runner(tmp_path, mode="append").run([("a", [rerun], [runner.unavailable_outcome(rerun)])])
+    content = document.output_path.read_text(encoding="utf-8")
+
+    assert document.total_new_episodes == 1
+    assert content.count("### Episode 1") == 2
+    assert "http://spotify/a2" in content
+
+
+def test_all_formats_written_in_one_pass(tmp_path: Path):
+    config = DigestConfig(
+        shows=[ShowConfig(id="a")],
+        output=OutputConfig(output_dir=tmp_path / "output", format=["markdown", "json", "html"], mode="append"),
+        state_file=tmp_path / "state.json",
+        transcript_cache=tmp_path / "cache",
+    )
+    runner = DigestRunner(config)
+    summarized = runner.summarize_episode(make_episode("a", 1), "Great insight here. Should we ship it?")
+    runner.run([("a", [summarized.episode], [summarized])])
+    second = DigestRunner(config)
+    document = second.run([show_entry(second, "a", [1, 2]), show_entry(second, "b", [3])])
+
+    data = json.loads(document.output_paths["json"].read_text(encoding="utf-8"))
+    assert data["stats"] == {"total": 3, "summarized": 1, "unavailable": 2}
+    assert [show["name"] for show in data["shows"]] == ["Show A", "Show B"]
+    first_episode, second_episode = data["shows"][0]["episodes"]
+    assert first_episode["status"] == "summarized"
+    assert first_episode["summary"]["action_items"] == ["Should we ship it?"]
+    assert second_episode["status"] == "unavailable" and "summary" not in second_episode
+
+    html = document.output_paths["html"].read_text(encoding="utf-8")
+    assert html.count('id="episode-a1"') == 1
+    assert html.index('id="episode-a2"') < html.index('data-show="b"')
+    assert "New episodes: 3 | Summarized: 1 | Transcript unavailable: 2" in html
+    assert html.rstrip().endswith("</html>")
+    assert document.output_path == document.output_paths["markdown"]
+
+
+def test_shard_sections_merge_into_one_digest(tmp_path: Path):
+    show_ids = [f"s{idx}" for idx in range(12)]
+    shards = [select_shows(show_ids, (index, 3)) for index in (1, 2, 3)]
+    assert sorted(show_id for shard in shards for show_id in shard) == sorted(show_ids)
+    assert all(shards)
+
+    def config(shard=None):
+        return DigestConfig(
+            shows=[ShowConfig(id=show_id) for show_id in show_ids],
+            output=OutputConfig(output_dir=tmp_path / "output", format=["markdown", "json"]),
+            state_file=tmp_path / "state.json",
+            transcript_cache=tmp_path / "cache",
+            shard=shard,
+        )
+
+    date = datetime(2024, 2, 1)
+    # Shard 2 finishes first; the merged digest still follows the config's show order.
+    for index in (2, 3, 1):
+        worker = DigestRunner(config((index, 3)))
+        worker.run([show_entry(worker, show_id, [1, 2]) for show_id in shards[index - 1]], date=date)
+    assert not list((tmp_path / "output").glob("*.md"))
+
+    document = merge(config(), date)
+
+    single = DigestRunner(config()).run(
+        [show_entry(DigestRunner(config()), show_id, [1, 2]) for show_id in show_ids], date=datetime(2024, 2, 2)
+    )
+    merged = document.output_path.read_text(encoding="utf-8")
+    expected = single.output_path.read_text(encoding="utf-8")
+    assert merged.split("\n", 1)[1] == expected.split("\n", 1)[1]
+    assert [show["name"] for show in json.loads(document.output_paths["json"].read_text(encoding="utf-8"))["shows"]] == [
+        f"Show {show_id.upper()}" for show_id in show_ids
+    ]
+    assert json.loads((tmp_path / "state.json").read_text(encoding="utf-8")).keys() == set(show_ids)